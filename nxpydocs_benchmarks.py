@@ -0,0 +1,327 @@
+import sys
+import json
+import fnmatch
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from jinja2 import Environment, FileSystemLoader
+from nxpydocs_rules import (HOST_CHECKS, INTERFACE_RULES, InterfaceColumns, ThresholdOverrides, evaluate_fleet_columns,
+                            evaluate_fleet_interfaces, evaluate_host, evaluate_interfaces, interface_records,
+                            interface_rows, stream_interface_rows)
+from nxpydocs_schemas import SNAPSHOT_SCHEMAS, convert, decode_snapshot
+from nxpydocs_webex import CARD_TEMPLATES, render_card
+
+# Fields of a real NX-OS ROW_interface that no rule reads, with typical values
+UNCHECKED_FIELDS = {
+    "state": "up", "admin_state": "up", "share_state": "Dedicated", "eth_hw_desc": "100/1000/10000 Ethernet",
+    "eth_hw_addr": "00fe.c8a1.b2c3", "eth_bia_addr": "00fe.c8a1.b2c3", "desc": "uplink to core",
+    "eth_mtu": "9216", "eth_bw": "10000000", "eth_dly": "10", "eth_reliability": "255", "eth_txload": "1",
+    "eth_rxload": "1", "medium": "broadcast", "eth_mode": "trunk", "eth_speed": "10 Gb/s", "eth_media": "10G",
+    "eth_beacon": "off", "eth_autoneg": "on", "eth_in_flowctrl": "off", "eth_out_flowctrl": "off",
+    "eth_mdix": "off", "eth_ratemode": "dedicated", "eth_swt_monitor": "off", "eth_ethertype": "0x8100",
+    "eth_eee_state": "n/a", "eth_link_flapped": "4week(s) 2day(s)", "eth_clear_counters": "never",
+    "eth_reset_cntr": "3", "eth_load_interval1_rx": "30", "eth_inrate1_bits": "8248", "eth_inrate1_pkts": "9",
+    "eth_load_interval1_tx": "30", "eth_outrate1_bits": "6392", "eth_outrate1_pkts": "7",
+    "eth_inucast": "913337", "eth_inmcast": "3393251", "eth_inbcast": "14262", "eth_inpkts": "4320850",
+    "eth_inbytes": "437563522", "eth_jumbo_inpkts": "0", "eth_storm_supp": "0", "eth_giants": "0",
+    "eth_outucast": "790071", "eth_outmcast": "3371880", "eth_outbcast": "8", "eth_outpkts": "4161959",
+    "eth_outbytes": "397934393", "eth_jumbo_outpkts": "0", "eth_watchdog": "0", "eth_bad_eth": "0",
+}
+
+###################################################################
+#                  SYNTHETIC FLEET SECTION                        #
+###################################################################
+
+def synthetic_fleet(hosts, ports, seed=1):
+    """ {hostname: [ROW_interface, ...]} shaped like nxpydocs show interface output """
+    random.seed(seed)
+    fleet = {}
+    for host in range(hosts):
+        rows = []
+        for port in range(ports):
+            row = {"interface": f"Ethernet{ port // 48 + 1 }/{ port % 48 + 1 }"}
+            for rule in INTERFACE_RULES:
+                if rule.compare == "above":
+                    row[rule.field] = str(random.choice([0] * 50 + [1, 12]))
+            row["eth_duplex"] = random.choice(["full", "full", "half"])
+            row["state_rsn_desc"] = random.choice(["none", "Link not connected", "Administratively down"])
+            rows.append(row)
+        fleet[f"switch{ host:04d}"] = rows
+    return(fleet)
+
+
+def synthetic_documents(hosts, ports, seed=1):
+    """ {hostname: show interface JSON bytes} with full-width ROW_interface dicts """
+    documents = {}
+    for hostname, rows in synthetic_fleet(hosts, ports, seed).items():
+        rows = [dict(UNCHECKED_FIELDS, **row) for row in rows]
+        documents[hostname] = json.dumps({"TABLE_interface": {"ROW_interface": rows}}).encode()
+    return(documents)
+
+
+def synthetic_overrides(count, sites=200, seed=1):
+    """ count overrides on "siteNNN-<role>NN" hostnames: exact hosts, site and role globs, and a few leading-* globs """
+    random.seed(seed)
+    overrides = []
+    for index in range(count):
+        site = f'site{ random.randrange(sites):03}'
+        role = random.choice(("core", "dist", "access"))
+        kind = index % 10
+        if kind < 6:
+            patterns = (f'{ site }-{ role }{ random.randrange(20):02}',)
+        elif kind < 9:
+            patterns = (f'{ site }-{ role }*',)
+        else:
+            patterns = (f'*-{ role }{ random.randrange(20):02}',)
+        overrides.append((patterns, {"cpu_state_idle": random.randint(5, 30)}))
+    return(overrides)
+
+
+def linear_matches(overrides, hostname):
+    # Every glob of every override tried in turn, the cost the trie avoids
+    return([index for index, (patterns, thresholds) in enumerate(overrides)
+            if any(fnmatch.fnmatchcase(hostname, pattern) for pattern in patterns)])
+
+
+def branch_template(names):
+    """ The per-check card templates joined into one {% if test == ... %} template, the way the cards were kept """
+    text = ""
+    for index, name in enumerate(names):
+        text += ('{%- if' if index == 0 else '{%- elif') + f' test == "{ name }" %}}\n'
+        text += CARD_TEMPLATES.loader.get_source(CARD_TEMPLATES, f'failed_{ name }_adaptive_card.j2')[0]
+    return(text + '{%- endif %}')
+
+
+def python_failures(fleet):
+    # The per-row dict lookups and int() casts the vectorized masks replace
+    failures = 0
+    for rows in fleet.values():
+        for intf in rows:
+            for rule in INTERFACE_RULES:
+                value = intf.get(rule.field)
+                if value:
+                    if rule.compare == "above":
+                        failures += int(value) > rule.threshold
+                    else:
+                        failures += value == rule.threshold
+    return(failures)
+
+
+def baseline_checks(documents):
+    # The original testcases: each check parsed every show interface again and built a table row per interface
+    failures = 0
+    for rule in INTERFACE_RULES:
+        for hostname, document in documents.items():
+            table_data = []
+            for intf in json.loads(document)['TABLE_interface']['ROW_interface']:
+                if rule.field in intf:
+                    counter = intf[rule.field]
+                    if counter:
+                        if rule.compare == "above":
+                            failed = int(counter) > rule.threshold
+                        elif rule.compare == "at_least":
+                            failed = int(counter) >= rule.threshold
+                        elif rule.compare == "at_most":
+                            failed = int(counter) <= rule.threshold
+                        elif rule.compare == "equals":
+                            failed = counter == rule.threshold
+                        else:
+                            failed = counter != rule.threshold
+                        table_data.append([hostname, intf['interface'], counter, 'Failed' if failed else 'Passed'])
+                        failures += failed
+                    else:
+                        table_data.append([hostname, intf, 'N/A', 'N/A'])
+    return(failures)
+
+
+def engine_checks(documents):
+    # Each show interface decoded once into records, then every rule in one pass per host
+    failures = 0
+    for hostname, document in documents.items():
+        records = interface_records(interface_rows(decode_snapshot("show interface", document)))
+        results, passed = evaluate_interfaces(hostname, records)
+        failures += sum(result.verdict == 'Failed' for host_results in results.values() for result in host_results)
+    return(failures)
+
+
+def timed(label, function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    print(f'{ label:<48}{ time.perf_counter() - start:>10.3f}s')
+    return(result)
+
+
+def traced(label, function, *args):
+    # Bytes allocated by function that are still held by its result
+    tracemalloc.start()
+    result = function(*args)
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f'{ label:<48}{ held / 2 ** 20:>10.1f}MB')
+    return(result, held)
+
+
+def peaked(label, function, *args):
+    # Peak traced memory over a call, above what its result keeps
+    tracemalloc.start()
+    result = function(*args)
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'{ label:<48}{ (peak - held) / 2 ** 20:>10.2f}MB')
+    return(result)
+
+###################################################################
+#                  BENCHMARKS SECTION                             #
+###################################################################
+
+def baseline_interfaces(hosts=20, ports=480):
+    documents = synthetic_documents(hosts, ports)
+    print(f'{ hosts * ports } interfaces, { len(INTERFACE_RULES) } rules')
+    fleet = {hostname: json.loads(document)["TABLE_interface"]["ROW_interface"] for hostname, document in documents.items()}
+    records = {hostname: interface_records(rows) for hostname, rows in fleet.items()}
+    checks = timed("  inline checks on parsed rows", python_failures, fleet)
+    timed("  row engine on records", evaluate_fleet_interfaces, sorted(records), records.get)
+    start = time.perf_counter()
+    before = timed("  baseline testcases, parse per check", baseline_checks, documents)
+    middle = time.perf_counter()
+    after = timed("  decode once, records and row engine", engine_checks, documents)
+    end = time.perf_counter()
+    assert before == after == checks
+    print(f'{ "  speedup over the baseline testcases":<48}{ (middle - start) / (end - middle):>10.1f}x')
+
+
+def interface_engines(hosts=250, ports=480):
+    fleet = synthetic_fleet(hosts, ports)
+    print(f'{ hosts * ports } interfaces, { len(INTERFACE_RULES) } rules')
+    timed("python threshold checks only", python_failures, fleet)
+    records = {hostname: interface_records(rows) for hostname, rows in fleet.items()}
+    rows = timed("row engine, one pass per host", evaluate_fleet_interfaces, sorted(records), records.get)
+    columns = timed("columns, build", InterfaceColumns, sorted(records), records.get)
+    masks = timed("columns, threshold masks only", lambda: [columns.failed(rule) for rule in INTERFACE_RULES])
+    assert sum(int(mask.sum()) for mask in masks) == python_failures(fleet)
+    results = timed("columns, threshold masks and result rows", evaluate_fleet_columns, columns)
+    assert results == rows
+
+
+def interface_memory(hosts=50, ports=480):
+    documents = synthetic_documents(hosts, ports)
+    interfaces = hosts * ports
+    print(f'{ interfaces } interfaces, { sum(map(len, documents.values())) / interfaces:.0f} JSON bytes each')
+    rows, row_bytes = traced("parsed ROW_interface dicts",
+                             lambda: {hostname: json.loads(document)["TABLE_interface"]["ROW_interface"]
+                                      for hostname, document in documents.items()})
+    del rows
+    records, record_bytes = traced("InterfaceRecords",
+                                   lambda: {hostname: interface_records(interface_rows(decode_snapshot("show interface", document)))
+                                            for hostname, document in documents.items()})
+    del records
+    # What a run keeps: the records plus the Failed and N/A results and the passed counts
+    reports, report_bytes = traced("HostReports",
+                                   lambda: {hostname: evaluate_host(hostname, {"show interface": decode_snapshot("show interface", document)})
+                                            for hostname, document in documents.items()})
+    failing = sum(len(results) for report in reports.values() for results in report.interfaces.values())
+    print(f'{ "bytes per interface, dicts / records / reports":<48}{ row_bytes / interfaces:>6.0f} / '
+          f'{ record_bytes / interfaces:.0f} / { report_bytes / interfaces:.0f}')
+    print(f'{ "Failed and N/A results per interface":<48}{ failing / interfaces:>6.2f}')
+
+
+def parsed_records(paths):
+    return({hostname: interface_records(interface_rows(decode_snapshot("show interface", path.read_bytes())))
+            for hostname, path in paths.items()})
+
+
+def streamed_records(paths):
+    records = {}
+    for hostname, path in paths.items():
+        with path.open("rb") as stream:
+            records[hostname] = interface_records(stream_interface_rows(stream))
+    return(records)
+
+
+def interface_streaming(ports=720):
+    # Peak memory above the records themselves, for growing fleets of large chassis
+    for hosts in (5, 20):
+        documents = synthetic_documents(hosts, ports)
+        with tempfile.TemporaryDirectory() as directory:
+            paths = {}
+            for hostname, document in documents.items():
+                paths[hostname] = Path(directory) / f'{ hostname } show interface.json'
+                paths[hostname].write_bytes(document)
+            print(f'{ hosts } hosts x { ports } ports, { max(map(len, documents.values())) / 2 ** 20:.1f}MB per document')
+            del documents
+            parsed = peaked("  peak above records, whole document", parsed_records, paths)
+            streamed = peaked("  peak above records, streamed rows", streamed_records, paths)
+            assert parsed == streamed
+
+
+def snapshot_decoding(hosts=2000):
+    random.seed(1)
+    resources = [json.dumps({"cpu_state_idle": f'{ random.uniform(5, 95):.2f}', "current_memory_status": "OK",
+                             "load_avg_15min": "0.40", "load_avg_5min": "0.42", "load_avg_1min": "0.51",
+                             "memory_usage_used": str(random.randint(10 ** 6, 10 ** 7)),
+                             "memory_usage_total": "16400000", "TABLE_cpu_usage": {"ROW_cpu_usage": [
+                                 {"cpuid": str(cpu), "user": "1.5", "kernel": "0.5", "idle": "98.0"}
+                                 for cpu in range(8)]}}).encode() for host in range(hosts)]
+    interfaces = list(synthetic_documents(hosts // 100, 480).values())
+    for command, documents in (("show system resources", resources), ("show interface", interfaces)):
+        schema = SNAPSHOT_SCHEMAS[command]
+        print(f'{ len(documents) } { command } documents')
+        if schema.struct is not None:
+            timed("  msgspec, decode and convert in one step", lambda: [decode_snapshot(command, document)
+                                                                        for document in documents])
+        timed("  json.loads, then convert", lambda: [convert(schema, json.loads(document))
+                                                      for document in documents])
+
+
+def threshold_overrides(hosts=2000):
+    hostnames = [f'site{ host // 10:03}-{ ("core", "dist", "access")[host % 3] }{ host % 20:02}' for host in range(hosts)]
+    for count in (10, 1000, 10000):
+        overrides = synthetic_overrides(count)
+        print(f'{ hosts } hosts, { count } overrides')
+        matcher = timed("  build the matcher", ThresholdOverrides, overrides)
+        tables = timed("  resolve every host, trie", lambda: [matcher.resolve(hostname)[0] for hostname in hostnames])
+        timed("  resolve every host again, cached", lambda: [matcher.resolve(hostname)[0] for hostname in hostnames])
+        matched = timed("  match every host, linear fnmatch", lambda: [linear_matches(overrides, hostname)
+                                                                       for hostname in hostnames])
+        for hostname, table, indexes in zip(hostnames, tables, matched):
+            expected = {}
+            for index in indexes:
+                expected.update(overrides[index][1])
+            assert table == expected, hostname
+
+
+def card_rendering(cards=200):
+    context = {"roomid": "room", "hostname": "sw001", "version": "9.3(7)", "resource": 42.5, "diskspace": 91.2,
+               "bin_file": "nxos.9.3.8.bin"}
+    names = [name for name in HOST_CHECKS if f'failed_{ name }_adaptive_card.j2' in CARD_TEMPLATES.list_templates()]
+    tests = [names[card % len(names)] for card in range(cards)]
+    print(f'{ cards } host check cards over { len(names) } templates')
+    with tempfile.TemporaryDirectory() as directory:
+        Path(directory, "branches.j2").write_text(branch_template(names))
+        shared = Environment(loader=FileSystemLoader(directory))
+        before = timed("  new Environment per card, branch template",
+                       lambda: [Environment(loader=FileSystemLoader(directory)).get_template("branches.j2").render(test=test, **context)
+                                for test in tests])
+        timed("  shared Environment, branch template",
+              lambda: [shared.get_template("branches.j2").render(test=test, **context) for test in tests])
+    after = timed("  card registry, per-check template",
+                  lambda: [render_card(f'failed_{ test }_adaptive_card.j2', **context) for test in tests])
+    assert [card.strip() for card in before] == [card.strip() for card in after]
+
+
+BENCHMARKS = {
+    "baseline_interfaces": baseline_interfaces,
+    "interface_engines": interface_engines,
+    "interface_memory": interface_memory,
+    "interface_streaming": interface_streaming,
+    "snapshot_decoding": snapshot_decoding,
+    "threshold_overrides": threshold_overrides,
+    "card_rendering": card_rendering,
+}
+
+if __name__ == '__main__':
+    for name in sys.argv[1:] or BENCHMARKS:
+        print(f'== { name } ==')
+        BENCHMARKS[name]()
@@ -0,0 +1,989 @@
+import io
+import os
+import re
+import sys
+import json
+import math
+import hashlib
+import logging
+import fnmatch
+import operator
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from pathlib import Path
+from nxpydocs_schemas import SnapshotDecodeError, as_list, decode_snapshot
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover
+    ijson = None
+
+try:
+    import yaml
+except ImportError:  # pragma: no cover
+    yaml = None
+
+# Get your logger for your script
+log = logging.getLogger(__name__)
+
+###################################################################
+#                  RULES FILE SECTION                             #
+###################################################################
+
+RULES_FILE = os.getenv("RULES_FILE", str(Path(__file__).resolve().parent / "nxpydocs_rules.yaml"))
+
+# One threshold check on a per-device metric from host_metrics
+HostCheck = namedtuple("HostCheck", "name metric label threshold compare")
+
+# One threshold check on a ROW_interface field of every port
+InterfaceRule = namedtuple("InterfaceRule", "name field label threshold compare")
+
+# Everything a rules file defines
+Rules = namedtuple("Rules", "host interface overrides")
+
+# One verdict of one check on one host; interface is None for host-level metrics and
+# the whole row when an interface counter is empty. Results are immutable, so they can
+# be built in any worker and handed to the notifiers without touching testcase state.
+CheckResult = namedtuple("CheckResult", "hostname interface metric value threshold verdict")
+
+# compare -> function of the threshold returning "does this value fail"; the reflected
+# operator keeps them plain C calls, and they work element-wise on numpy arrays too
+COMPARATORS = {
+    "above": lambda threshold: partial(operator.lt, threshold),
+    "at_least": lambda threshold: partial(operator.le, threshold),
+    "at_most": lambda threshold: partial(operator.ge, threshold),
+    "equals": lambda threshold: partial(operator.eq, threshold),
+    "not_equals": lambda threshold: partial(operator.ne, threshold),
+    "missing": lambda threshold: lambda values: threshold not in values,
+}
+# Comparisons that read the value as a number, so interface counters are stored as ints
+NUMERIC_COMPARATORS = frozenset(("above", "at_least", "at_most"))
+
+# The metrics host_metrics provides for host checks, and the kind of value each one is
+HOST_METRICS = {
+    "nxos_version": "text",
+    "kickstart_version": "text",
+    "cpu_state_idle": "number",
+    "current_memory_status": "text",
+    "load_avg_15min": "number",
+    "load_avg_5min": "number",
+    "load_avg_1min": "number",
+    "memory_percentage": "number",
+    "diskspace_percentage": "number",
+    "files": "list",
+}
+# kind -> (the compares that work on it, the types its thresholds may have, what to call them)
+VALUE_KINDS = {
+    "text": (frozenset(("equals", "not_equals")), (str,), "a string"),
+    "number": (NUMERIC_COMPARATORS | {"equals", "not_equals"}, (int, float), "a number"),
+    "list": (frozenset(("missing",)), (str,), "a string"),
+}
+
+
+@lru_cache(maxsize=None)
+def predicate(compare, threshold):
+    """ The compiled failure test for compare and threshold, built once per pair """
+    return(COMPARATORS[compare](threshold))
+
+
+def threshold_error(compare, kind, threshold):
+    """ Why compare and threshold do not fit a kind of value, or None when they do """
+    compares, types, description = VALUE_KINDS[kind]
+    if compare not in compares:
+        return(f'compares a { kind } value with { compare }; use { ", ".join(sorted(compares)) }')
+    # bool is an int, but a true/false threshold is a typo for a number or a string
+    if isinstance(threshold, bool) or not isinstance(threshold, types):
+        return(f'needs { description } threshold to compare with { compare }, got { repr(threshold) }')
+    return(None)
+
+
+def load_rules(path):
+    """ Rules(host checks, interface rules) from a YAML or JSON rules file
+
+    Every check is validated and its predicate compiled here, once, so a
+    bad rules file stops the run before any device is checked. Host
+    metrics have a fixed kind; an interface field is a number when some
+    rule compares it with above, at_least or at_most, and text otherwise.
+    """
+    path = Path(path)
+    text = path.read_text()
+    if path.suffix == ".json":
+        data = json.loads(text)
+    elif yaml is None:
+        raise ImportError(f'{ path } needs PyYAML; install it or use a .json rules file')
+    else:
+        data = yaml.safe_load(text)
+    data = data or {}
+    checks = {"host": [], "interface": []}
+    names = set()
+    for kind, build, key in (("host", HostCheck, "metric"), ("interface", InterfaceRule, "field")):
+        for name, spec in (data.get(kind) or {}).items():
+            missing = [field for field in (key, "compare", "threshold") if field not in spec]
+            if missing:
+                raise ValueError(f'{ path }: { kind } check { name } has no { ", ".join(missing) }')
+            check = build(name, spec[key], spec.get("label", name), spec["threshold"], spec["compare"])
+            if check.compare not in COMPARATORS:
+                raise ValueError(f'{ path }: { kind } check { name } has unknown compare { check.compare }')
+            if kind == "host" and check.metric not in HOST_METRICS:
+                raise ValueError(f'{ path }: host check { name } has unknown metric { check.metric }')
+            checks[kind].append(check)
+    counters = {rule.field for rule in checks["interface"] if rule.compare in NUMERIC_COMPARATORS}
+    kinds = {check.name: HOST_METRICS[check.metric] for check in checks["host"]}
+    kinds.update({rule.name: "number" if rule.field in counters else "text" for rule in checks["interface"]})
+    compares = {check.name: check.compare for check in checks["host"] + checks["interface"]}
+    for kind in ("host", "interface"):
+        for check in checks[kind]:
+            error = threshold_error(check.compare, kinds[check.name], check.threshold)
+            if error:
+                raise ValueError(f'{ path }: { kind } check { check.name } { error }')
+            predicate(check.compare, check.threshold)
+    groups = data.get("groups") or {}
+    overrides = []
+    for number, spec in enumerate(data.get("overrides") or [], 1):
+        patterns = list(as_patterns(spec.get("hosts")))
+        for group in as_patterns(spec.get("group")):
+            if group not in groups:
+                raise ValueError(f'{ path }: override { number } names unknown group { group }')
+            patterns.extend(as_patterns(groups[group]))
+        thresholds = spec.get("thresholds") or {}
+        if not patterns or not thresholds:
+            raise ValueError(f'{ path }: override { number } needs hosts or group, and thresholds')
+        for name, threshold in thresholds.items():
+            if name not in compares:
+                raise ValueError(f'{ path }: override { number } sets unknown check { name }')
+            error = threshold_error(compares[name], kinds[name], threshold)
+            if error:
+                raise ValueError(f'{ path }: override { number } check { name } { error }')
+            predicate(compares[name], threshold)
+        overrides.append((tuple(patterns), dict(thresholds)))
+    return(Rules(tuple(checks["host"]), tuple(checks["interface"]),
+                 ThresholdOverrides(overrides, tuple(checks["interface"]))))
+
+
+def as_patterns(value):
+    """ A hosts or group entry, which may be one name or a list of them """
+    if value is None:
+        return(())
+    if isinstance(value, str):
+        return((value,))
+    return(tuple(value))
+
+
+###################################################################
+#                  THRESHOLD OVERRIDES SECTION                    #
+###################################################################
+
+# Characters that start the wildcard part of a hostname glob, and that can end it
+WILDCARDS = "*?["
+WILDCARD_ENDS = "*?]"
+
+
+class HostMatcher(object):
+    """ Every value whose hostname glob matches a host, without trying each glob
+
+    Globs without wildcards are looked up in a dict. The others are
+    filed with a compiled regex in a trie under their literal prefix,
+    the text before the first wildcard, or when that is empty in a
+    second trie under their reversed literal suffix ("*-core01"). A
+    lookup walks both tries along the hostname and only tests the globs
+    whose prefix or suffix the hostname has, so its cost follows the
+    hostname length and not the number of globs; only globs with a
+    wildcard at both ends ("*core*") are tested for every host.
+    """
+
+    def __init__(self):
+        self.exact = {}
+        # {character: node}, with the (regex match, value) pairs filed at a node under None
+        self.prefixes = {}
+        self.suffixes = {}
+
+    def add(self, pattern, value):
+        starts = [pattern.index(char) for char in WILDCARDS if char in pattern]
+        if not starts:
+            self.exact.setdefault(pattern, []).append(value)
+            return
+        entry = (re.compile(fnmatch.translate(pattern)).match, value)
+        prefix = pattern[:min(starts)]
+        suffix = pattern[max((pattern.rindex(char) for char in WILDCARD_ENDS if char in pattern), default=-1) + 1:]
+        if prefix or not suffix or "[" in suffix:
+            trie_add(self.prefixes, prefix, entry)
+        else:
+            trie_add(self.suffixes, suffix[::-1], entry)
+
+    def match(self, hostname):
+        values = list(self.exact.get(hostname, ()))
+        trie_walk(self.prefixes, hostname, hostname, values)
+        trie_walk(self.suffixes, hostname[::-1], hostname, values)
+        return(values)
+
+
+def trie_add(trie, key, entry):
+    node = trie
+    for char in key:
+        node = node.setdefault(char, {})
+    node.setdefault(None, []).append(entry)
+
+
+def trie_walk(trie, key, hostname, values):
+    """ Add the values of the entries filed along key whose glob matches hostname """
+    node = trie
+    for char in key:
+        values.extend(value for matches, value in node.get(None, ()) if matches(hostname))
+        node = node.get(char)
+        if node is None:
+            return
+    values.extend(value for matches, value in node.get(None, ()) if matches(hostname))
+
+
+class ThresholdOverrides(object):
+    """ Thresholds that differ by host, from the groups and overrides of a rules file
+
+    overrides is ((hostname globs, {check name: threshold}), ...), with
+    each group already expanded into its globs; when several overrides
+    match a host, the later one in the file wins. Each host is resolved
+    once into its effective table, and hosts matching the same overrides
+    share one table and one tuple of interface rules.
+    """
+
+    def __init__(self, overrides=(), interface_rules=()):
+        self.overrides = tuple(overrides)
+        self.rules = tuple(interface_rules)
+        self.matcher = HostMatcher()
+        for index, (patterns, thresholds) in enumerate(self.overrides):
+            for pattern in patterns:
+                self.matcher.add(pattern, index)
+        self.hosts = {}
+        self.tables = {}
+
+    def __bool__(self):
+        return(bool(self.overrides))
+
+    def resolve(self, hostname):
+        """ ({check name: threshold}, interface rules) in effect on hostname """
+        entry = self.hosts.get(hostname)
+        if entry is None:
+            matched = tuple(sorted(set(self.matcher.match(hostname))))
+            entry = self.tables.get(matched)
+            if entry is None:
+                table = {}
+                for index in matched:
+                    table.update(self.overrides[index][1])
+                rules = tuple(rule._replace(threshold=table[rule.name]) if rule.name in table else rule
+                              for rule in self.rules)
+                entry = self.tables[matched] = (table, rules)
+            self.hosts[hostname] = entry
+        return(entry)
+
+    def threshold(self, hostname, check):
+        """ The threshold of a host check or interface rule on hostname """
+        return(self.resolve(hostname)[0].get(check.name, check.threshold))
+
+    def interface_rules(self, hostname):
+        return(self.resolve(hostname)[1])
+
+    def overridden(self, name):
+        """ Whether some hosts have their own threshold for the check or rule called name """
+        return(any(name in thresholds for patterns, thresholds in self.overrides))
+
+
+RULES = load_rules(RULES_FILE)
+HOST_CHECKS = {check.name: check for check in RULES.host}
+INTERFACE_RULES = RULES.interface
+INTERFACE_RULES_BY_NAME = {rule.name: rule for rule in INTERFACE_RULES}
+OVERRIDES = RULES.overrides
+
+
+def rules_version(rules, overrides=None):
+    """ Short hash of a rule set and its overrides; saved verdicts are only reused under the same rules """
+    data = [list(rule) for rule in rules]
+    if overrides:
+        data.append([[list(patterns), thresholds] for patterns, thresholds in overrides.overrides])
+    return(hashlib.sha1(json.dumps(data).encode()).hexdigest()[:12])
+
+
+RULES_VERSION = rules_version(INTERFACE_RULES, OVERRIDES)
+
+
+def interface_rows(show_interface):
+    """ ROW_interface of a decoded show interface, always as a list """
+    if not show_interface or show_interface.TABLE_interface is None:
+        return([])
+    return(as_list(show_interface.TABLE_interface.ROW_interface))
+
+
+# ijson prefixes of ROW_interface as a single row and as a list of rows
+ROW_INTERFACE_PREFIXES = ("TABLE_interface.ROW_interface", "TABLE_interface.ROW_interface.item")
+# ijson turns each read buffer into a batch of events at once, so this bounds
+# the events in flight; 64KB (the ijson default) holds about 1MB of them
+STREAM_BUFFER_SIZE = 8 * 1024
+
+
+def stream_interface_rows(stream):
+    """ Yield the ROW_interface dicts of a show interface JSON stream one at a time
+
+    With ijson installed, only the row being built is ever held in memory,
+    however large the document is. Without it the stream is parsed whole.
+    """
+    if ijson is None:
+        yield from interface_rows(decode_snapshot("show interface", stream.read()))
+        return
+    builder = None
+    try:
+        for prefix, event, value in ijson.parse(stream, buf_size=STREAM_BUFFER_SIZE, use_float=True):
+            if builder is None:
+                if event == "start_map" and prefix in ROW_INTERFACE_PREFIXES:
+                    builder = ijson.ObjectBuilder()
+                    row_prefix = prefix
+                    builder.event(event, value)
+            elif event == "end_map" and prefix == row_prefix:
+                yield builder.value
+                builder = None
+            else:
+                builder.event(event, value)
+    except ijson.JSONError as error:
+        raise SnapshotDecodeError("show interface", str(error)) from error
+
+###################################################################
+#                  INTERFACE RECORDS SECTION                      #
+###################################################################
+
+# The ROW_interface fields the rules read, in rule order, and whether each is a counter
+INTERFACE_FIELDS = tuple(dict.fromkeys(rule.field for rule in INTERFACE_RULES))
+COUNTER_FIELDS = frozenset(rule.field for rule in INTERFACE_RULES if rule.compare in NUMERIC_COMPARATORS)
+
+
+class InterfaceRecord(object):
+    """ The fields of one ROW_interface the checks read, and nothing else
+
+    Counters are stored as ints and the interface name and string fields
+    are interned, so the same "full" or "Ethernet1/1" is shared by every
+    record in the fleet. A field the row lacks is None and an empty one
+    is "", which keeps the N/A rows; only rows with an empty field keep
+    their original dict, because the report shows the whole row for them.
+    """
+
+    __slots__ = ("interface", "row") + INTERFACE_FIELDS
+
+    def __init__(self, interface, values, row=None):
+        self.interface = sys.intern(interface) if isinstance(interface, str) else interface
+        self.row = row
+        for field, value in zip(INTERFACE_FIELDS, values):
+            if isinstance(value, str):
+                value = sys.intern(value)
+            setattr(self, field, value)
+
+    @classmethod
+    def from_row(cls, row):
+        values = []
+        empty = False
+        for field in INTERFACE_FIELDS:
+            value = row.get(field)
+            if field not in row:
+                value = None
+            elif not value:
+                value = ""
+                empty = True
+            elif field in COUNTER_FIELDS:
+                try:
+                    value = int(value)
+                except (TypeError, ValueError):
+                    raise SnapshotDecodeError("show interface", f'Expected `int`, got { value !r} - at '
+                                              f'`{ field }` of { row.get("interface") }') from None
+            values.append(value)
+        return(cls(row.get('interface'), values, row if empty else None))
+
+    def values(self):
+        return([getattr(self, field) for field in INTERFACE_FIELDS])
+
+    def __reduce__(self):
+        # Rebuilt through __init__ so names are interned again in the receiving process
+        return(InterfaceRecord, (self.interface, self.values(), self.row))
+
+    def __eq__(self, other):
+        return(isinstance(other, InterfaceRecord) and
+               (self.interface, self.row, self.values()) == (other.interface, other.row, other.values()))
+
+    def __repr__(self):
+        return(f'InterfaceRecord({ self.interface !r})')
+
+
+def interface_records(rows):
+    """ Compact InterfaceRecords for a host's ROW_interface dicts """
+    return([InterfaceRecord.from_row(row) for row in rows])
+
+
+def evaluate_interfaces(hostname, records, rules=INTERFACE_RULES):
+    """ Evaluate every rule in a single pass over a host's InterfaceRecords
+
+    Returns ({rule name: [CheckResult, ...]}, {rule name: passed count}).
+    Only the Failed and N/A rows become CheckResults, in row order; the
+    rows that pass, nearly all of them, are only counted.
+    """
+    results = {rule.name: [] for rule in rules}
+    missing = dict.fromkeys(results, 0)
+    checks = [(rule.name, operator.attrgetter(rule.field), predicate(rule.compare, rule.threshold), rule.threshold,
+               results[rule.name]) for rule in rules]
+    for record in records:
+        for metric, field, failed, threshold, out in checks:
+            value = field(record)
+            if value is None:
+                missing[metric] += 1
+            elif value == "":
+                out.append(CheckResult(hostname, record.row, metric, 'N/A', threshold, 'N/A'))
+            elif failed(value):
+                out.append(CheckResult(hostname, record.interface, metric, value, threshold, 'Failed'))
+    passed = {metric: len(records) - missing[metric] - len(out) for metric, out in results.items()}
+    return(results, passed)
+
+
+def evaluate_fleet_interfaces(hostnames, records_for, rules=INTERFACE_RULES):
+    """ ({rule name: {hostname: [CheckResult, ...]}}, {rule name: {hostname: passed count}}) for the whole fleet """
+    fleet = {rule.name: {} for rule in rules}
+    fleet_passed = {rule.name: {} for rule in rules}
+    for hostname in hostnames:
+        results, passed = evaluate_interfaces(hostname, records_for(hostname), rules)
+        for rule_name in results:
+            fleet[rule_name][hostname] = results[rule_name]
+            fleet_passed[rule_name][hostname] = passed[rule_name]
+    return(fleet, fleet_passed)
+
+###################################################################
+#                  HOST EVALUATION SECTION                        #
+###################################################################
+
+# Snapshot commands a host report is built from
+HOST_COMMANDS = ("show version", "show system resources", "show interface", "dir")
+
+# Everything the checks need from one host; small enough to cross a process boundary.
+# interfaces holds the Failed and N/A CheckResults of each rule and passed counts the
+# rest, records are the host's InterfaceRecords, kept to re-check other thresholds, and
+# errors are the messages of the snapshots that did not decode or held values no check can
+# compare, or of whatever else stopped the host from being evaluated.
+HostReport = namedtuple("HostReport", "hostname metrics interfaces passed records errors")
+
+
+def host_metrics(show_version, show_system_resources, dir, errors=None):
+    """ The scalar values the Version, Resource and Directory checks compare
+
+    Takes the typed documents from decode_snapshot, so every value
+    already has its type. A value no check can compare, a float that is
+    NaN or infinite or a total that is not above zero, is left out, so
+    its check shows N/A, and a SnapshotDecodeError message naming the
+    field is appended to errors.
+    """
+    metrics = {}
+    errors = [] if errors is None else errors
+    if show_version:
+        metrics["nxos_version"] = show_version.nxos_ver_str
+        metrics["kickstart_version"] = show_version.kickstart_ver_str
+    if show_system_resources:
+        metrics["current_memory_status"] = show_system_resources.current_memory_status
+        for field in ("cpu_state_idle", "load_avg_15min", "load_avg_5min", "load_avg_1min"):
+            value = getattr(show_system_resources, field)
+            if math.isfinite(value):
+                metrics[field] = value
+            else:
+                errors.append(invalid_value("show system resources", field, "a finite `float`", value))
+        if show_system_resources.memory_usage_total > 0:
+            metrics["memory_percentage"] = (show_system_resources.memory_usage_used
+                                            / show_system_resources.memory_usage_total * 100)
+        else:
+            errors.append(invalid_value("show system resources", "memory_usage_total", "a total above 0",
+                                        show_system_resources.memory_usage_total))
+    if dir:
+        if dir.bytestotal > 0:
+            metrics["diskspace_percentage"] = dir.bytesused / dir.bytestotal * 100
+        else:
+            errors.append(invalid_value("dir", "bytestotal", "a total above 0", dir.bytestotal))
+        rows = as_list(dir.TABLE_dir.ROW_dir) if dir.TABLE_dir is not None else []
+        metrics["files"] = [item.fname for item in rows if item.fname is not None]
+    return(metrics)
+
+
+def invalid_value(command, field, expected, value):
+    # Worded like the decode errors, which name the field by its path
+    return(str(SnapshotDecodeError(command, f'Expected { expected }, got `{ value }` - at `$.{ field }`')))
+
+
+def evaluate_host(hostname, documents, rules=INTERFACE_RULES, rows=None, errors=()):
+    """ HostReport from a host's parsed documents, keyed by command
+
+    rows, when given, is an iterable of ROW_interface dicts used instead
+    of a parsed show interface document, such as stream_interface_rows.
+    errors are the decode errors of snapshots left out of documents; a
+    show interface that fails to decode is added to them and leaves the
+    host without interface rows, while its other checks still run.
+    """
+    errors = list(errors)
+    metrics = host_metrics(documents.get("show version"),
+                           documents.get("show system resources"),
+                           documents.get("dir"), errors)
+    if rows is None:
+        rows = interface_rows(documents.get("show interface"))
+    try:
+        records = interface_records(rows)
+    except SnapshotDecodeError as error:
+        errors.append(str(error))
+        records = []
+    interfaces = passed = None
+    if rules:
+        interfaces, passed = evaluate_interfaces(hostname, records, rules)
+    return(HostReport(hostname, metrics, interfaces, passed, records, tuple(errors)))
+
+
+def describe_error(error):
+    """ The HostReport.errors message of an error raised while evaluating a host """
+    if isinstance(error, SnapshotDecodeError):
+        return(str(error))
+    return(f'{ type(error).__name__ }: { error }')
+
+
+def failed_report(hostname, rules, error):
+    """ HostReport of a host that could not be evaluated, whose checks all show N/A """
+    interfaces = passed = None
+    if rules:
+        interfaces = {rule.name: [] for rule in rules}
+        passed = {rule.name: 0 for rule in rules}
+    return(HostReport(hostname, {}, interfaces, passed, [], (describe_error(error),)))
+
+
+def evaluate_host_snapshots(hostname, snapshots, stream=False, engine="rows"):
+    """ Process pool entry point: parse one host's snapshots and evaluate it
+
+    snapshots maps each command to the file holding its body, read here
+    so the parent never loads it, or to the body's bytes.
+    Only the compact HostReport is sent back to the parent process; the
+    parsed documents die with the task. Any error is sent back in the
+    report, so one host cannot stop the pool. With the columns engine only
+    the records come back, for the parent to check the fleet at once.
+    """
+    rules = None if engine == "columns" else OVERRIDES.interface_rules(hostname)
+    try:
+        return(evaluate_raw_snapshots(hostname, snapshots, rules, stream))
+    except Exception as error:
+        return(failed_report(hostname, rules, error))
+
+
+def evaluate_raw_snapshots(hostname, snapshots, rules, stream=False):
+    documents = {}
+    errors = []
+    for command, content in snapshots.items():
+        if stream and command == "show interface":
+            continue
+        if isinstance(content, Path):
+            content = content.read_bytes()
+        if content:
+            try:
+                documents[command] = decode_snapshot(command, content)
+            except SnapshotDecodeError as error:
+                errors.append(str(error))
+    if not stream:
+        return(evaluate_host(hostname, documents, rules, errors=errors))
+    content = snapshots.get("show interface") or b'{}'
+    with (content.open("rb") if isinstance(content, Path) else io.BytesIO(content)) as rows:
+        return(evaluate_host(hostname, documents, rules, rows=stream_interface_rows(rows), errors=errors))
+
+
+def worker_report(hostname, rules, future):
+    try:
+        return(future.result())
+    except Exception as error:
+        # The worker died or the report could not be sent back
+        return(failed_report(hostname, rules, error))
+
+
+class FleetEvaluator(object):
+    """ Builds a HostReport for every host once per run
+
+    Snapshots are fetched a window of hosts at a time, with fetch_workers
+    threads, just before those hosts are evaluated; the window's blob
+    cache entries are pinned until each host is done, so a fleet larger
+    than the cache is still downloaded once. With workers > 0, parsing
+    and rule evaluation are spread over a ProcessPoolExecutor. Hosts are
+    handed over one at a time, with at most two per worker waiting, as
+    the paths of their snapshot files when those are on disk, so neither
+    process holds the whole fleet.
+    Otherwise hosts are evaluated in this process from the shared
+    document cache, and each host's documents and bodies are dropped
+    once it is evaluated. Either way, the rows engine checks each host
+    as it is evaluated and the columns engine checks the whole fleet's
+    records at the end. With stream, show interface is never parsed
+    whole; its rows are streamed into the records one at a time. With a
+    RunState, hosts whose snapshot SHAs and rules match the previous run
+    reuse its reports and only the stale hosts are fetched and evaluated.
+    """
+
+    def __init__(self, snapshots, workers=0, engine="rows", stream=False, state=None, fetch_workers=1):
+        self.snapshots = snapshots
+        self.workers = workers
+        self.fetch_workers = fetch_workers
+        self.fetch_errors = {}
+        self.engine = engine
+        self.stream = stream
+        self.state = state
+        self.reports = None
+        self.columns = None
+        self.fingerprints = None
+        self.reused = None
+        self.stale = None
+
+    def snapshot_shas(self, hostname):
+        shas = {}
+        for command in HOST_COMMANDS:
+            blob = self.snapshots.blob(hostname, command)
+            if blob is None:
+                continue
+            try:
+                shas[command] = blob.sha
+            except Exception:
+                # Matches no saved SHA, so the host is evaluated and the error reported there
+                shas[command] = None
+        return(shas)
+
+    def plan(self):
+        """ Hostnames that have to be fetched and evaluated this run """
+        if self.stale is None:
+            hostnames = self.snapshots.hostnames()
+            self.reused = {}
+            if self.state is not None:
+                self.fingerprints = {hostname: self.snapshot_shas(hostname) for hostname in hostnames}
+                self.reused = self.state.reports(self.fingerprints)
+            self.stale = [hostname for hostname in hostnames if hostname not in self.reused]
+            # Whatever listing the snapshots loaded for the reused hosts is never read
+            for hostname in self.reused:
+                self.snapshots.release(hostname)
+        return(self.stale)
+
+    def evaluate(self):
+        if self.reports is not None:
+            return(self.reports)
+        hostnames = self.plan()
+        if self.workers > 0 and hostnames:
+            reports = self.evaluate_workers(hostnames)
+        else:
+            reports = [self.host_report(hostname, self.interface_rules(hostname)) for hostname in self.fetched(hostnames)]
+        if self.engine == "columns":
+            # The hosts only brought back their records; every host is checked here in one go
+            reports += self.reused.values()
+            records = {report.hostname: report.records for report in reports}
+            self.columns = InterfaceColumns(sorted(records), records.get)
+            fleet, fleet_passed = evaluate_fleet_columns(self.columns, overrides=OVERRIDES)
+            reports = [report._replace(interfaces={rule: by_host[report.hostname] for rule, by_host in fleet.items()},
+                                       passed={rule: by_host[report.hostname] for rule, by_host in fleet_passed.items()})
+                       for report in reports]
+        reports = dict(self.reused, **{report.hostname: report for report in reports})
+        self.reports = {hostname: reports[hostname] for hostname in sorted(reports)}
+        if self.state is not None:
+            self.state.save(self.fingerprints, self.reports)
+        return(self.reports)
+
+    def interface_rules(self, hostname):
+        # None with the columns engine, which checks the records of the whole fleet at once
+        return(None if self.engine == "columns" else OVERRIDES.interface_rules(hostname))
+
+    def fetched(self, hostnames):
+        """ Yield hostnames, fetching each window of them just before it is evaluated
+
+        Bodies read through open() or by the workers are only spooled to
+        the blob cache, the others are held until their host is done. The
+        hosts are pinned in the cache until unpinned once evaluated.
+        """
+        size = max(1, self.fetch_workers) * 4
+        spooled = self.snapshots.streamed if self.workers == 0 else HOST_COMMANDS
+        for start in range(0, len(hostnames), size):
+            window = hostnames[start:start + size]
+            for hostname in window:
+                self.snapshots.pin(hostname)
+            self.fetch_errors.update(self.snapshots.prefetch(
+                [command for command in HOST_COMMANDS if command not in spooled], self.fetch_workers, hostnames=window))
+            self.fetch_errors.update(self.snapshots.prefetch(spooled, self.fetch_workers, keep=False, hostnames=window))
+            yield from window
+
+    def evaluate_workers(self, hostnames):
+        reports = []
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            for hostname in self.fetched(hostnames):
+                rules = self.interface_rules(hostname)
+                try:
+                    snapshots = self.worker_snapshots(hostname)
+                except Exception as error:
+                    self.snapshots.unpin(hostname)
+                    reports.append(failed_report(hostname, rules, error))
+                    continue
+                pending.append((hostname, rules, executor.submit(evaluate_host_snapshots, hostname, snapshots,
+                                                                 self.stream, self.engine)))
+                del snapshots
+                self.snapshots.release(hostname)
+                while len(pending) > self.workers * 2:
+                    reports.append(self.collect(*pending.popleft()))
+            reports.extend(self.collect(*entry) for entry in pending)
+        return(reports)
+
+    def collect(self, hostname, rules, future):
+        # The worker has read the host's files, so the cache may evict them again
+        report = worker_report(hostname, rules, future)
+        self.snapshots.unpin(hostname)
+        return(report)
+
+    def worker_snapshots(self, hostname):
+        """ {command: file path or bytes} of the host's snapshots, for evaluate_host_snapshots """
+        snapshots = {}
+        for command in HOST_COMMANDS:
+            blob = self.snapshots.blob(hostname, command)
+            if blob is not None:
+                # Spooled to the blob cache when there is one, so only the path is sent
+                blob.spool()
+                snapshots[command] = blob.location or blob.content
+        return(snapshots)
+
+    def host_report(self, hostname, rules=INTERFACE_RULES):
+        """ evaluate_host, then drop the host's documents and bodies, which nothing reads once its report exists """
+        report = self.evaluate_host(hostname, rules)
+        self.snapshots.release(hostname)
+        self.snapshots.unpin(hostname)
+        return(report)
+
+    def evaluate_host(self, hostname, rules=INTERFACE_RULES):
+        """ The host's HostReport; an error fetching or reading its snapshots only fails this host """
+        try:
+            return(self.build_report(hostname, rules))
+        except Exception as error:
+            return(failed_report(hostname, rules, error))
+
+    def build_report(self, hostname, rules):
+        errors = []
+        if not self.stream:
+            return(evaluate_host(hostname, self.documents(hostname, errors=errors), rules, errors=errors))
+        documents = self.documents(hostname, [command for command in HOST_COMMANDS if command != "show interface"],
+                                   errors)
+        stream = self.snapshots.open(hostname, "show interface")
+        if stream is None:
+            return(evaluate_host(hostname, documents, rules, rows=[], errors=errors))
+        with stream:
+            return(evaluate_host(hostname, documents, rules, rows=stream_interface_rows(stream), errors=errors))
+
+    def documents(self, hostname, commands=HOST_COMMANDS, errors=None):
+        """ {command: document}, leaving out snapshots that do not decode
+
+        Their errors are appended to errors, or raised when it is None.
+        """
+        documents = {}
+        for command in commands:
+            try:
+                documents[command] = self.snapshots.document(hostname, command)
+            except SnapshotDecodeError as error:
+                if errors is None:
+                    raise
+                errors.append(str(error))
+        return(documents)
+
+    @property
+    def errors(self):
+        """ {hostname: (error, ...)} for the hosts with snapshots that could not be fetched or decoded """
+        return({hostname: report.errors for hostname, report in self.evaluate().items() if report.errors})
+
+    def interface_records(self, hostname):
+        return(self.report(hostname).records)
+
+    def report(self, hostname):
+        return(self.evaluate()[hostname])
+
+    def metric(self, hostname, name):
+        return(self.report(hostname).metrics.get(name))
+
+    def interface_results(self, rule):
+        """ {hostname: ([Failed and N/A CheckResult, ...], passed count)} for rule
+
+        With the default threshold each host is checked against its own,
+        overrides included; any other threshold is re-evaluated and applies
+        to every host.
+        """
+        if rule == INTERFACE_RULES_BY_NAME.get(rule.name):
+            return({hostname: (report.interfaces[rule.name], report.passed[rule.name])
+                    for hostname, report in self.evaluate().items()})
+        if self.columns is not None:
+            fleet, fleet_passed = evaluate_fleet_columns(self.columns, [rule])
+        else:
+            fleet, fleet_passed = evaluate_fleet_interfaces(self.evaluate(), self.interface_records, [rule])
+        return({hostname: (results, fleet_passed[rule.name][hostname]) for hostname, results in fleet[rule.name].items()})
+
+###################################################################
+#                  RUN STATE SECTION                              #
+###################################################################
+
+# Bumped whenever HostReport or the way it is built changes
+RUN_STATE_VERSION = 2
+
+
+class RunState(object):
+    """ Each host's snapshot SHAs and HostReport from the previous run, kept as JSON
+
+    A host whose snapshots all have the same blob SHAs, evaluated under
+    the same rules, gets the same report again, so its saved report is
+    reused and the host is neither fetched nor parsed. A file written
+    under another rules version or format is ignored as a whole.
+    """
+
+    def __init__(self, path=None, rules_version=RULES_VERSION):
+        self.path = Path(path) if path else None
+        self.rules_version = rules_version
+        self.hosts = {}
+        self.reused = 0
+        self.evaluated = 0
+        if self.path and self.path.is_file():
+            try:
+                state = json.loads(self.path.read_text())
+            except ValueError:
+                log.warning(f'Ignoring unreadable run state { self.path }')
+            else:
+                if (state.get("version"), state.get("rules")) == (RUN_STATE_VERSION, self.rules_version):
+                    self.hosts = state["hosts"]
+
+    def snapshots(self):
+        """ {hostname: {command: blob SHA}} of the saved reports """
+        return({hostname: entry["snapshots"] for hostname, entry in self.hosts.items()})
+
+    def reports(self, fingerprints):
+        """ {hostname: HostReport} saved for the hosts whose snapshot SHAs did not change """
+        reports = {}
+        for hostname, shas in fingerprints.items():
+            entry = self.hosts.get(hostname)
+            if entry is not None and entry["snapshots"] == shas:
+                reports[hostname] = decode_report(hostname, entry)
+        self.reused = len(reports)
+        self.evaluated = len(fingerprints) - len(reports)
+        return(reports)
+
+    def save(self, fingerprints, reports):
+        # Reports with errors are left out, so a failed fetch is retried next run
+        self.hosts = {hostname: dict(encode_report(report), snapshots=fingerprints[hostname])
+                      for hostname, report in reports.items() if not report.errors}
+        if self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f'{ self.path.name }.{ os.getpid() }.tmp')
+            tmp_path.write_text(json.dumps({"version": RUN_STATE_VERSION, "rules": self.rules_version,
+                                            "hosts": self.hosts}))
+            os.replace(tmp_path, self.path)
+
+    def report(self):
+        return(f'Run state reused { self.reused } host reports, evaluated { self.evaluated } changed hosts')
+
+
+def encode_report(report):
+    """ A HostReport as JSON-ready lists and dicts """
+    return({"metrics": report.metrics,
+            "interfaces": report.interfaces,
+            "passed": report.passed,
+            "records": [[record.interface, record.values(), record.row] for record in report.records],
+            "errors": report.errors})
+
+
+def decode_report(hostname, entry):
+    interfaces = {rule: [CheckResult(*result) for result in results]
+                  for rule, results in entry["interfaces"].items()}
+    records = [InterfaceRecord(*record) for record in entry["records"]]
+    return(HostReport(hostname, entry["metrics"], interfaces, entry["passed"], records, tuple(entry["errors"])))
+
+###################################################################
+#                  INTERFACE COLUMNS SECTION                      #
+###################################################################
+
+# Per-row state of a field in InterfaceColumns.state
+MISSING, EMPTY, PRESENT = 0, 1, 2
+
+
+class InterfaceColumns(object):
+    """ Fleet InterfaceRecords as columns, for vectorized threshold checks
+
+    Every counter field becomes one int64 array and every string field
+    one object array, aligned with the host_index and interfaces
+    columns. A per-field int8 state array masks rows that lack the field
+    (MISSING) or carry an empty value (EMPTY). Only the few EMPTY rows
+    keep their original dict, because the report shows the whole row for
+    them.
+    """
+
+    def __init__(self, hostnames, records_for, rules=INTERFACE_RULES):
+        if np is None:
+            raise ImportError("InterfaceColumns requires numpy")
+        self.hostnames = list(hostnames)
+        host_records = [records_for(hostname) for hostname in self.hostnames]
+        records = [record for host in host_records for record in host]
+        self.host_index = np.repeat(np.arange(len(self.hostnames), dtype=np.int32), [len(host) for host in host_records])
+        self.interfaces = [record.interface for record in records]
+        self.empty_rows = {row: record.row for row, record in enumerate(records) if record.row is not None}
+        self.values = {}
+        self.state = {}
+        for field, numeric in {rule.field: rule.compare in NUMERIC_COMPARATORS for rule in rules}.items():
+            column = list(map(operator.attrgetter(field), records))
+            state = np.full(len(column), PRESENT, dtype=np.int8)
+            # Most fields are on every row, and then the list converts in one step
+            if column.count(None) or column.count(""):
+                objects = np.array(column, dtype=object)
+                state[np.equal(objects, None)] = MISSING
+                state[np.equal(objects, "")] = EMPTY
+                column = np.where(state == PRESENT, objects, 0 if numeric else None)
+            self.values[field] = np.array(column, dtype=np.int64 if numeric else object)
+            self.state[field] = state
+
+    def __len__(self):
+        return(len(self.interfaces))
+
+    def failed(self, rule, threshold=None):
+        """ Boolean mask of rows failing rule, as one vectorized comparison
+
+        threshold replaces the rule's; a list of one threshold per host is
+        spread over each host's rows first.
+        """
+        threshold = rule.threshold if threshold is None else threshold
+        if isinstance(threshold, list):
+            threshold = np.array(threshold, dtype=None if rule.compare in NUMERIC_COMPARATORS else object)
+            failed = COMPARATORS[rule.compare](threshold[self.host_index])(self.values[rule.field])
+        else:
+            failed = predicate(rule.compare, threshold)(self.values[rule.field])
+        return(failed & (self.state[rule.field] == PRESENT))
+
+    def thresholds(self, rule, overrides):
+        """ One threshold per host for rule, or None when no host overrides it """
+        thresholds = [overrides.threshold(hostname, rule) for hostname in self.hostnames]
+        if all(threshold == rule.threshold for threshold in thresholds):
+            return(None)
+        return(thresholds)
+
+
+def evaluate_fleet_columns(columns, rules=INTERFACE_RULES, overrides=None):
+    """ Same results and passed counts as evaluate_fleet_interfaces
+
+    The comparisons are vectorized, and the passed counts are taken from
+    the masks; only the Failed and N/A rows are turned back into Python
+    objects. With overrides, each host is checked against its own
+    thresholds.
+    """
+    hosts = len(columns.hostnames)
+    fleet = {rule.name: {hostname: [] for hostname in columns.hostnames} for rule in rules}
+    fleet_passed = {}
+    for rule in rules:
+        state = columns.state[rule.field]
+        thresholds = columns.thresholds(rule, overrides) if overrides else None
+        failed = columns.failed(rule, thresholds)
+        shown = np.nonzero(failed | (state == EMPTY))[0]
+        listed = np.bincount(columns.host_index[state != MISSING], minlength=hosts)
+        passed = listed - np.bincount(columns.host_index[shown], minlength=hosts)
+        fleet_passed[rule.name] = dict(zip(columns.hostnames, passed.tolist()))
+        by_host = fleet[rule.name]
+        for row, host, row_state, value in zip(shown.tolist(), columns.host_index[shown].tolist(),
+                                               state[shown].tolist(), columns.values[rule.field][shown].tolist()):
+            hostname = columns.hostnames[host]
+            threshold = rule.threshold if thresholds is None else thresholds[host]
+            if row_state == EMPTY:
+                by_host[hostname].append(CheckResult(hostname, columns.empty_rows[row], rule.name, 'N/A', threshold, 'N/A'))
+            else:
+                by_host[hostname].append(CheckResult(hostname, columns.interfaces[row], rule.name, value, threshold, 'Failed'))
+    return(fleet, fleet_passed)
@@ -0,0 +1,173 @@
+import json
+from collections import namedtuple
+from typing import List, Optional, Union
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover
+    msgspec = None
+
+###################################################################
+#                  DECODE ERRORS SECTION                          #
+###################################################################
+
+class SnapshotDecodeError(ValueError):
+    """ A snapshot that is not valid JSON or does not match its command's schema """
+
+    def __init__(self, command, message):
+        super().__init__(f'{ command }: { message }')
+        self.command = command
+        self.message = message
+
+###################################################################
+#                  SCHEMA SECTION                                 #
+###################################################################
+
+# Default of a field that must be present
+REQUIRED = object()
+
+
+class Rows(object):
+    """ A list of item that NX-OS sends as a bare object when it has one entry """
+
+    def __init__(self, item):
+        self.item = item
+
+
+class Schema(object):
+    """ The fields one snapshot command is decoded into, with their types
+
+    fields is ((name, type, default), ...), where type is str, int,
+    float, dict (left as decoded), another Schema or Rows. Fields not
+    listed are skipped. With msgspec installed the document is decoded
+    and converted in one step into a Struct built from the same fields;
+    otherwise json.loads and convert() produce a namedtuple with the same
+    attributes. Either way strings are converted to int and float
+    ("12" -> 12), like msgspec with strict=False.
+    """
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+        self.record = namedtuple(name, [field for field, kind, default in fields])
+        self.struct = None
+        if msgspec is not None:
+            self.struct = msgspec.defstruct(name, [(field, struct_type(kind)) if default is REQUIRED
+                                                   else (field, Optional[struct_type(kind)], default)
+                                                   for field, kind, default in fields])
+
+    def decode(self, content):
+        if self.struct is not None:
+            return(msgspec.json.decode(content, type=self.struct, strict=False))
+        return(convert(self, json.loads(content)))
+
+
+def struct_type(kind):
+    if isinstance(kind, Schema):
+        return(kind.struct)
+    if isinstance(kind, Rows):
+        return(Union[List[struct_type(kind.item)], struct_type(kind.item)])
+    return(kind)
+
+
+def as_list(rows):
+    """ A Rows field as a list, however many entries it had """
+    if rows is None:
+        return([])
+    if isinstance(rows, list):
+        return(rows)
+    return([rows])
+
+###################################################################
+#                  FALLBACK CONVERTER SECTION                     #
+###################################################################
+
+class ConvertError(ValueError):
+    pass
+
+
+def convert(kind, value, path="$"):
+    """ Validate and convert decoded JSON against a schema type without msgspec """
+    if isinstance(kind, Schema):
+        if not isinstance(value, dict):
+            raise ConvertError(f'Expected `object`, got `{ type(value).__name__ }` - at `{ path }`')
+        values = []
+        for field, field_kind, default in kind.fields:
+            if field not in value or value[field] is None and default is not REQUIRED:
+                if default is REQUIRED:
+                    raise ConvertError(f'Object missing required field `{ field }`'
+                                       + (f' - at `{ path }`' if path != "$" else ''))
+                values.append(default)
+            else:
+                values.append(convert(field_kind, value[field], f'{ path }.{ field }'))
+        return(kind.record(*values))
+    if isinstance(kind, Rows):
+        if isinstance(value, list):
+            return([convert(kind.item, item, f'{ path }[{ index }]') for index, item in enumerate(value)])
+        return(convert(kind.item, value, path))
+    if kind in (int, float) and isinstance(value, str):
+        try:
+            return(kind(value))
+        except ValueError:
+            pass
+    elif kind is float and isinstance(value, (int, float)) and not isinstance(value, bool):
+        return(float(value))
+    elif isinstance(value, kind) and not (kind is int and isinstance(value, bool)):
+        return(value)
+    raise ConvertError(f'Expected `{ kind.__name__ }`, got `{ type(value).__name__ }` - at `{ path }`')
+
+###################################################################
+#                  SNAPSHOT SCHEMAS SECTION                       #
+###################################################################
+
+SHOW_VERSION = Schema("ShowVersion", (
+    ("nxos_ver_str", str, REQUIRED),
+    ("kickstart_ver_str", str, REQUIRED),
+))
+
+SHOW_SYSTEM_RESOURCES = Schema("ShowSystemResources", (
+    ("cpu_state_idle", float, REQUIRED),
+    ("current_memory_status", str, REQUIRED),
+    ("load_avg_15min", float, REQUIRED),
+    ("load_avg_5min", float, REQUIRED),
+    ("load_avg_1min", float, REQUIRED),
+    ("memory_usage_used", int, REQUIRED),
+    ("memory_usage_total", int, REQUIRED),
+))
+
+DIR_ENTRY = Schema("DirEntry", (
+    ("fname", str, None),
+))
+
+DIR = Schema("Dir", (
+    ("bytesused", int, REQUIRED),
+    ("bytestotal", int, REQUIRED),
+    ("TABLE_dir", Schema("DirTable", (("ROW_dir", Rows(DIR_ENTRY), None),)), None),
+))
+
+# ROW_interface stays a list of dicts; InterfaceRecord picks and converts its fields
+SHOW_INTERFACE = Schema("ShowInterface", (
+    ("TABLE_interface", Schema("InterfaceTable", (("ROW_interface", Rows(dict), None),)), None),
+))
+
+SNAPSHOT_SCHEMAS = {
+    "show version": SHOW_VERSION,
+    "show system resources": SHOW_SYSTEM_RESOURCES,
+    "dir": DIR,
+    "show interface": SHOW_INTERFACE,
+}
+
+
+def decode_snapshot(command, content):
+    """ Typed document for a snapshot body, or plain JSON for commands without a schema
+
+    Malformed JSON and missing or mistyped fields raise SnapshotDecodeError.
+    """
+    schema = SNAPSHOT_SCHEMAS.get(command)
+    try:
+        if schema is None:
+            return(json.loads(content))
+        return(schema.decode(content))
+    except ValueError as error:
+        # msgspec.DecodeError and ValidationError, json.JSONDecodeError and ConvertError
+        raise SnapshotDecodeError(command, str(error)) from error
@@ -0,0 +1,819 @@
+import os
+import re
+import time
+import random
+import json
+import io
+import hashlib
+import logging
+import tarfile
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from requests.adapters import HTTPAdapter
+from collections import OrderedDict
+from pathlib import Path
+from nxpydocs_schemas import decode_snapshot
+
+# Get your logger for your script
+log = logging.getLogger(__name__)
+
+SNAPSHOT_DIRECTORY = "JSON"
+GITHUB_API = "https://api.github.com"
+# GitHub's secondary rate limit trips on too many concurrent requests
+MAX_FETCH_WORKERS = 32
+
+# "<hostname> <command>.json" -> hostname, command
+SNAPSHOT_NAME = re.compile(r"^(?P<hostname>\S+)\s+(?P<command>.+?)(?:\.json)?$")
+
+###################################################################
+#                  RATE LIMIT SECTION                             #
+###################################################################
+
+class RateLimitScheduler(object):
+    """ Paces GitHub requests against the X-RateLimit budget
+
+    Every response updates the remaining budget and reset time. While
+    more than half the budget is left, requests go out unpaced. Below
+    that, the remaining requests are spread evenly over the time until
+    the reset, across all threads. Once only the reserve is left, requests
+    wait for the reset. Primary and secondary rate-limit 403/429
+    responses are retried after Retry-After, the reset time, or an
+    exponential backoff with full jitter.
+    """
+
+    def __init__(self, reserve=50, max_retries=5, base_delay=1.0, max_delay=120.0):
+        self.reserve = reserve
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.limit = None
+        self.remaining = None
+        self.reset_at = None
+        self.next_slot = 0.0
+        self.waited = 0.0
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.time()
+            delay = 0.0
+            if self.remaining is not None and self.reset_at is not None:
+                window = max(self.reset_at - now, 0.0)
+                if self.remaining <= self.reserve:
+                    delay = window
+                elif self.remaining < self.limit / 2:
+                    interval = window / (self.remaining - self.reserve)
+                    slot = max(now, self.next_slot)
+                    self.next_slot = slot + interval
+                    delay = slot - now
+            self.waited += delay
+        if delay > 0:
+            time.sleep(delay)
+
+    def update(self, response, attempt):
+        """ Record the budget from response; return a retry delay or None """
+        headers = response.headers
+        with self._lock:
+            if "X-RateLimit-Remaining" in headers:
+                self.limit = int(headers.get("X-RateLimit-Limit", self.limit or 0))
+                self.remaining = int(headers["X-RateLimit-Remaining"])
+                self.reset_at = float(headers.get("X-RateLimit-Reset", self.reset_at or 0))
+        if response.status_code not in (403, 429) or attempt >= self.max_retries:
+            return(None)
+        if "Retry-After" in headers:
+            delay = float(headers["Retry-After"])
+        elif headers.get("X-RateLimit-Remaining") == "0":
+            delay = max(self.reset_at - time.time(), 0.0) + 1
+        elif response.status_code == 429 or "rate limit" in response.text.lower():
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        else:
+            # A plain 403 is a permissions problem, not a rate limit
+            return(None)
+        with self._lock:
+            self.retries += 1
+            self.waited += delay
+        return(delay)
+
+    def project(self, needed):
+        if self.remaining is None:
+            return(f'GitHub run needs about { needed } requests, budget unknown')
+        message = f'GitHub run needs about { needed } requests, { self.remaining } of { self.limit } remaining'
+        if needed > self.remaining - self.reserve:
+            reset_in = max(self.reset_at - time.time(), 0.0)
+            message += f', the run will wait about { reset_in:.0f}s for the budget to reset'
+        return(message)
+
+    def report(self):
+        return(f'GitHub rate limit { self.remaining } of { self.limit } remaining, '
+               f'{ self.retries } retries, { self.waited:.1f}s spent waiting')
+
+###################################################################
+#                  GITHUB CLIENT SECTION                          #
+###################################################################
+
+class ResponseCache(object):
+    """ ETags and bodies of the last GitHub API responses, kept between runs """
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        self.entries = {}
+        if self.path and self.path.is_file():
+            try:
+                self.entries = json.loads(self.path.read_text())
+            except ValueError:
+                log.warning(f'Ignoring unreadable response cache { self.path }')
+
+    def get(self, url):
+        return(self.entries.get(url))
+
+    def put(self, url, etag, body):
+        self.entries[url] = {"etag": etag, "body": body}
+        if self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f'{ self.path.name }.{ os.getpid() }.tmp')
+            tmp_path.write_text(json.dumps(self.entries))
+            os.replace(tmp_path, self.path)
+
+
+class GitHubClient(object):
+    """ Minimal GitHub REST client for reading one repository
+
+    JSON GETs are revalidated with If-None-Match against the stored ETag;
+    a 304 Not Modified has no body and does not count against the rate
+    limit, so an unchanged listing costs one cheap request.
+    """
+
+    def __init__(self, username, token, repo_name, response_cache=None, pool_size=MAX_FETCH_WORKERS,
+                 scheduler=None, timeout=30):
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.session.headers.update({"Accept": "application/vnd.github+json"})
+        if token:
+            self.session.auth = (username, token)
+        self.repo_path = repo_name if "/" in repo_name else f'{ username }/{ repo_name }'
+        self.response_cache = response_cache or ResponseCache()
+        self.scheduler = scheduler or RateLimitScheduler()
+        self.timeout = timeout
+        self.requests_made = 0
+        self.not_modified = 0
+        self._lock = threading.Lock()
+
+    def _count(self, not_modified=False):
+        with self._lock:
+            self.requests_made += 1
+            if not_modified:
+                self.not_modified += 1
+
+    def url(self, path):
+        return(f'{ GITHUB_API }/repos/{ self.repo_path }/{ path }')
+
+    def get(self, url, **kwargs):
+        # Every GitHub request goes through the scheduler
+        attempt = 0
+        while True:
+            self.scheduler.wait()
+            response = self.session.get(url, timeout=self.timeout, **kwargs)
+            self._count(not_modified=response.status_code == 304)
+            delay = self.scheduler.update(response, attempt)
+            if delay is None:
+                return(response)
+            log.warning(f'GitHub rate limited { url } ({ response.status_code }), retrying in { delay:.1f}s')
+            response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def refresh_budget(self):
+        """ The remaining budget, asking /rate_limit only if no response has carried it yet
+
+        Every response, 304s included, has the X-RateLimit headers the
+        scheduler reads, so a run that listed the snapshots already knows it.
+        """
+        if self.scheduler.remaining is None:
+            response = self.get(f'{ GITHUB_API }/rate_limit')
+            response.raise_for_status()
+        return(self.scheduler.remaining)
+
+    def get_json(self, path, immutable=False):
+        """ The decoded JSON at path, revalidated against its cached ETag
+
+        immutable paths, such as a tree looked up by SHA, never change, so
+        a cached body is returned without any request.
+        """
+        url = self.url(path)
+        cached = self.response_cache.get(url)
+        if immutable and cached:
+            return(cached["body"])
+        headers = {}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        response = self.get(url, headers=headers)
+        if response.status_code == 304:
+            return(cached["body"])
+        response.raise_for_status()
+        body = response.json()
+        self.response_cache.put(url, response.headers.get("ETag"), body)
+        return(body)
+
+    def get_blob(self, sha):
+        response = self.get(self.url(f'git/blobs/{ sha }'),
+                            headers={"Accept": "application/vnd.github.raw+json"})
+        response.raise_for_status()
+        return(response.content)
+
+    @contextmanager
+    def stream_archive(self):
+        response = self.get(self.url("tarball"), stream=True)
+        response.raise_for_status()
+        response.raw.decode_content = True
+        try:
+            with tarfile.open(fileobj=response.raw, mode="r|gz") as archive:
+                yield archive
+        finally:
+            response.close()
+
+    def report(self):
+        return(f'GitHub API { self.requests_made } requests, { self.not_modified } not modified; '
+               f'{ self.scheduler.report() }')
+
+###################################################################
+#                  BLOB CACHE SECTION                             #
+###################################################################
+
+class BlobCache(object):
+    """ On-disk content-addressed cache of snapshot bodies keyed by git SHA
+
+    A blob SHA never changes for the same content, so cached entries are
+    never stale. The least recently used blobs are evicted once the cache
+    grows past max_bytes; recency survives between runs through mtimes.
+    Pinned blobs, spooled for a reader that has not opened them yet, are
+    never evicted.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._sizes = None
+        self._pins = {}
+        self._lock = threading.RLock()
+
+    def _path(self, sha):
+        return(self.directory / sha[:2] / sha)
+
+    def _scan(self):
+        # Oldest first, so the front of the OrderedDict is evicted first
+        if self._sizes is None:
+            entries = []
+            if self.directory.is_dir():
+                for path in self.directory.glob("*/*"):
+                    if path.is_file() and not path.name.endswith(".tmp"):
+                        stat = path.stat()
+                        entries.append((stat.st_mtime, path.name, stat.st_size))
+            self._sizes = OrderedDict((sha, size) for mtime, sha, size in sorted(entries))
+        return(self._sizes)
+
+    @property
+    def total_bytes(self):
+        return(sum(self._scan().values()))
+
+    def __contains__(self, sha):
+        with self._lock:
+            return(sha in self._scan())
+
+    def get(self, sha):
+        with self._lock:
+            return(self._get(sha))
+
+    def _get(self, sha):
+        sizes = self._scan()
+        path = self._path(sha)
+        if sha in sizes:
+            try:
+                content = path.read_bytes()
+            except OSError:
+                del sizes[sha]
+            else:
+                os.utime(path)
+                sizes.move_to_end(sha)
+                self.hits += 1
+                return(content)
+        self.misses += 1
+        return(None)
+
+    def path(self, sha):
+        """ The cached body's file, or None on a miss, for a reader in another process """
+        with self._lock:
+            sizes = self._scan()
+            path = self._path(sha)
+            if sha in sizes:
+                try:
+                    os.utime(path)
+                except OSError:
+                    del sizes[sha]
+                else:
+                    sizes.move_to_end(sha)
+                    self.hits += 1
+                    return(path)
+            self.misses += 1
+            return(None)
+
+    def open(self, sha):
+        """ The cached body as an open binary file, or None on a miss """
+        with self._lock:
+            sizes = self._scan()
+            path = self._path(sha)
+            if sha in sizes:
+                try:
+                    stream = path.open("rb")
+                except OSError:
+                    del sizes[sha]
+                else:
+                    os.utime(path)
+                    sizes.move_to_end(sha)
+                    self.hits += 1
+                    return(stream)
+            self.misses += 1
+            return(None)
+
+    def put(self, sha, content):
+        with self._lock:
+            self._put(sha, content)
+
+    def _put(self, sha, content):
+        sizes = self._scan()
+        path = self._path(sha)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f'{ sha }.{ os.getpid() }.tmp')
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, path)
+        sizes[sha] = len(content)
+        sizes.move_to_end(sha)
+        self.evict()
+
+    def pin(self, sha):
+        with self._lock:
+            self._pins[sha] = self._pins.get(sha, 0) + 1
+
+    def unpin(self, sha):
+        with self._lock:
+            if self._pins.get(sha, 0) > 1:
+                self._pins[sha] -= 1
+            else:
+                self._pins.pop(sha, None)
+
+    def evict(self):
+        sizes = self._scan()
+        total = sum(sizes.values())
+        for sha in [sha for sha in sizes if sha not in self._pins]:
+            if total <= self.max_bytes or len(sizes) <= 1:
+                break
+            size = sizes.pop(sha)
+            try:
+                self._path(sha).unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            self.evictions += 1
+
+    def report(self):
+        lookups = self.hits + self.misses
+        hit_rate = (self.hits / lookups * 100) if lookups else 0
+        return(f'Blob cache { self.hits } hits, { self.misses } misses '
+               f'({ hit_rate:.1f}% hit rate), { self.evictions } evictions, '
+               f'{ self.total_bytes } of { self.max_bytes } bytes used')
+
+###################################################################
+#                  SNAPSHOT BLOB SECTION                          #
+###################################################################
+
+class TransferStats(object):
+    """ Counts snapshot bytes listed, fetched and handed to checks """
+
+    def __init__(self):
+        self.listed_files = 0
+        self.listed_bytes = 0
+        self.fetched_files = 0
+        self.fetched_bytes = 0
+        self.used_bytes = 0
+        self.lock = threading.Lock()
+
+    def fetched(self, size):
+        with self.lock:
+            self.fetched_files += 1
+            self.fetched_bytes += size
+
+    def used(self, size):
+        with self.lock:
+            self.used_bytes += size
+
+    def report(self):
+        return(f'Snapshots listed { self.listed_files } files ({ self.listed_bytes } bytes), '
+               f'fetched { self.fetched_files } files ({ self.fetched_bytes } bytes), '
+               f'used { self.used_bytes } bytes')
+
+
+class SnapshotBlob(object):
+    """ Lazy handle to one snapshot file
+
+    Only the name, SHA and size are known up front; the body is read from
+    the blob cache, or fetched and decoded, the first time a check asks
+    for it. open() hands out the body as a stream instead, straight from
+    disk when the source (a local file at path) or the blob cache has it
+    there.
+    """
+
+    def __init__(self, name, sha, size, fetch, stats, cache=None, content=None, path=None):
+        self.name = name
+        self.size = size
+        self._sha = sha
+        self._fetch = fetch
+        self._stats = stats
+        self._cache = cache
+        self._content = content
+        self._path = path
+
+    @property
+    def fetched(self):
+        return(self._content is not None)
+
+    def release(self):
+        # Every body can be read back, from disk or by fetching it again
+        self._content = None
+
+    @property
+    def sha(self):
+        # Local files are only hashed when something asks for the SHA, as they are read
+        if self._sha is None:
+            if self._path is not None and self._content is None:
+                self._sha = git_file_sha(self._path)
+            else:
+                self._sha = git_blob_sha(self._read())
+        return(self._sha)
+
+    def _read(self):
+        if self._content is None and self._cache is not None:
+            self._content = self._cache.get(self.sha)
+        if self._content is None:
+            self._content = self._fetch()
+            self._stats.fetched(len(self._content))
+            if self._cache is not None:
+                self._cache.put(self.sha, self._content)
+        return(self._content)
+
+    @property
+    def content(self):
+        content = self._read()
+        self._stats.used(len(content))
+        return(content)
+
+    @property
+    def on_disk(self):
+        # open() can stream the body from a file without holding it in memory
+        return(self._path is not None or
+               (self._cache is not None and self._sha is not None and self._sha in self._cache))
+
+    def pin(self):
+        # Kept in the blob cache until unpin(), for a reader that has not opened it yet
+        if self._cache is not None:
+            self._cache.pin(self.sha)
+
+    def unpin(self):
+        if self._cache is not None:
+            self._cache.unpin(self.sha)
+
+    @property
+    def location(self):
+        """ The file holding the body, for a reader in another process, or None """
+        if self._path is not None:
+            return(self._path)
+        if self._cache is not None and self._sha is not None:
+            return(self._cache.path(self._sha))
+        return(None)
+
+    def spool(self):
+        """ Fetch the body into the blob cache for open(), without keeping it in memory """
+        if not self.on_disk:
+            content = self._read()
+            if self._cache is not None and not self.on_disk:
+                # Held since the listing, like an archive member, so not written yet
+                self._cache.put(self.sha, content)
+        if self.on_disk:
+            self.release()
+
+    def open(self):
+        """ Binary stream of the body, without loading it whole when it is on disk """
+        stream = None
+        if self._content is not None:
+            stream = io.BytesIO(self._content)
+        elif self._path is not None:
+            stream = self._path.open("rb")
+        elif self._cache is not None and self._sha is not None and self._sha in self._cache:
+            stream = self._cache.open(self._sha)
+        if stream is None:
+            stream = io.BytesIO(self._read())
+        self._stats.used(self.size)
+        return(stream)
+
+###################################################################
+#                  SNAPSHOT SOURCE SECTION                        #
+###################################################################
+
+def git_blob_sha(content):
+    # Same SHA GitHub reports for the blob, so archive and API runs share the cache
+    return(hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest())
+
+
+def git_file_sha(path, chunk_size=2 ** 20):
+    # git_blob_sha of a file's body, read a chunk at a time instead of whole
+    with open(path, "rb") as stream:
+        digest = hashlib.sha1(b"blob %d\0" % os.fstat(stream.fileno()).st_size)
+        for chunk in iter(lambda: stream.read(chunk_size), b""):
+            digest.update(chunk)
+    return(digest.hexdigest())
+
+
+class GitHubSource(object):
+    """ Lists the snapshot directory through the git trees API; bodies are fetched lazily
+
+    The contents API truncates directories at 1000 entries, which is
+    about 250 devices. A tree listing holds up to 100,000 entries, and a
+    tree looked up by SHA never changes, so once cached it costs no request.
+    """
+
+    def __init__(self, client, directory=SNAPSHOT_DIRECTORY):
+        self.client = client
+        self.directory = directory
+
+    def tree_sha(self):
+        for entry in self.client.get_json("git/trees/HEAD")["tree"]:
+            if entry["path"] == self.directory and entry["type"] == "tree":
+                return(entry["sha"])
+        raise LookupError(f'{ self.client.repo_path } has no { self.directory } directory')
+
+    def blobs(self, stats, cache=None):
+        tree = self.client.get_json(f'git/trees/{ self.tree_sha() }', immutable=True)
+        if tree.get("truncated"):
+            log.warning(f'The { self.directory } tree listing was truncated at { len(tree["tree"]) } entries, '
+                        'use SNAPSHOT_SOURCE=archive for a fleet this size')
+        for item in tree["tree"]:
+            if item["type"] != "blob":
+                continue
+            stats.listed_files += 1
+            stats.listed_bytes += item["size"]
+            yield SnapshotBlob(item["path"], item["sha"], item["size"],
+                               lambda sha=item["sha"]: self.client.get_blob(sha), stats, cache)
+
+
+class GitHubArchiveSource(object):
+    """ Streams one tarball of the repository and keeps only the snapshot directory
+
+    The archive is read as a stream; members outside the snapshot
+    directory are skipped without being buffered. Each snapshot is handed
+    on with its body, which SnapshotIndex writes to the blob cache, or
+    drops, before the next member is read. A dropped body can be fetched
+    again by its SHA if a check ever needs it back.
+    """
+
+    def __init__(self, client, directory=SNAPSHOT_DIRECTORY):
+        self.client = client
+        self.directory = directory
+
+    def blobs(self, stats, cache=None):
+        with self.client.stream_archive() as archive:
+            for member in archive:
+                # <owner>-<repo>-<commit>/JSON/<hostname> <command>.json
+                parts = member.name.split("/")
+                if not member.isfile() or len(parts) != 3 or parts[1] != self.directory:
+                    continue
+                content = archive.extractfile(member).read()
+                sha = git_blob_sha(content)
+                stats.listed_files += 1
+                stats.listed_bytes += len(content)
+                stats.fetched_files += 1
+                stats.fetched_bytes += len(content)
+                yield SnapshotBlob(parts[2], sha, len(content), lambda sha=sha: self.client.get_blob(sha), stats, cache,
+                                   content=content)
+
+class LocalSource(object):
+    """ Reads snapshots from a local nxpydocs_output clone or a plain directory
+
+    No network and no rate limit; useful from a CI cache or an
+    air-gapped lab box. path may be the clone itself or its JSON
+    directory.
+    """
+
+    def __init__(self, path, directory=SNAPSHOT_DIRECTORY):
+        path = Path(path).expanduser()
+        self.path = path / directory if (path / directory).is_dir() else path
+
+    def blobs(self, stats, cache=None):
+        if not self.path.is_dir():
+            raise FileNotFoundError(f'Snapshot directory { self.path } does not exist')
+        for path in sorted(self.path.iterdir()):
+            if not path.is_file():
+                continue
+            size = path.stat().st_size
+            stats.listed_files += 1
+            stats.listed_bytes += size
+            yield SnapshotBlob(path.name, None, size, path.read_bytes, stats, path=path)
+
+###################################################################
+#                  DOCUMENT CACHE SECTION                         #
+###################################################################
+
+class DocumentCache(object):
+    """ Parsed snapshot documents keyed by (hostname, command, blob_sha)
+
+    Each document is decoded once per run no matter how many checks read
+    it, by parse(command, content), typed by decode_snapshot unless another
+    parser is given. At most max_documents are kept (0 keeps everything), least
+    recently used first out, and release() drops a host's or a command's
+    documents as soon as the checks that read them are done.
+    """
+
+    def __init__(self, max_documents=0, parse=None):
+        self.max_documents = max_documents
+        self.parse = parse or decode_snapshot
+        self.documents = OrderedDict()
+        self.hosts = {}
+        self.parses = 0
+        self.hits = 0
+        self._lock = threading.Lock()
+
+    def get(self, hostname, command, blob):
+        key = (hostname, command, blob.sha)
+        with self._lock:
+            if key in self.documents:
+                self.documents.move_to_end(key)
+                self.hits += 1
+                return(self.documents[key])
+        document = self.parse(command, blob.content)
+        with self._lock:
+            self.parses += 1
+            self.documents[key] = document
+            self.hosts.setdefault(hostname, set()).add(key)
+            while self.max_documents and len(self.documents) > self.max_documents:
+                self.forget(self.documents.popitem(last=False)[0])
+        return(document)
+
+    def forget(self, key):
+        keys = self.hosts.get(key[0], set())
+        keys.discard(key)
+        if not keys:
+            self.hosts.pop(key[0], None)
+
+    def release(self, hostname=None, command=None):
+        with self._lock:
+            # Only the host's own keys are scanned, so releasing host by host stays linear
+            keys = self.documents if hostname is None else self.hosts.get(hostname, ())
+            for key in [key for key in keys if command in (None, key[1])]:
+                del self.documents[key]
+                self.forget(key)
+
+    def report(self):
+        return(f'Documents parsed { self.parses } times, served { self.hits } times from cache, '
+               f'{ len(self.documents) } held')
+
+###################################################################
+#                  SNAPSHOT INDEX SECTION                         #
+###################################################################
+
+class SnapshotIndex(object):
+    """ Index of the nxpydocs JSON snapshots keyed by (hostname, command)
+
+    The snapshot source is listed once per run and every file body is
+    downloaded at most once, so a full run costs O(files) API calls no
+    matter how many testcases read the same snapshot, and parsed only
+    when a check asks for it. Bodies that arrive with the listing, from
+    an archive, are written to the blob cache and dropped; without a
+    cache they are held until parsed. previous is the run state's
+    {hostname: {command: blob SHA}}; a body whose SHA it already has
+    belongs to a host whose saved report is reused, so it is dropped
+    without being written.
+    """
+
+    def __init__(self, source, cache=None, documents=None, streamed=(), previous=None):
+        self.source = source
+        self.cache = cache
+        self.documents = documents or DocumentCache()
+        self.streamed = streamed
+        self.previous = previous or {}
+        self.entries = None
+        self.hosts = {}
+        self.stats = TransferStats()
+
+    def load(self):
+        if self.entries is not None:
+            return(self.entries)
+        self.entries = {}
+        for blob in self.source.blobs(self.stats, self.cache):
+            hostname, command = self.parse_name(blob.name)
+            if hostname and command:
+                self.entries[(hostname, command)] = blob
+                self.hosts.setdefault(hostname, {})[command] = blob
+                if blob.fetched:
+                    self.settle(hostname, command, blob)
+        log.info(f'Indexed { len(self.entries) } snapshots with { type(self.source).__name__ }')
+        return(self.entries)
+
+    def settle(self, hostname, command, blob):
+        # Runs before the source reads its next body, so only one is held at a time
+        if self.previous.get(hostname, {}).get(command) == blob.sha:
+            blob.release()
+        else:
+            blob.spool()
+
+    @staticmethod
+    def parse_name(name):
+        match = SNAPSHOT_NAME.match(name)
+        if match is None:
+            return(None, None)
+        return(match.group("hostname"), match.group("command"))
+
+    def hostnames(self):
+        self.load()
+        return(sorted(self.hosts))
+
+    def pending(self, commands, hostnames=None):
+        """ Snapshots for the given commands (and hosts) that still have to be downloaded """
+        return([blob for blob in self.select(commands, hostnames) if not blob.fetched
+                and (self.cache is None or blob.sha not in self.cache)])
+
+    def select(self, commands, hostnames=None):
+        # Blobs for the given commands, of every host or only of hostnames, in sorted order
+        hostnames = None if hostnames is None else set(hostnames)
+        return([blob for (hostname, command), blob in sorted(self.load().items(), key=lambda entry: entry[0])
+                if command in commands and (hostnames is None or hostname in hostnames)])
+
+    def prefetch(self, commands, workers=1, keep=True, hostnames=None):
+        """ Fetch every snapshot for the given commands before the checks run
+
+        Blobs are fetched by a bounded thread pool over the client's pooled
+        session. With keep False the bodies are only spooled to disk, for
+        commands that are read through open() rather than held in memory.
+        hostnames limits the fetch to those hosts. A blob that cannot be
+        fetched does not stop the others; returns {blob name: error}.
+        """
+        wanted = [blob for blob in self.select(commands, hostnames) if not blob.fetched]
+        fetch = SnapshotBlob._read if keep else SnapshotBlob.spool
+
+        def attempt(blob):
+            try:
+                fetch(blob)
+            except Exception as error:
+                return(error)
+            return(None)
+
+        workers = max(1, min(workers, MAX_FETCH_WORKERS))
+        if workers == 1:
+            errors = [attempt(blob) for blob in wanted]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                errors = list(executor.map(attempt, wanted))
+        return({blob.name: error for blob, error in zip(wanted, errors) if error is not None})
+
+    def blob(self, hostname, command):
+        return(self.load().get((hostname, command)))
+
+    def pin(self, hostname):
+        """ Keep the host's blob cache entries from eviction until unpin() """
+        self.load()
+        for blob in self.hosts.get(hostname, {}).values():
+            blob.pin()
+
+    def unpin(self, hostname):
+        for blob in self.hosts.get(hostname, {}).values():
+            blob.unpin()
+
+    def get(self, hostname, command):
+        blob = self.blob(hostname, command)
+        if blob is None:
+            return(None)
+        return(blob.content)
+
+    def open(self, hostname, command):
+        """ The snapshot body as a binary stream, for parsers that read it incrementally """
+        blob = self.blob(hostname, command)
+        if blob is None:
+            return(None)
+        return(blob.open())
+
+    def document(self, hostname, command):
+        blob = self.blob(hostname, command)
+        if blob is None:
+            return(None)
+        return(self.documents.get(hostname, command, blob))
+
+    def release(self, hostname=None, command=None):
+        """ Drop parsed documents and downloaded bodies that no check still needs """
+        self.documents.release(hostname, command)
+        self.load()
+        for blob_hostname in (self.hosts if hostname is None else (hostname,)):
+            for blob_command, blob in self.hosts.get(blob_hostname, {}).items():
+                if command in (None, blob_command):
+                    blob.release()
@@ -1,27 +1,105 @@
 import os
 import logging
-import json
-import re
-import requests
-from github import Github
 from pyats import aetest
 from pyats.log.utils import banner
 from tabulate import tabulate
 from pathlib import Path
-from jinja2 import Environment, FileSystemLoader
 from dotenv import load_dotenv
+from nxpydocs_rules import (HOST_CHECKS, HOST_COMMANDS, INTERFACE_RULES_BY_NAME, OVERRIDES, CheckResult, FleetEvaluator,
+                            RunState, predicate)
+from nxpydocs_snapshots import BlobCache, DocumentCache, GitHubArchiveSource, GitHubClient, GitHubSource, LocalSource, ResponseCache, SnapshotIndex
+from nxpydocs_webex import (CARD_MAX_BYTES, DISPATCH_WORKERS, OUTBOX_MAX_BYTES, OUTBOX_PATH, REPLAY_BATCH, InterfaceNotifications,
+                            WebexClient, WebexDispatcher, WebexOutbox, render_card)
 
 load_dotenv()
 
 USERNAME = os.getenv("USERNAME")
 TOKEN = os.getenv("TOKEN")
 REPO_NAME = os.getenv("REPO_NAME")
+SNAPSHOT_SOURCE = os.getenv("SNAPSHOT_SOURCE", "api")
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH")
+SNAPSHOT_FETCH_WORKERS = int(os.getenv("SNAPSHOT_FETCH_WORKERS", 8))
+DOCUMENT_CACHE_SIZE = int(os.getenv("DOCUMENT_CACHE_SIZE", 0))
+INTERFACE_ENGINE = os.getenv("INTERFACE_ENGINE", "rows")
+EVALUATION_WORKERS = int(os.getenv("EVALUATION_WORKERS", 0))
+STREAM_INTERFACES = os.getenv("STREAM_INTERFACES", "false").lower() == "true"
+RUN_STATE_FILE = os.getenv("RUN_STATE_FILE")
 WEBEX_ROOM = os.getenv("WEBEX_ROOM")
 WEBEX_TOKEN = os.getenv("WEBEX_TOKEN")
+WEBEX_GROUP_BY = os.getenv("WEBEX_GROUP_BY", "host")
+WEBEX_CARD_MAX_BYTES = int(os.getenv("WEBEX_CARD_MAX_BYTES", CARD_MAX_BYTES))
+WEBEX_WORKERS = int(os.getenv("WEBEX_WORKERS", DISPATCH_WORKERS))
+WEBEX_TIMEOUT = float(os.getenv("WEBEX_TIMEOUT", "30"))
+WEBEX_MAX_RETRIES = int(os.getenv("WEBEX_MAX_RETRIES", "5"))
+WEBEX_OUTBOX = os.getenv("WEBEX_OUTBOX", str(OUTBOX_PATH))
+WEBEX_OUTBOX_MAX_BYTES = int(os.getenv("WEBEX_OUTBOX_MAX_BYTES", OUTBOX_MAX_BYTES))
+WEBEX_REPLAY_BATCH = int(os.getenv("WEBEX_REPLAY_BATCH", REPLAY_BATCH))
+SNAPSHOT_CACHE_DIR = os.getenv("SNAPSHOT_CACHE_DIR", str(Path(__file__).resolve().parent / ".snapshot_cache"))
+SNAPSHOT_CACHE_MAX_BYTES = int(os.getenv("SNAPSHOT_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+# Checks from the rules file with a dedicated test below; their thresholds come from
+# the file, and any other check in it runs in Additional_Rules_Check
+DEDICATED_HOST_CHECKS = ("nxos_version", "kickstart_version", "cpu_state_idle", "current_memory_status",
+                         "fifteen_minute_average_load", "five_minute_average_load", "one_minute_average_load",
+                         "memory_percentage", "free_diskspace", "bin_file")
+DEDICATED_INTERFACE_RULES = ("babbles", "bad_eth", "bad_protocol", "collisions", "crc", "dribble", "duplex", "ignored",
+                             "down_if_drops", "input_discards", "input_errors", "input_pause", "late_collision",
+                             "lost_carrier", "no_buffer", "no_carrier", "output_discard", "output_error",
+                             "output_pause", "output_overrun", "runts", "underrun", "state")
+for missing in [name for name in DEDICATED_HOST_CHECKS if name not in HOST_CHECKS] + \
+               [name for name in DEDICATED_INTERFACE_RULES if name not in INTERFACE_RULES_BY_NAME]:
+    raise ValueError(f'The rules file has no { missing } check, which a dedicated test reads')
+
+# Where snapshots can be read from; local needs SNAPSHOT_PATH
+SNAPSHOT_SOURCES = ("api", "archive", "local")
+if SNAPSHOT_SOURCE not in SNAPSHOT_SOURCES:
+    raise ValueError(f'SNAPSHOT_SOURCE is { SNAPSHOT_SOURCE !r}, it must be one of { ", ".join(SNAPSHOT_SOURCES) }')
+if SNAPSHOT_SOURCE == "local" and not SNAPSHOT_PATH:
+    raise ValueError('SNAPSHOT_SOURCE=local needs SNAPSHOT_PATH, the nxpydocs output clone or its JSON directory')
+if SNAPSHOT_SOURCE != "local" and not REPO_NAME:
+    raise ValueError(f'SNAPSHOT_SOURCE={ SNAPSHOT_SOURCE } needs REPO_NAME, the nxpydocs output repository')
+if STREAM_INTERFACES and SNAPSHOT_SOURCE != "local" and not SNAPSHOT_CACHE_DIR:
+    raise ValueError(f'STREAM_INTERFACES with SNAPSHOT_SOURCE={ SNAPSHOT_SOURCE } needs SNAPSHOT_CACHE_DIR, '
+                     f'the streamed snapshots are read from there')
+if SNAPSHOT_SOURCE == "archive" and not SNAPSHOT_CACHE_DIR:
+    raise ValueError('SNAPSHOT_SOURCE=archive needs SNAPSHOT_CACHE_DIR, the archive\'s snapshots are unpacked there')
+
+# Snapshot commands the testcases read for every host
+SNAPSHOT_COMMANDS = HOST_COMMANDS
+# Snapshots parsed as a stream rather than held in memory whole
+STREAMED_COMMANDS = ("show interface",) if STREAM_INTERFACES else ()
 
 # Get your logger for your script
 log = logging.getLogger(__name__)
 
+# One snapshot index per run, shared by every testcase
+blob_cache = BlobCache(SNAPSHOT_CACHE_DIR, SNAPSHOT_CACHE_MAX_BYTES) if SNAPSHOT_CACHE_DIR else None
+response_cache = ResponseCache(Path(SNAPSHOT_CACHE_DIR) / "responses.json" if SNAPSHOT_CACHE_DIR else None)
+if SNAPSHOT_SOURCE == "local":
+    github = None
+    snapshot_source = LocalSource(SNAPSHOT_PATH)
+elif SNAPSHOT_SOURCE == "archive":
+    github = GitHubClient(USERNAME, TOKEN, REPO_NAME, response_cache)
+    snapshot_source = GitHubArchiveSource(github)
+elif SNAPSHOT_SOURCE == "api":
+    github = GitHubClient(USERNAME, TOKEN, REPO_NAME, response_cache)
+    snapshot_source = GitHubSource(github)
+run_state = RunState(RUN_STATE_FILE) if RUN_STATE_FILE else None
+# Archive snapshots the run state already has are not unpacked, their hosts reuse the saved reports
+snapshots = SnapshotIndex(snapshot_source, cache=blob_cache, documents=DocumentCache(DOCUMENT_CACHE_SIZE),
+                          streamed=STREAMED_COMMANDS, previous=run_state.snapshots() if run_state else None)
+fleet = FleetEvaluator(snapshots, workers=EVALUATION_WORKERS, engine=INTERFACE_ENGINE, stream=STREAM_INTERFACES,
+                       state=run_state, fetch_workers=SNAPSHOT_FETCH_WORKERS)
+# Webex messages are queued and sent on background threads, over one pooled session, while the checks go on
+webex_client = WebexClient(WEBEX_TOKEN, pool_size=WEBEX_WORKERS, timeout=(5, WEBEX_TIMEOUT), max_retries=WEBEX_MAX_RETRIES)
+# Every message is written to the outbox before it is queued, and what Webex did not take is replayed next run
+outbox = WebexOutbox(WEBEX_OUTBOX, WEBEX_OUTBOX_MAX_BYTES) if WEBEX_ROOM and WEBEX_OUTBOX else None
+dispatcher = WebexDispatcher(webex_client.post, WEBEX_WORKERS, outbox)
+# Failing interfaces are collected here and sent as one card per host or check
+notifications = InterfaceNotifications(WEBEX_ROOM, dispatcher, WEBEX_GROUP_BY,
+                                       {name: rule.label for name, rule in INTERFACE_RULES_BY_NAME.items()},
+                                       WEBEX_CARD_MAX_BYTES)
+
 ###################################################################
 #                  COMMON SETUP SECTION                           #
 ###################################################################
@@ -34,54 +112,137 @@ class common_setup(aetest.CommonSetup):
     ###
     @aetest.subsection
     def get_hostname(self):
-        g = Github(USERNAME, TOKEN)
-        repo = g.get_user().get_repo(REPO_NAME)
-        hostname_list = []
-        for item in repo.get_contents("JSON"):
-            hostname = (re.sub('\s(.*)','',item.name))
-            hostname_list.append(hostname)
-        self.hostname = set(hostname_list)
+        self.hostname = snapshots.hostnames()
         return(self.hostname)
 
+    @aetest.subsection
+    def replay_webex_outbox(self):
+        if outbox:
+            replayed = dispatcher.replay(WEBEX_REPLAY_BATCH)
+            if replayed:
+                log.info(f'Resending { replayed } Webex messages undelivered by earlier runs')
+
+    @aetest.subsection
+    def load_snapshots(self):
+        # Only hosts whose snapshots changed since the saved run state are fetched, a window at a time as
+        # evaluate_fleet reaches them
+        stale = fleet.plan()
+        if run_state:
+            log.info(f'{ len(stale) } of { len(snapshots.hostnames()) } hosts changed since the last run')
+        if isinstance(snapshot_source, GitHubSource):
+            github.refresh_budget()
+            log.info(github.scheduler.project(len(snapshots.pending(SNAPSHOT_COMMANDS, stale))))
+
+    @aetest.subsection
+    def evaluate_fleet(self):
+        fleet.evaluate()
+        log.info(f'Evaluated { len(fleet.reports) } hosts')
+        for name, error in fleet.fetch_errors.items():
+            log.error(f'{ name } could not be fetched, it was retried when its host was evaluated: { error }')
+        log.info(snapshots.stats.report())
+        for hostname, errors in fleet.errors.items():
+            for error in errors:
+                log.error(f'{ hostname } snapshot could not be fetched, decoded or checked, the checks reading it show N/A: { error }')
+
     @aetest.subsection
     def get_show_version(hostname):
-        g = Github(USERNAME, TOKEN)
-        repo = g.get_user().get_repo(REPO_NAME)
-        for item in repo.get_contents("JSON"):
-            raw_json_content = item.decoded_content
-            if f"{ hostname } show version" in item.name:
-                show_version = raw_json_content
-                return(show_version)
+        return(snapshots.get(hostname, "show version"))
 
     @aetest.subsection
     def get_show_system_resources(hostname):
-        g = Github(USERNAME, TOKEN)
-        repo = g.get_user().get_repo(REPO_NAME)
-        for item in repo.get_contents("JSON"):
-            raw_json_content = item.decoded_content
-            if f"{ hostname } show system resource" in item.name:
-                show_system_resources = raw_json_content
-                return(show_system_resources)
+        return(snapshots.get(hostname, "show system resources"))
 
     @aetest.subsection
     def get_show_interface(hostname):
-        g = Github(USERNAME, TOKEN)
-        repo = g.get_user().get_repo(REPO_NAME)
-        for item in repo.get_contents("JSON"):
-            raw_json_content = item.decoded_content
-            if f"{ hostname } show interface" in item.name:
-                show_interface = raw_json_content
-                return(show_interface)
+        return(snapshots.get(hostname, "show interface"))
 
     @aetest.subsection
     def get_dir(hostname):
-        g = Github(USERNAME, TOKEN)
-        repo = g.get_user().get_repo(REPO_NAME)
-        for item in repo.get_contents("JSON"):
-            raw_json_content = item.decoded_content
-            if f"{ hostname } dir" in item.name:
-                dir = raw_json_content
-                return(dir)
+        return(snapshots.get(hostname, "dir"))
+
+###################################################################
+#                     CHECK HELPERS SECTION                       #
+###################################################################
+
+def host_threshold_for(hostname, check, threshold):
+    """ The threshold a host is checked against: its own from the rules file overrides,
+    unless the test parameter was changed from the file default, which applies to every host """
+    if threshold == check.threshold:
+        return(OVERRIDES.threshold(hostname, check))
+    return(threshold)
+
+
+def threshold_text(check, threshold):
+    """ "85%" for the messages of a percentage check, noting hosts with their own threshold """
+    text = f'{ threshold }%'
+    if threshold == check.threshold and OVERRIDES.overridden(check.name):
+        text += ' (or the host\'s own threshold from the rules file)'
+    return(text)
+
+
+def metric_summary(hostnames, check, threshold, webex):
+    """ Log a host table for one host check and return the failing CheckResults
+
+    Each verdict is a CheckResult handed straight to the webex helper, so
+    nothing about the host or value is read back from testcase state.
+    """
+    failures = []
+    for hostname in hostnames:
+        value = fleet.metric(hostname, check.metric)
+        if value:
+            host_threshold = host_threshold_for(hostname, check, threshold)
+            verdict = 'Failed' if predicate(check.compare, host_threshold)(value) else 'Passed'
+            table_row = [hostname, value, verdict]
+            if verdict == 'Failed':
+                result = CheckResult(hostname, None, check.metric, value, host_threshold, verdict)
+                failures.append(result)
+                if WEBEX_ROOM and webex:
+                    webex(result)
+        else:
+            table_row = [hostname, 'N/A', 'N/A']
+
+        # display the table
+        log.info(tabulate([table_row],
+                          headers=['Device', check.label,
+                                   'Passed/Failed'],
+                          tablefmt='orgtbl'))
+    return(failures)
+
+
+def interface_summary(hostnames, rule, webex):
+    """ Log a per-host interface table for one rule and return {"hostname interface": CheckResult} of the failures
+
+    The table lists the Failed and N/A interfaces and ends with a count of the ones that passed.
+    """
+    results = fleet.interface_results(rule)
+    failed_interfaces = {}
+    for hostname in hostnames:
+        table_data = []
+        host_results, passed = results[hostname]
+        for result in host_results:
+            table_data.append([result.hostname, result.interface, result.value, result.verdict])
+            if result.verdict == 'Failed':
+                # Keyed by host and interface so equal port names on two hosts do not collide
+                failed_interfaces[f'{ result.hostname } { result.interface }'] = result
+                if WEBEX_ROOM and webex:
+                    webex(result)
+        if passed:
+            table_data.append([hostname, f'{ passed } interfaces', '', 'Passed'])
+
+        # display the table
+        log.info(tabulate(table_data,
+                          headers=['Device', 'Interface',
+                                   rule.label,
+                                   'Passed/Failed'],
+                          tablefmt='orgtbl'))
+    return(failed_interfaces)
+
+
+def describe(results, threshold=None):
+    """ "host value, ..." of failing results, noting hosts whose own threshold is not threshold """
+    return(", ".join(f'{ result.hostname } { result.value }' +
+                     (f' (threshold { result.threshold })' if threshold is not None and result.threshold != threshold else '')
+                     for result in results))
 
 ###################################################################
 #                     TESTCASES SECTION                           #
@@ -90,39 +251,13 @@ class Version_Check(aetest.Testcase):
     @aetest.setup
     def setup(self):
         self.list_of_hostnames = common_setup.get_hostname(self)
+        self.failed_nxos_version = []
+        self.failed_kickstart_version = []
     # Test for NXOS Version
     @aetest.test
-    def nxos_version(self, nxos_version_threshold = "9.3(8)"):
-        table_data = []
-        for hostname in self.list_of_hostnames:
-            self.version_info = common_setup.get_show_version(hostname)
-            self.failed_nxos_version = {}
-            json_version = json.loads(self.version_info)
-            self.version = json_version['nxos_ver_str']
-            if self.version:
-                table_row = []
-                table_row.append(hostname)
-                table_row.append(self.version)
-                if self.version != nxos_version_threshold:
-                    table_row.append('Failed')
-                    self.failed_nxos_version = self.version
-                    self.hostname = hostname
-                    if WEBEX_ROOM:
-                        self.failed_nxos_version_webex()                    
-                else:
-                    table_row.append('Passed')
-            else:
-                table_row.append(hostname)
-                table_row.append('N/A')
-                table_row.append('N/A')
-            table_data.append(table_row)
- 
-        # display the table
-            log.info(tabulate(table_data,
-                              headers=['Device','NXOS Version',
-                                       'Passed/Failed'],
-                              tablefmt='orgtbl'))
-            table_data = []
+    def nxos_version(self, nxos_version_threshold = HOST_CHECKS["nxos_version"].threshold):
+        self.failed_nxos_version = metric_summary(self.list_of_hostnames, HOST_CHECKS["nxos_version"], nxos_version_threshold,
+                                                  self.failed_nxos_version_webex)
 
         # should we pass or fail?
         if self.failed_nxos_version:
@@ -132,53 +267,21 @@ class Version_Check(aetest.Testcase):
             self.passed('All NXOS Version matches golden version')
  
     @aetest.test
-    def failed_nxos_version_check(self, nxos_version_threshold = "9.3(8)"):
-        if self.version == nxos_version_threshold:
+    def failed_nxos_version_check(self, nxos_version_threshold = HOST_CHECKS["nxos_version"].threshold):
+        if not self.failed_nxos_version:
             self.skipped('All Versions match the golden version')
         else:
-            self.failed(f'One or more of the NXOS version is { self.version } (threshold { nxos_version_threshold }')
+            self.failed(f'One or more of the NXOS version is { describe(self.failed_nxos_version, nxos_version_threshold) } (threshold { nxos_version_threshold }')
 
-    def failed_nxos_version_webex(self):
-        template_dir = Path(__file__).resolve().parent
-        env = Environment(loader=FileSystemLoader(str(template_dir)))
-        adaptive_card_template = env.get_template('failed_version_adaptive_card.j2')
-        adataptive_card_output = adaptive_card_template.render(roomid = WEBEX_ROOM, hostname=self.hostname, version=self.version, test="nxos")
-        webex_adaptive_card_response = requests.post('https://webexapis.com/v1/messages', data=adataptive_card_output, headers={"Content-Type": "application/json", "Authorization": f"Bearer { WEBEX_TOKEN }" })
-        log.info('The POST to WebEx had a response code of ' + str(webex_adaptive_card_response.status_code) + 'due to' + webex_adaptive_card_response.reason)
+    def failed_nxos_version_webex(self, result):
+        adataptive_card_output = render_card('failed_nxos_version_adaptive_card.j2', roomid = WEBEX_ROOM, hostname=result.hostname, version=result.value)
+        dispatcher.submit(adataptive_card_output, f'{ result.hostname } { result.metric }')
 
     # Test for kickstart version
     @aetest.test
-    def kickstart_version(self, kickstart_version_threshold = "9.3(8)"):
-        table_data = []
-        for hostname in self.list_of_hostnames:        
-            self.version_info = common_setup.get_show_version(hostname)
-            self.failed_kickstart_version = {}
-            json_version = json.loads(self.version_info)
-            self.version = json_version['kickstart_ver_str']
-            if self.version:
-                table_row = []
-                table_row.append(hostname)
-                table_row.append(self.version)
-                if self.version != kickstart_version_threshold:
-                    table_row.append('Failed')
-                    self.failed_kickstart_version = self.version
-                    self.hostname = hostname
-                    if WEBEX_ROOM:
-                        self.failed_kickstart_version_webex()
-                else:
-                    table_row.append('Passed')
-            else:
-                table_row.append(self.hostname)
-                table_row.append('N/A')
-                table_row.append('N/A')
-            table_data.append(table_row)
-            
-        # display the table
-            log.info(tabulate(table_data,
-                              headers=['Device','Kickstart Version',
-                                       'Passed/Failed'],
-                              tablefmt='orgtbl'))
-            table_data = []
+    def kickstart_version(self, kickstart_version_threshold = HOST_CHECKS["kickstart_version"].threshold):
+        self.failed_kickstart_version = metric_summary(self.list_of_hostnames, HOST_CHECKS["kickstart_version"], kickstart_version_threshold,
+                                                       self.failed_kickstart_version_webex)
 
         # should we pass or fail?
         if self.failed_kickstart_version:
@@ -188,115 +291,55 @@ class Version_Check(aetest.Testcase):
             self.passed('All Kickstart Version matches golden version')
  
     @aetest.test
-    def failed_kickstart_version_check(self, kickstart_version_threshold = "9.3(8)"):
-        if self.version == kickstart_version_threshold:
+    def failed_kickstart_version_check(self, kickstart_version_threshold = HOST_CHECKS["kickstart_version"].threshold):
+        if not self.failed_kickstart_version:
             self.skipped('All kickstart versions match the golden kickstart version')
         else:
-            self.failed(f'One or more kickstart versions is { self.version } (threshold { kickstart_version_threshold }')
+            self.failed(f'One or more kickstart versions is { describe(self.failed_kickstart_version, kickstart_version_threshold) } (threshold { kickstart_version_threshold }')
 
-    def failed_kickstart_version_webex(self):
-        template_dir = Path(__file__).resolve().parent
-        env = Environment(loader=FileSystemLoader(str(template_dir)))
-        adaptive_card_template = env.get_template('failed_version_adaptive_card.j2')
-        adataptive_card_output = adaptive_card_template.render(roomid = WEBEX_ROOM, hostname=self.hostname, version=self.version, test="kickstart")
-        webex_adaptive_card_response = requests.post('https://webexapis.com/v1/messages', data=adataptive_card_output, headers={"Content-Type": "application/json", "Authorization": f"Bearer { WEBEX_TOKEN }" })
-        log.info('The POST to WebEx had a response code of ' + str(webex_adaptive_card_response.status_code) + 'due to' + webex_adaptive_card_response.reason)
+    def failed_kickstart_version_webex(self, result):
+        adataptive_card_output = render_card('failed_kickstart_version_adaptive_card.j2', roomid = WEBEX_ROOM, hostname=result.hostname, version=result.value)
+        dispatcher.submit(adataptive_card_output, f'{ result.hostname } { result.metric }')
 
 class Resource_Check(aetest.Testcase):
     @aetest.setup
     def setup(self):
         self.list_of_hostnames = common_setup.get_hostname(self)
-
+        self.failed_cpu_state_idle = []
+        self.failed_current_memory_status = []
+        self.failed_15_minute_average = []
+        self.failed_5_minute_average = []
+        self.failed_1_minute_average = []
+        self.failed_memory_percentage = []
     # Test for CPU Idle > 15%
     @aetest.test
-    def cpu_state_idle(self, cpu_state_idle_threshold = 15):
-        table_data = []
-        for hostname in self.list_of_hostnames:
-            self.system_resources = common_setup.get_show_system_resources(hostname)
-            self.failed_cpu_state_idle = {}
-            json_system_resources = json.loads(self.system_resources)
-            self.cpu_state = float(json_system_resources['cpu_state_idle'])
-            if self.cpu_state:
-                table_row = []
-                table_row.append(hostname)
-                table_row.append(self.cpu_state)
-                if self.cpu_state <= cpu_state_idle_threshold:
-                    table_row.append('Failed')
-                    self.failed_cpu_state_idle = self.cpu_state
-                    self.hostname = hostname
-                    if WEBEX_ROOM:
-                        self.failed_cpu_state_idle_webex()
-                else:
-                    table_row.append('Passed')
-            else:
-                table_row.append(hostname)
-                table_row.append('N/A')
-                table_row.append('N/A')
-            table_data.append(table_row)
- 
-        # display the table
-            log.info(tabulate(table_data,
-                              headers=['Device','CPU State Idle',
-                                       'Passed/Failed'],
-                              tablefmt='orgtbl'))
-            table_data = []
+    def cpu_state_idle(self, cpu_state_idle_threshold = HOST_CHECKS["cpu_state_idle"].threshold):
+        self.failed_cpu_state_idle = metric_summary(self.list_of_hostnames, HOST_CHECKS["cpu_state_idle"], cpu_state_idle_threshold,
+                                                    self.failed_cpu_state_idle_webex)
 
         # should we pass or fail?
         if self.failed_cpu_state_idle:
             self.failed_cpu_state_idle_check()
-
-            self.failed('One or more CPU Idle State Is Less Than or Equal to 15%')
+            self.failed(f'One or more CPU Idle State Is Less Than or Equal to { threshold_text(HOST_CHECKS["cpu_state_idle"], cpu_state_idle_threshold) }')
         else:
-            self.passed('All CPU Idle States are Greater Than 15%')
+            self.passed(f'All CPU Idle States are Greater Than { threshold_text(HOST_CHECKS["cpu_state_idle"], cpu_state_idle_threshold) }')
  
     @aetest.test
-    def failed_cpu_state_idle_check(self, cpu_state_idle_threshold = 15):
-        if self.cpu_state >= cpu_state_idle_threshold:
-            self.skipped('All CPU Idle States Are Greater Than 15%')
+    def failed_cpu_state_idle_check(self, cpu_state_idle_threshold = HOST_CHECKS["cpu_state_idle"].threshold):
+        if not self.failed_cpu_state_idle:
+            self.skipped(f'All CPU Idle States Are Greater Than { threshold_text(HOST_CHECKS["cpu_state_idle"], cpu_state_idle_threshold) }')
         else:
-            self.failed(f'One or more CPU Idle States is at { self.cpu_state } (threshold { cpu_state_idle_threshold }')
+            self.failed(f'One or more CPU Idle States is at { describe(self.failed_cpu_state_idle, cpu_state_idle_threshold) } (threshold { cpu_state_idle_threshold }')
 
-    def failed_cpu_state_idle_webex(self):
-        template_dir = Path(__file__).resolve().parent
-        env = Environment(loader=FileSystemLoader(str(template_dir)))
-        adaptive_card_template = env.get_template('failed_system_resources_adaptive_card.j2')
-        adataptive_card_output = adaptive_card_template.render(roomid = WEBEX_ROOM, hostname=self.hostname, resource=self.cpu_state, test="cpu_idle_state")
-        webex_adaptive_card_response = requests.post('https://webexapis.com/v1/messages', data=adataptive_card_output, headers={"Content-Type": "application/json", "Authorization": f"Bearer { WEBEX_TOKEN }" })
-        log.info('The POST to WebEx had a response code of ' + str(webex_adaptive_card_response.status_code) + 'due to' + webex_adaptive_card_response.reason)
+    def failed_cpu_state_idle_webex(self, result):
+        adataptive_card_output = render_card('failed_cpu_state_idle_adaptive_card.j2', roomid = WEBEX_ROOM, hostname=result.hostname, resource=result.value)
+        dispatcher.submit(adataptive_card_output, f'{ result.hostname } { result.metric }')
 
-    # Test for CPU Idle > 15%
+    # Test for current memory status
     @aetest.test
-    def current_memory_status(self, current_memory_status_threshold = "OK"):
-        table_data = []
-        for hostname in self.list_of_hostnames:
-            self.system_resources = common_setup.get_show_system_resources(hostname)        
-            self.failed_current_memory_status = {}
-            json_system_resources = json.loads(self.system_resources)
-            self.memory_status = json_system_resources['current_memory_status']
-            if self.memory_status:
-                table_row = []
-                table_row.append(hostname)
-                table_row.append(self.memory_status)
-                if self.memory_status != current_memory_status_threshold:
-                    table_row.append('Failed')
-                    self.failed_current_memory_status = self.memory_status
-                    self.hostname = hostname
-                    if WEBEX_ROOM:
-                        self.failed_current_memory_status_webex()
-                else:
-                    table_row.append('Passed')
-            else:
-                table_row.append(hostname)
-                table_row.append('N/A')
-                table_row.append('N/A')
-            table_data.append(table_row)
- 
-        # display the table
-            log.info(tabulate(table_data,
-                              headers=['Device','Current Memory Status',
-                                       'Passed/Failed'],
-                              tablefmt='orgtbl'))
-            table_data = []
+    def current_memory_status(self, current_memory_status_threshold = HOST_CHECKS["current_memory_status"].threshold):
+        self.failed_current_memory_status = metric_summary(self.list_of_hostnames, HOST_CHECKS["current_memory_status"], current_memory_status_threshold,
+                                                           self.failed_current_memory_status_webex)
 
         # should we pass or fail?
         if self.failed_current_memory_status:
@@ -306,404 +349,208 @@ class Resource_Check(aetest.Testcase):
             self.passed('The Current Memory Status of all devices is OK')
  
     @aetest.test
-    def failed_current_memory_status_check(self, current_memory_status_threshold = "OK"):
-        if self.memory_status == current_memory_status_threshold:
+    def failed_current_memory_status_check(self, current_memory_status_threshold = HOST_CHECKS["current_memory_status"].threshold):
+        if not self.failed_current_memory_status:
             self.skipped('Current Memory Status of all devices OK')
         else:
-            self.failed(f'The Current Memory Status of one of the devices is { self.memory_status } (threshold { current_memory_status_threshold }')
+            self.failed(f'The Current Memory Status of one of the devices is { describe(self.failed_current_memory_status, current_memory_status_threshold) } (threshold { current_memory_status_threshold }')
 
-    def failed_current_memory_status_webex(self):
-        template_dir = Path(__file__).resolve().parent
-        env = Environment(loader=FileSystemLoader(str(template_dir)))
-        adaptive_card_template = env.get_template('failed_system_resources_adaptive_card.j2')
-        adataptive_card_output = adaptive_card_template.render(roomid = WEBEX_ROOM, hostname=self.hostname, resource=self.memory_status, test="current_memory_status")
-        webex_adaptive_card_response = requests.post('https://webexapis.com/v1/messages', data=adataptive_card_output, headers={"Content-Type": "application/json", "Authorization": f"Bearer { WEBEX_TOKEN }" })
-        log.info('The POST to WebEx had a response code of ' + str(webex_adaptive_card_response.status_code) + 'due to' + webex_adaptive_card_response.reason)
+    def failed_current_memory_status_webex(self, result):
+        adataptive_card_output = render_card('failed_current_memory_status_adaptive_card.j2', roomid = WEBEX_ROOM, hostname=result.hostname, resource=result.value)
+        dispatcher.submit(adataptive_card_output, f'{ result.hostname } { result.metric }')
 
     # Test for 15 minute load average
     @aetest.test
-    def fifteen_minute_average_load(self, minute_average_threshold = 85):
-        table_data = []
-        for hostname in self.list_of_hostnames:
-            self.system_resources = common_setup.get_show_system_resources(hostname)
-            self.failed_15_minute_average = {}
-            json_system_resources = json.loads(self.system_resources)
-            self.minute_average = float(json_system_resources['load_avg_15min'])
-            if self.minute_average:
-                table_row = []
-                table_row.append(hostname)
-                table_row.append(self.cpu_state)
-                if self.minute_average >= minute_average_threshold:
-                    table_row.append('Failed')
-                    self.failed_15_minute_average = self.minute_average
-                    if WEBEX_ROOM:
-                        self.failed_fifteen_minute_average_webex()
-                else:
-                    table_row.append('Passed')
-            else:
-                table_row.append(hostname)
-                table_row.append('N/A')
-                table_row.append('N/A')
-            table_data.append(table_row)
- 
-        # display the table
-            log.info(tabulate(table_data,
-                              headers=['Device','15 Minute Average',
-                                       'Passed/Failed'],
-                             tablefmt='orgtbl'))
-            table_data = []
+    def fifteen_minute_average_load(self, minute_average_threshold = HOST_CHECKS["fifteen_minute_average_load"].threshold):
+        self.failed_15_minute_average = metric_summary(self.list_of_hostnames, HOST_CHECKS["fifteen_minute_average_load"], minute_average_threshold,
+                                                       self.failed_fifteen_minute_average_webex)
 
         # should we pass or fail?
         if self.failed_15_minute_average:
             self.failed_fifteen_minute_average_status_check()
-            self.failed('The Current 15 Minutes Average Load of One of the Devices is Greater Than 85%')
+            self.failed(f'The Current 15 Minutes Average Load of One of the Devices is Greater Than { threshold_text(HOST_CHECKS["fifteen_minute_average_load"], minute_average_threshold) }')
         else:
-            self.passed('The Current 15 Minute Average Load of All Devices is Under 85%')
+            self.passed(f'The Current 15 Minute Average Load of All Devices is Under { threshold_text(HOST_CHECKS["fifteen_minute_average_load"], minute_average_threshold) }')
  
     @aetest.test
-    def failed_fifteen_minute_average_status_check(self, minute_average_threshold = 85):
-        if self.minute_average <= minute_average_threshold:
-            self.skipped('The Current 15 Minute Average Load of all devices is Under 85%')
+    def failed_fifteen_minute_average_status_check(self, minute_average_threshold = HOST_CHECKS["fifteen_minute_average_load"].threshold):
+        if not self.failed_15_minute_average:
+            self.skipped(f'The Current 15 Minute Average Load of all devices is Under { threshold_text(HOST_CHECKS["fifteen_minute_average_load"], minute_average_threshold) }')
         else:
-            self.failed(f'The Current 15 Minute Average Load of one of the devices is { self.minute_average } (threshold { minute_average_threshold }')
+            self.failed(f'The Current 15 Minute Average Load of one of the devices is { describe(self.failed_15_minute_average, minute_average_threshold) } (threshold { minute_average_threshold }')
 
-    def failed_fifteen_minute_average_webex(self):
-        template_dir = Path(__file__).resolve().parent
-        env = Environment(loader=FileSystemLoader(str(template_dir)))
-        adaptive_card_template = env.get_template('failed_system_resources_adaptive_card.j2')
-        adataptive_card_output = adaptive_card_template.render(roomid = WEBEX_ROOM, hostname=self.hostname, resource=self.minute_average, test="15_minute_load_average")
-        webex_adaptive_card_response = requests.post('https://webexapis.com/v1/messages', data=adataptive_card_output, headers={"Content-Type": "application/json", "Authorization": f"Bearer { WEBEX_TOKEN }" })
-        log.info('The POST to WebEx had a response code of ' + str(webex_adaptive_card_response.status_code) + 'due to' + webex_adaptive_card_response.reason)
+    def failed_fifteen_minute_average_webex(self, result):
+        adataptive_card_output = render_card('failed_fifteen_minute_average_load_adaptive_card.j2', roomid = WEBEX_ROOM, hostname=result.hostname, resource=result.value)
+        dispatcher.submit(adataptive_card_output, f'{ result.hostname } { result.metric }')
 
     # Test for 5 minute load average
     @aetest.test
-    def five_minute_average_load(self, minute_average_threshold = 85):
-        table_data = []
-        for hostname in self.list_of_hostnames:
-            self.system_resources = common_setup.get_show_system_resources(hostname)        
-            self.failed_5_minute_average = {}
-            json_system_resources = json.loads(self.system_resources)
-            self.minute_average = float(json_system_resources['load_avg_5min'])
-            if self.minute_average:
-                table_row = []
-                table_row.append(hostname)
-                table_row.append(self.cpu_state)
-                if self.minute_average >= minute_average_threshold:
-                    table_row.append('Failed')
-                    self.failed_5_minute_average = self.minute_average
-                    self.hostname = hostname
-                    if WEBEX_ROOM:
-                        self.failed_five_minute_average_webex()
-                else:
-                    table_row.append('Passed')
-            else:
-                table_row.append(hostname)
-                table_row.append('N/A')
-                table_row.append('N/A')
-            table_data.append(table_row)
- 
-        # display the table
-            log.info(tabulate(table_data,
-                              headers=['Device','5 Minute Average',
-                                       'Passed/Failed'],
-                              tablefmt='orgtbl'))
-            table_data = []
+    def five_minute_average_load(self, minute_average_threshold = HOST_CHECKS["five_minute_average_load"].threshold):
+        self.failed_5_minute_average = metric_summary(self.list_of_hostnames, HOST_CHECKS["five_minute_average_load"], minute_average_threshold,
+                                                      self.failed_five_minute_average_webex)
 
         # should we pass or fail?
         if self.failed_5_minute_average:
             self.failed_five_minute_average_status_check()
-            self.failed('The Current 5 Minutes Average Load of One or More Devices Is Greater Than 85%')
+            self.failed(f'The Current 5 Minutes Average Load of One or More Devices Is Greater Than { threshold_text(HOST_CHECKS["five_minute_average_load"], minute_average_threshold) }')
         else:
-            self.passed('The Current 5 Minute Average Load of All Devices is Under 85%')
+            self.passed(f'The Current 5 Minute Average Load of All Devices is Under { threshold_text(HOST_CHECKS["five_minute_average_load"], minute_average_threshold) }')
  
     @aetest.test
-    def failed_five_minute_average_status_check(self, minute_average_threshold = 85):
-        if self.minute_average <= minute_average_threshold:
-            self.skipped('The Current 5 Minute Average Load of All Devices is Under 85%')
+    def failed_five_minute_average_status_check(self, minute_average_threshold = HOST_CHECKS["five_minute_average_load"].threshold):
+        if not self.failed_5_minute_average:
+            self.skipped(f'The Current 5 Minute Average Load of All Devices is Under { threshold_text(HOST_CHECKS["five_minute_average_load"], minute_average_threshold) }')
         else:
-            self.failed(f'The Current 5 Minute Average Load of one or more Devices is { self.minute_average } (threshold { minute_average_threshold }')
+            self.failed(f'The Current 5 Minute Average Load of one or more Devices is { describe(self.failed_5_minute_average, minute_average_threshold) } (threshold { minute_average_threshold }')
 
-    def failed_five_minute_average_webex(self):
-        template_dir = Path(__file__).resolve().parent
-        env = Environment(loader=FileSystemLoader(str(template_dir)))
-        adaptive_card_template = env.get_template('failed_system_resources_adaptive_card.j2')
-        adataptive_card_output = adaptive_card_template.render(roomid = WEBEX_ROOM, hostname=self.hostname, resource=self.minute_average, test="5_minute_load_average")
-        webex_adaptive_card_response = requests.post('https://webexapis.com/v1/messages', data=adataptive_card_output, headers={"Content-Type": "application/json", "Authorization": f"Bearer { WEBEX_TOKEN }" })
-        log.info('The POST to WebEx had a response code of ' + str(webex_adaptive_card_response.status_code) + 'due to' + webex_adaptive_card_response.reason)
+    def failed_five_minute_average_webex(self, result):
+        adataptive_card_output = render_card('failed_five_minute_average_load_adaptive_card.j2', roomid = WEBEX_ROOM, hostname=result.hostname, resource=result.value)
+        dispatcher.submit(adataptive_card_output, f'{ result.hostname } { result.metric }')
 
     # Test for 1 minute load average
     @aetest.test
-    def one_minute_status_load(self, minute_average_threshold = 85):
-        table_data = []
-        for hostname in self.list_of_hostnames:
-            self.system_resources = common_setup.get_show_system_resources(hostname)        
-            self.failed_1_minute_average = {}
-            json_system_resources = json.loads(self.system_resources)
-            self.minute_average = float(json_system_resources['load_avg_1min'])
-            if self.minute_average:
-                table_row = []
-                table_row.append(hostname)
-                table_row.append(self.cpu_state)
-                if self.minute_average >= minute_average_threshold:
-                    table_row.append('Failed')
-                    self.failed_1_minute_average = self.minute_average
-                    self.hostname = hostname
-                    if WEBEX_ROOM:
-                        self.failed_one_minute_average_webex()
-                else:
-                    table_row.append('Passed')
-            else:
-                table_row.append(hostname)
-                table_row.append('N/A')
-                table_row.append('N/A')
-            table_data.append(table_row)
- 
-        # display the table
-            log.info(tabulate(table_data,
-                              headers=['Device','1 Minute Average',
-                                       'Passed/Failed'],
-                              tablefmt='orgtbl'))
-            table_data = []
+    def one_minute_status_load(self, minute_average_threshold = HOST_CHECKS["one_minute_average_load"].threshold):
+        self.failed_1_minute_average = metric_summary(self.list_of_hostnames, HOST_CHECKS["one_minute_average_load"], minute_average_threshold,
+                                                      self.failed_one_minute_average_webex)
 
         # should we pass or fail?
         if self.failed_1_minute_average:
             self.failed_one_minute_average_status_check()
-            self.failed('The Current 1 Minutes Average Load of One or More Devices is Greater Than 85%')
+            self.failed(f'The Current 1 Minutes Average Load of One or More Devices is Greater Than { threshold_text(HOST_CHECKS["one_minute_average_load"], minute_average_threshold) }')
         else:
-            self.passed('The Current 1 Minute Average Load for All Devices is Under 85%')
+            self.passed(f'The Current 1 Minute Average Load for All Devices is Under { threshold_text(HOST_CHECKS["one_minute_average_load"], minute_average_threshold) }')
  
     @aetest.test
-    def failed_one_minute_average_status_check(self, minute_average_threshold = 85):
-        if self.minute_average <= minute_average_threshold:
-            self.skipped('The Current 1 Minute Average Load for All Devices is Under 85%')
+    def failed_one_minute_average_status_check(self, minute_average_threshold = HOST_CHECKS["one_minute_average_load"].threshold):
+        if not self.failed_1_minute_average:
+            self.skipped(f'The Current 1 Minute Average Load for All Devices is Under { threshold_text(HOST_CHECKS["one_minute_average_load"], minute_average_threshold) }')
         else:
-            self.failed(f'The Current 1 Minute Average Load of one or more Devices is { self.minute_average } (threshold { minute_average_threshold }')
+            self.failed(f'The Current 1 Minute Average Load of one or more Devices is { describe(self.failed_1_minute_average, minute_average_threshold) } (threshold { minute_average_threshold }')
 
-    def failed_one_minute_average_webex(self):
-        template_dir = Path(__file__).resolve().parent
-        env = Environment(loader=FileSystemLoader(str(template_dir)))
-        adaptive_card_template = env.get_template('failed_system_resources_adaptive_card.j2')
-        adataptive_card_output = adaptive_card_template.render(roomid = WEBEX_ROOM, hostname=self.hostname, resource=self.minute_average, test="1_minute_load_average")
-        webex_adaptive_card_response = requests.post('https://webexapis.com/v1/messages', data=adataptive_card_output, headers={"Content-Type": "application/json", "Authorization": f"Bearer { WEBEX_TOKEN }" })
-        log.info('The POST to WebEx had a response code of ' + str(webex_adaptive_card_response.status_code) + 'due to' + webex_adaptive_card_response.reason)
+    def failed_one_minute_average_webex(self, result):
+        adataptive_card_output = render_card('failed_one_minute_average_load_adaptive_card.j2', roomid = WEBEX_ROOM, hostname=result.hostname, resource=result.value)
+        dispatcher.submit(adataptive_card_output, f'{ result.hostname } { result.metric }')
 
     # Test for memory percentage
     @aetest.test
-    def memory_percentage(self, memory_percentage_threshold = 85):
-        table_data = []
-        for hostname in self.list_of_hostnames:
-            self.system_resources = common_setup.get_show_system_resources(hostname)        
-            self.failed_memory_percentage = 0
-            json_system_resources = json.loads(self.system_resources)
-            self.memory_usage_total = int(json_system_resources['memory_usage_total'])
-            self.memory_usage_used = int(json_system_resources['memory_usage_used'])
-            self.memory_percentage_value = self.memory_usage_used / self.memory_usage_total * 100
-            if self.memory_percentage_value != 0:
-                table_row = []
-                table_row.append(hostname)
-                table_row.append(self.cpu_state)
-                if self.memory_percentage_value >= memory_percentage_threshold:
-                    table_row.append('Failed')
-                    self.failed_memory_percentage = self.memory_percentage_value
-                    self.hostname = hostname
-                    if WEBEX_ROOM:
-                        self.failed_memory_percentage_webex()
-                else:
-                    table_row.append('Passed')
-            else:
-                table_row.append(hostname)
-                table_row.append('N/A')
-                table_row.append('N/A')
-            table_data.append(table_row)
- 
-        # display the table
-            log.info(tabulate(table_data,
-                              headers=['Device','Memory Percentage',
-                                       'Passed/Failed'],
-                              tablefmt='orgtbl'))
-            table_data = []
+    def memory_percentage(self, memory_percentage_threshold = HOST_CHECKS["memory_percentage"].threshold):
+        self.failed_memory_percentage = metric_summary(self.list_of_hostnames, HOST_CHECKS["memory_percentage"], memory_percentage_threshold,
+                                                       self.failed_memory_percentage_webex)
 
         # should we pass or fail?
         if self.failed_memory_percentage:
             self.failed_memory_percentage_check()
-            self.failed('The Current Available Memory of One or More Devices is Less Than 85%')
+            self.failed(f'The Current Available Memory of One or More Devices is Less Than { threshold_text(HOST_CHECKS["memory_percentage"], memory_percentage_threshold) }')
         else:
-            self.passed('The Current Available Memory of All Devices is Greater Than 85%')
+            self.passed(f'The Current Available Memory of All Devices is Greater Than { threshold_text(HOST_CHECKS["memory_percentage"], memory_percentage_threshold) }')
  
     @aetest.test
-    def failed_memory_percentage_check(self, memory_percentage_threshold = 85):
-        if self.failed_memory_percentage <= memory_percentage_threshold:
-            self.skipped('The Current Available Memory of All Devices is Less Than 85%')
+    def failed_memory_percentage_check(self, memory_percentage_threshold = HOST_CHECKS["memory_percentage"].threshold):
+        if not self.failed_memory_percentage:
+            self.skipped(f'The Current Available Memory of All Devices is Less Than { threshold_text(HOST_CHECKS["memory_percentage"], memory_percentage_threshold) }')
         else:
-            self.failed(f'The Current Available Memory of one or more Devices is { self.minute_average }% (threshold { memory_percentage_threshold }')
+            self.failed(f'The Current Available Memory of one or more Devices is { describe(self.failed_memory_percentage, memory_percentage_threshold) }% (threshold { memory_percentage_threshold }')
 
-    def failed_memory_percentage_webex(self):
-        template_dir = Path(__file__).resolve().parent
-        env = Environment(loader=FileSystemLoader(str(template_dir)))
-        adaptive_card_template = env.get_template('failed_system_resources_adaptive_card.j2')
-        adataptive_card_output = adaptive_card_template.render(roomid = WEBEX_ROOM, hostname=self.hostname, resource=self.minute_average, test="memory_percentage")
-        webex_adaptive_card_response = requests.post('https://webexapis.com/v1/messages', data=adataptive_card_output, headers={"Content-Type": "application/json", "Authorization": f"Bearer { WEBEX_TOKEN }" })
-        log.info('The POST to WebEx had a response code of ' + str(webex_adaptive_card_response.status_code) + 'due to' + webex_adaptive_card_response.reason)
+    def failed_memory_percentage_webex(self, result):
+        adataptive_card_output = render_card('failed_memory_percentage_adaptive_card.j2', roomid = WEBEX_ROOM, hostname=result.hostname, resource=result.value)
+        dispatcher.submit(adataptive_card_output, f'{ result.hostname } { result.metric }')
 
 class Directory_Check(aetest.Testcase):
     @aetest.setup
     def setup(self):
         self.list_of_hostnames = common_setup.get_hostname(self)
-
+        self.failed_free_diskspace = []
+        self.failed_bin_file = []
     # Test for free diskspace
     @aetest.test
-    def free_diskspace(self, free_diskspace_threshold = 85):
-        table_data = []
-        for hostname in self.list_of_hostnames:
-            self.directory_info = common_setup.get_dir(hostname)
-            self.failed_free_diskspace = 0
-            json_version = json.loads(self.directory_info)
-            self.total_diskspace = int(json_version['bytestotal'])
-            self.used_diskspace = int(json_version['bytesused'])
-            self.diskpace_percentage_value = self.used_diskspace / self.total_diskspace * 100
-            if self.diskpace_percentage_value:
-                table_row = []
-                table_row.append(hostname)
-                table_row.append(self.diskpace_percentage_value)
-                if self.diskpace_percentage_value >= free_diskspace_threshold:
-                    table_row.append('Failed')
-                    self.failed_free_diskspace = self.diskpace_percentage_value
-                    self.hostname = hostname
-                    if WEBEX_ROOM:
-                        self.failed_free_diskspace_webex()
-                else:
-                    table_row.append('Passed')
-            else:
-                table_row.append(hostname)
-                table_row.append('N/A')
-                table_row.append('N/A')
-            table_data.append(table_row)
- 
-        # display the table
-            log.info(tabulate(table_data,
-                              headers=['Device','Diskspace Used Percentage',
-                                       'Passed/Failed'],
-                              tablefmt='orgtbl'))
-            table_data = []
+    def free_diskspace(self, free_diskspace_threshold = HOST_CHECKS["free_diskspace"].threshold):
+        self.failed_free_diskspace = metric_summary(self.list_of_hostnames, HOST_CHECKS["free_diskspace"], free_diskspace_threshold,
+                                                    self.failed_free_diskspace_webex)
 
         # should we pass or fail?
-        if self.failed_free_diskspace != 0:
+        if self.failed_free_diskspace:
             self.failed_free_diskspace_check()
-            self.failed('The free diskspace of one or more devices is less than 85%')
+            self.failed(f'The free diskspace of one or more devices is less than { threshold_text(HOST_CHECKS["free_diskspace"], free_diskspace_threshold) }')
         else:
-            self.passed('The free diskspace on all devices is greater than 85%')
+            self.passed(f'The free diskspace on all devices is greater than { threshold_text(HOST_CHECKS["free_diskspace"], free_diskspace_threshold) }')
  
     @aetest.test
-    def failed_free_diskspace_check(self, free_diskspace_threshold = 85):
-        if self.failed_free_diskspace <= free_diskspace_threshold:
-            self.skipped('The free diskspace on all devices is greater than 85%')
+    def failed_free_diskspace_check(self, free_diskspace_threshold = HOST_CHECKS["free_diskspace"].threshold):
+        if not self.failed_free_diskspace:
+            self.skipped(f'The free diskspace on all devices is greater than { threshold_text(HOST_CHECKS["free_diskspace"], free_diskspace_threshold) }')
         else:
-            self.failed(f'The free diskspace percentage on one or more devices is { self.failed_free_diskspace } (threshold { free_diskspace_threshold }')
+            self.failed(f'The free diskspace percentage on one or more devices is { describe(self.failed_free_diskspace, free_diskspace_threshold) } (threshold { free_diskspace_threshold }')
 
-    def failed_free_diskspace_webex(self):
-        template_dir = Path(__file__).resolve().parent
-        env = Environment(loader=FileSystemLoader(str(template_dir)))
-        adaptive_card_template = env.get_template('failed_dir_adaptive_card.j2')
-        adataptive_card_output = adaptive_card_template.render(roomid = WEBEX_ROOM, hostname=self.hostname, diskspace=self.failed_free_diskspace, test="diskspace")
-        webex_adaptive_card_response = requests.post('https://webexapis.com/v1/messages', data=adataptive_card_output, headers={"Content-Type": "application/json", "Authorization": f"Bearer { WEBEX_TOKEN }" })
-        log.info('The POST to WebEx had a response code of ' + str(webex_adaptive_card_response.status_code) + 'due to' + webex_adaptive_card_response.reason)
+    def failed_free_diskspace_webex(self, result):
+        adataptive_card_output = render_card('failed_free_diskspace_adaptive_card.j2', roomid = WEBEX_ROOM, hostname=result.hostname, diskspace=result.value)
+        dispatcher.submit(adataptive_card_output, f'{ result.hostname } { result.metric }')
 
     # Test for bin file
     @aetest.test
-    def directory_has_bin_file(self, bin_file_threshold = "nxos.9.3.8.bin"):
+    def directory_has_bin_file(self, bin_file_threshold = HOST_CHECKS["bin_file"].threshold):
+        check = HOST_CHECKS["bin_file"]
         table_data = []
+        self.failed_bin_file = []
         for hostname in self.list_of_hostnames:
-            self.directory_info = common_setup.get_dir(hostname)        
-            self.file_list = []
-            json_interfaces = json.loads(self.directory_info)
-            for item in json_interfaces['TABLE_dir']['ROW_dir']:
-                if 'fname' in item:
-                    self.file_list.append(item['fname'])
-            for file in self.file_list:
+            file_list = fleet.metric(hostname, check.metric)
+            if file_list is None:
+                table_data.append([hostname, 'N/A', 'N/A'])
+                continue
+            golden_image = host_threshold_for(hostname, check, bin_file_threshold)
+            for file in file_list:
                 if file:
                     table_row = []
                     table_row.append(hostname)
                     table_row.append(file)
-                    if file == bin_file_threshold:                
+                    if file == golden_image:
                         table_row.append('Passed')
                     else:
                         table_row.append('Failed')
-                        self.hostname = hostname
-                table_data.append(table_row)
+                    table_data.append(table_row)
+            if predicate(check.compare, golden_image)(file_list):
+                result = CheckResult(hostname, None, check.metric, None, golden_image, 'Failed')
+                self.failed_bin_file.append(result)
+                if WEBEX_ROOM:
+                    self.failed_bin_webex(result)
  
         # display the table
         log.info(tabulate(table_data,
-                          headers=['Device', 'Bin File',
+                          headers=['Device', check.label,
                                    'Passed/Failed'],
                           tablefmt='orgtbl'))
 
         # should we pass or fail?
-        if bin_file_threshold not in self.file_list:
+        if self.failed_bin_file:
             self.failed_bin_check()
             self.failed('One of the devices is Missing golden image')
         else:
             self.passed('Golden Image Present on All Devices')
  
     @aetest.test
-    def failed_bin_check(self, bin_file_threshold = "nxos.9.3.8.bin"):
-        if bin_file_threshold in self.file_list:
+    def failed_bin_check(self, bin_file_threshold = HOST_CHECKS["bin_file"].threshold):
+        if not self.failed_bin_file:
             self.skipped('Golden Image Present on All Devices')
         else:
-            self.failed(f'The image file { bin_file_threshold } is not present in bootflash on one or more devices')
+            self.failed(f'The image file { bin_file_threshold } is not present in bootflash on { ", ".join(result.hostname if result.threshold == bin_file_threshold else f"{ result.hostname } ({ result.threshold })" for result in self.failed_bin_file) }')
 
-    def failed_bin_webex(self, bin_file_threshold = "nxos.9.3.8.bin"):
-        template_dir = Path(__file__).resolve().parent
-        env = Environment(loader=FileSystemLoader(str(template_dir)))
-        adaptive_card_template = env.get_template('failed_dir_adaptive_card.j2')
-        adataptive_card_output = adaptive_card_template.render(roomid = WEBEX_ROOM, hostname=self.hostname, bin_file=bin_file_threshold, test="bin_file")
-        webex_adaptive_card_response = requests.post('https://webexapis.com/v1/messages', data=adataptive_card_output, headers={"Content-Type": "application/json", "Authorization": f"Bearer { WEBEX_TOKEN }" })
-        log.info('The POST to WebEx had a response code of ' + str(webex_adaptive_card_response.status_code) + 'due to' + webex_adaptive_card_response.reason)
+    def failed_bin_webex(self, result):
+        adataptive_card_output = render_card('failed_bin_file_adaptive_card.j2', roomid = WEBEX_ROOM, hostname=result.hostname, bin_file=result.threshold)
+        dispatcher.submit(adataptive_card_output, f'{ result.hostname } { result.metric }')
 
 class Interface_Errors_Count_Check(aetest.Testcase):
     @aetest.setup
     def setup(self):
         self.list_of_hostnames = common_setup.get_hostname(self)
 
+    def interface_summary(self, rule_name, threshold):
+        # A test parameter other than the rule default re-evaluates just that rule
+        rule = INTERFACE_RULES_BY_NAME[rule_name]._replace(threshold = threshold)
+        self.failed_interfaces = interface_summary(self.list_of_hostnames, rule, notifications.add)
+
     # Test for babble
     @aetest.test
-    def interface_eth_babbles_counter_summary(self, eth_babbles_threshold = 0):
-        table_data = []
-        self.failed_interfaces = {}
-        for hostname in self.list_of_hostnames:
-            self.interface_info = common_setup.get_show_interface(hostname)
-            json_interfaces = json.loads(self.interface_info)
-            for intf in json_interfaces['TABLE_interface']['ROW_interface']:
-                if 'eth_babbles' in intf:
-                    counter = intf['eth_babbles']
-                    if counter:
-                        table_row = []
-                        table_row.append(hostname)
-                        table_row.append(intf['interface'])
-                        table_row.append(counter)
-                        if int(counter) > eth_babbles_threshold:
-                            table_row.append('Failed')
-                            self.failed_interfaces[intf['interface']] = int(counter)
-                            self.interface_name = intf['interface']
-                            error_counter = self.failed_interfaces[intf['interface']]
-                            self.hostname = hostname
-                            if WEBEX_ROOM:
-                                self.interface_babbles_webex(name = error_counter)
-                        else:
-                            table_row.append('Passed')
-                    else:
-                        table_row.append(hostname)
-                        table_row.append(intf)
-                        table_row.append('N/A')
-                        table_row.append('N/A')
-                    table_data.append(table_row)
- 
-        # display the table
-            log.info(tabulate(table_data,
-                              headers=['Device', 'Interface',
-                                       'Babbles Counter',
-                                       'Passed/Failed'],
-                              tablefmt='orgtbl'))
-            table_data = []
+    def interface_eth_babbles_counter_summary(self, eth_babbles_threshold = INTERFACE_RULES_BY_NAME["babbles"].threshold):
+        self.interface_summary("babbles", eth_babbles_threshold)
 
         # should we pass or fail?
         if self.failed_interfaces:
@@ -714,60 +561,16 @@ class Interface_Errors_Count_Check(aetest.Testcase):
             self.passed('No interfaces have babbles')
  
     @aetest.test
-    def interface_babbles_check(self, name = None, babbles_threshold = 0):
+    def interface_babbles_check(self, name = None, babbles_threshold = INTERFACE_RULES_BY_NAME["babbles"].threshold):
         if name is None:
             self.skipped('no interface babbles')
         else:
-            self.failed(f'{ self.hostname } Interface { name } has babbles { self.failed_interfaces[name] } (threshold { babbles_threshold }')
-
-    def interface_babbles_webex(self, name):
-        template_dir = Path(__file__).resolve().parent
-        env = Environment(loader=FileSystemLoader(str(template_dir)))
-        adaptive_card_template = env.get_template('failed_show_interface_adaptive_card.j2')
-        adataptive_card_output = adaptive_card_template.render(roomid = WEBEX_ROOM, hostname=self.hostname, failure=name, interface=self.interface_name, test="babbles")
-        webex_adaptive_card_response = requests.post('https://webexapis.com/v1/messages', data=adataptive_card_output, headers={"Content-Type": "application/json", "Authorization": f"Bearer { WEBEX_TOKEN }" })
-        log.info('The POST to WebEx had a response code of ' + str(webex_adaptive_card_response.status_code) + 'due to' + webex_adaptive_card_response.reason)
+            self.failed(f'Interface { name } has babbles { self.failed_interfaces[name].value } (threshold { self.failed_interfaces[name].threshold }')
 
     # test for bad ethernet
     @aetest.test
-    def interface_bad_eth_counter_summary(self, bad_eth_threshold = 0):
-        table_data = []
-        self.failed_interfaces = {}
-        for hostname in self.list_of_hostnames:
-            self.interface_info = common_setup.get_show_interface(hostname)        
-            json_interfaces = json.loads(self.interface_info)
-            for intf in json_interfaces['TABLE_interface']['ROW_interface']:
-                if 'eth_bad_eth' in intf:
-                    counter = intf['eth_bad_eth']
-                    if counter:
-                        table_row = []
-                        table_row.append(hostname)
-                        table_row.append(intf['interface'])
-                        table_row.append(counter)
-                        if int(counter) > bad_eth_threshold:
-                            table_row.append('Failed')
-                            self.failed_interfaces[intf['interface']] = int(counter)
-                            self.interface_name = intf['interface']
-                            error_counter = self.failed_interfaces[intf['interface']]
-                            self.hostname = hostname                            
-                            if WEBEX_ROOM:
-                                self.interface_bad_eth_check_webex(name = error_counter)
-                        else:
-                            table_row.append('Passed')
-                    else:
-                        table_row.append(hostname)
-                        table_row.append(intf)
-                        table_row.append('N/A')
-                        table_row.append('N/A')
-                    table_data.append(table_row)
- 
-        # display the table
-            log.info(tabulate(table_data,
-                              headers=['Device', 'Interface',
-                                       'Bad Ethernet Errors Counter',
-                                       'Passed/Failed'],
-                              tablefmt='orgtbl'))
-            table_data = []
+    def interface_bad_eth_counter_summary(self, bad_eth_threshold = INTERFACE_RULES_BY_NAME["bad_eth"].threshold):
+        self.interface_summary("bad_eth", bad_eth_threshold)
 
         # should we pass or fail?
         if self.failed_interfaces:
@@ -778,60 +581,17 @@ class Interface_Errors_Count_Check(aetest.Testcase):
             self.passed('No interfaces have Bad Ethernet errors')
  
     @aetest.test
-    def interface_bad_eth_check(self, name = None, bad_eth_threshold = 0):
+    def interface_bad_eth_check(self, name = None, bad_eth_threshold = INTERFACE_RULES_BY_NAME["bad_eth"].threshold):
         if name is None:
             self.skipped('no interface bad ethernet errors')
         else:
-            self.failed(f'Interface { name } has bad ethernet errors { self.failed_interfaces[name] } (threshold { bad_eth_threshold }')
-
-    def interface_bad_eth_check_webex(self, name):
-        template_dir = Path(__file__).resolve().parent
-        env = Environment(loader=FileSystemLoader(str(template_dir)))
-        adaptive_card_template = env.get_template('failed_show_interface_adaptive_card.j2')
-        adataptive_card_output = adaptive_card_template.render(roomid = WEBEX_ROOM, hostname=self.hostname, failure=name, interface=self.interface_name, test="bad_eth")
-        webex_adaptive_card_response = requests.post('https://webexapis.com/v1/messages', data=adataptive_card_output, headers={"Content-Type": "application/json", "Authorization": f"Bearer { WEBEX_TOKEN }" })
-        log.info('The POST to WebEx had a response code of ' + str(webex_adaptive_card_response.status_code) + 'due to' + webex_adaptive_card_response.reason)
+            self.failed(f'Interface { name } has bad ethernet errors { self.failed_interfaces[name].value } (threshold { self.failed_interfaces[name].threshold }')
 
     # test for bad protocols
     @aetest.test
-    def interface_bad_protocol_counter_summary(self, bad_protocol_threshold = 0):
-        table_data = []
-        self.failed_interfaces = {}
-        for hostname in self.list_of_hostnames:
-            self.interface_info = common_setup.get_show_interface(hostname)        
-            json_interfaces = json.loads(self.interface_info)
-            for intf in json_interfaces['TABLE_interface']['ROW_interface']:
-                if 'eth_bad_proto' in intf:
-                    counter = intf['eth_bad_proto']
-                    if counter:
-                        table_row = []
-                        table_row.append(hostname)
-                        table_row.append(intf['interface'])
-                        table_row.append(counter)
-                        if int(counter) > bad_protocol_threshold:
-                            table_row.append('Failed')
-                            self.failed_interfaces[intf['interface']] = int(counter)
-                            self.interface_name = intf['interface']
-                            error_counter = self.failed_interfaces[intf['interface']]
-                            self.hostname = hostname
-                            if WEBEX_ROOM:
-                                self.interface_bad_protocol_check_webex(name = error_counter)
-                        else:
-                            table_row.append('Passed')
-                    else:
-                        table_row.append(hostname)
-                        table_row.append(intf)
-                        table_row.append('N/A')
-                        table_row.append('N/A')
-                    table_data.append(table_row)
- 
-        # display the table
-            log.info(tabulate(table_data,
-                              headers=['Device', 'Interface',
-                                       'Bad Protocol Errors Counter',
-                                       'Passed/Failed'],
-                              tablefmt='orgtbl'))
-            table_data = []
+    def interface_bad_protocol_counter_summary(self, bad_protocol_threshold = INTERFACE_RULES_BY_NAME["bad_protocol"].threshold):
+        self.interface_summary("bad_protocol", bad_protocol_threshold)
+
         # should we pass or fail?
         if self.failed_interfaces:
             aetest.loop.mark(self.interface_bad_protocol_check,
@@ -841,60 +601,16 @@ class Interface_Errors_Count_Check(aetest.Testcase):
             self.passed('No interfaces have Bad Protocol errors')
  
     @aetest.test
-    def interface_bad_protocol_check(self, name = None, bad_protocol_threshold = 0):
+    def interface_bad_protocol_check(self, name = None, bad_protocol_threshold = INTERFACE_RULES_BY_NAME["bad_protocol"].threshold):
         if name is None:
             self.skipped('no interface bad protocol errors')
         else:
-            self.failed(f'Interface { name } has bad protocol errors { self.failed_interfaces[name] } (threshold { bad_protocol_threshold }')
-
-    def interface_bad_protocol_check_webex(self, name):
-        template_dir = Path(__file__).resolve().parent
-        env = Environment(loader=FileSystemLoader(str(template_dir)))
-        adaptive_card_template = env.get_template('failed_show_interface_adaptive_card.j2')
-        adataptive_card_output = adaptive_card_template.render(roomid = WEBEX_ROOM, hostname=self.hostname, failure=name, interface=self.interface_name, test="bad_protocol")
-        webex_adaptive_card_response = requests.post('https://webexapis.com/v1/messages', data=adataptive_card_output, headers={"Content-Type": "application/json", "Authorization": f"Bearer { WEBEX_TOKEN }" })
-        log.info('The POST to WebEx had a response code of ' + str(webex_adaptive_card_response.status_code) + 'due to' + webex_adaptive_card_response.reason)
+            self.failed(f'Interface { name } has bad protocol errors { self.failed_interfaces[name].value } (threshold { self.failed_interfaces[name].threshold }')
 
     # test for collisions
     @aetest.test
-    def interface_collisions_counter_summary(self, collisions_threshold = 0):
-        table_data = []
-        self.failed_interfaces = {}
-        for hostname in self.list_of_hostnames:
-            self.interface_info = common_setup.get_show_interface(hostname)        
-            json_interfaces = json.loads(self.interface_info)
-            for intf in json_interfaces['TABLE_interface']['ROW_interface']:
-                if 'eth_coll' in intf:
-                    counter = intf['eth_coll']
-                    if counter:
-                        table_row = []
-                        table_row.append(hostname)
-                        table_row.append(intf['interface'])
-                        table_row.append(counter)
-                        if int(counter) > collisions_threshold:
-                            table_row.append('Failed')
-                            self.failed_interfaces[intf['interface']] = int(counter)
-                            self.interface_name = intf['interface']
-                            error_counter = self.failed_interfaces[intf['interface']]
-                            self.hostname = hostname
-                            if WEBEX_ROOM:
-                                self.interface_collisions_webex(name = error_counter)
-                        else:
-                            table_row.append('Passed')
-                    else:
-                        table_row.append(hostname)
-                        table_row.append(intf)
-                        table_row.append('N/A')
-                        table_row.append('N/A')
-                    table_data.append(table_row)
- 
-        # display the table
-            log.info(tabulate(table_data,
-                              headers=['Device', 'Interface',
-                                       'Collisions Counter',
-                                       'Passed/Failed'],
-                              tablefmt='orgtbl'))
-            table_data = []
+    def interface_collisions_counter_summary(self, collisions_threshold = INTERFACE_RULES_BY_NAME["collisions"].threshold):
+        self.interface_summary("collisions", collisions_threshold)
 
         # should we pass or fail?
         if self.failed_interfaces:
@@ -905,60 +621,16 @@ class Interface_Errors_Count_Check(aetest.Testcase):
             self.passed('No interfaces have Collisions')
  
     @aetest.test
-    def interface_collisions_check(self, name = None, collisions_threshold = 0):
+    def interface_collisions_check(self, name = None, collisions_threshold = INTERFACE_RULES_BY_NAME["collisions"].threshold):
         if name is None:
             self.skipped('no interface collisions')
         else:
-            self.failed(f'Interface { name } has collisions { self.failed_interfaces[name] } (threshold { collisions_threshold }')
-
-    def interface_collisions_webex(self, name):
-        template_dir = Path(__file__).resolve().parent
-        env = Environment(loader=FileSystemLoader(str(template_dir)))
-        adaptive_card_template = env.get_template('failed_show_interface_adaptive_card.j2')
-        adataptive_card_output = adaptive_card_template.render(roomid = WEBEX_ROOM, hostname=self.hostname, failure=name, interface=self.interface_name, test="collisions")
-        webex_adaptive_card_response = requests.post('https://webexapis.com/v1/messages', data=adataptive_card_output, headers={"Content-Type": "application/json", "Authorization": f"Bearer { WEBEX_TOKEN }" })
-        log.info('The POST to WebEx had a response code of ' + str(webex_adaptive_card_response.status_code) + 'due to' + webex_adaptive_card_response.reason)
+            self.failed(f'Interface { name } has collisions { self.failed_interfaces[name].value } (threshold { self.failed_interfaces[name].threshold }')
 
     # test for CRCs
     @aetest.test
-    def interface_crc_counter_summary(self, crc_threshold = 0):
-        table_data = []
-        self.failed_interfaces = {}
-        for hostname in self.list_of_hostnames:
-            self.interface_info = common_setup.get_show_interface(hostname)
-            json_interfaces = json.loads(self.interface_info)
-            for intf in json_interfaces['TABLE_interface']['ROW_interface']:
-                if 'eth_crc' in intf:
-                    counter = intf['eth_crc']
-                    if counter:
-                        table_row = []
-                        table_row.append(hostname)
-                        table_row.append(intf['interface'])
-                        table_row.append(counter)
-                        if int(counter) > crc_threshold:
-                            table_row.append('Failed')
-                            self.failed_interfaces[intf['interface']] = int(counter)
-                            self.interface_name = intf['interface']
-                            error_counter = self.failed_interfaces[intf['interface']]
-                            self.hostname = hostname
-                            if WEBEX_ROOM:
-                                self.interface_crc_webex(name = error_counter)
-                        else:
-                            table_row.append('Passed')
-                    else:
-                        table_row.append(hostname)
-                        table_row.append(intf)
-                        table_row.append('N/A')
-                        table_row.append('N/A')
-                    table_data.append(table_row)
- 
-        # display the table
-            log.info(tabulate(table_data,
-                              headers=['Device', 'Interface',
-                                       'CRC Errors Counter',
-                                       'Passed/Failed'],
-                              tablefmt='orgtbl'))
-            table_data = []
+    def interface_crc_counter_summary(self, crc_threshold = INTERFACE_RULES_BY_NAME["crc"].threshold):
+        self.interface_summary("crc", crc_threshold)
 
         # should we pass or fail?
         if self.failed_interfaces:
@@ -969,60 +641,16 @@ class Interface_Errors_Count_Check(aetest.Testcase):
             self.passed('No interfaces have CRC errors')
  
     @aetest.test
-    def interface_crc_check(self, name = None, crc_threshold = 0):
+    def interface_crc_check(self, name = None, crc_threshold = INTERFACE_RULES_BY_NAME["crc"].threshold):
         if name is None:
             self.skipped('no interface crc errors')
         else:
-            self.failed(f'Interface { name } has crc errors { self.failed_interfaces[name] } (threshold { crc_threshold }')
-
-    def interface_crc_webex(self, name):
-        template_dir = Path(__file__).resolve().parent
-        env = Environment(loader=FileSystemLoader(str(template_dir)))
-        adaptive_card_template = env.get_template('failed_show_interface_adaptive_card.j2')
-        adataptive_card_output = adaptive_card_template.render(roomid = WEBEX_ROOM, hostname=self.hostname, failure=name, interface=self.interface_name, test="crc")
-        webex_adaptive_card_response = requests.post('https://webexapis.com/v1/messages', data=adataptive_card_output, headers={"Content-Type": "application/json", "Authorization": f"Bearer { WEBEX_TOKEN }" })
-        log.info('The POST to WebEx had a response code of ' + str(webex_adaptive_card_response.status_code) + 'due to' + webex_adaptive_card_response.reason)
+            self.failed(f'Interface { name } has crc errors { self.failed_interfaces[name].value } (threshold { self.failed_interfaces[name].threshold }')
 
     # test for dribble
     @aetest.test
-    def interface_dribble_counter_summary(self, dribble_threshold = 0):
-        table_data = []
-        self.failed_interfaces = {}
-        for hostname in self.list_of_hostnames:
-            self.interface_info = common_setup.get_show_interface(hostname)        
-            json_interfaces = json.loads(self.interface_info)
-            for intf in json_interfaces['TABLE_interface']['ROW_interface']:
-                if 'eth_dribble' in intf:
-                    counter = intf['eth_dribble']
-                    if counter:
-                        table_row = []
-                        table_row.append(hostname)
-                        table_row.append(intf['interface'])
-                        table_row.append(counter)
-                        if int(counter) > dribble_threshold:
-                            table_row.append('Failed')
-                            self.failed_interfaces[intf['interface']] = int(counter)
-                            self.interface_name = intf['interface']
-                            error_counter = self.failed_interfaces[intf['interface']]
-                            self.hostname = hostname
-                            if WEBEX_ROOM:
-                                self.interface_dribble_webex(name = error_counter)
-                        else:
-                            table_row.append('Passed')
-                    else:
-                        table_row.append(hostname)
-                        table_row.append(intf)
-                        table_row.append('N/A')
-                        table_row.append('N/A')
-                    table_data.append(table_row)
- 
-        # display the table
-            log.info(tabulate(table_data,
-                              headers=['Device', 'Interface',
-                                       'Dribble Counter',
-                                       'Passed/Failed'],
-                              tablefmt='orgtbl'))
-            table_data = []
+    def interface_dribble_counter_summary(self, dribble_threshold = INTERFACE_RULES_BY_NAME["dribble"].threshold):
+        self.interface_summary("dribble", dribble_threshold)
 
         # should we pass or fail?
         if self.failed_interfaces:
@@ -1033,60 +661,16 @@ class Interface_Errors_Count_Check(aetest.Testcase):
             self.passed('No interfaces have Dribble')
 
     @aetest.test
-    def interface_dribble_check(self, name = None, dribble_threshold = 0):
+    def interface_dribble_check(self, name = None, dribble_threshold = INTERFACE_RULES_BY_NAME["dribble"].threshold):
         if name is None:
             self.skipped('no interface dribble')
         else:
-            self.failed(f'Interface { name } has dribble { self.failed_interfaces[name] } (threshold { dribble_threshold }')
-
-    def interface_dribble_webex(self, name):
-        template_dir = Path(__file__).resolve().parent
-        env = Environment(loader=FileSystemLoader(str(template_dir)))
-        adaptive_card_template = env.get_template('failed_show_interface_adaptive_card.j2')
-        adataptive_card_output = adaptive_card_template.render(roomid = WEBEX_ROOM, hostname=self.hostname, failure=name, interface=self.interface_name, test="dribble")
-        webex_adaptive_card_response = requests.post('https://webexapis.com/v1/messages', data=adataptive_card_output, headers={"Content-Type": "application/json", "Authorization": f"Bearer { WEBEX_TOKEN }" })
-        log.info('The POST to WebEx had a response code of ' + str(webex_adaptive_card_response.status_code) + 'due to' + webex_adaptive_card_response.reason)
+            self.failed(f'Interface { name } has dribble { self.failed_interfaces[name].value } (threshold { self.failed_interfaces[name].threshold }')
 
     # test for full duplex
     @aetest.test
-    def interface_full_duplex_summary(self, duplex_fail_threshold = "half"):
-        table_data = []
-        self.failed_interfaces = {}
-        for hostname in self.list_of_hostnames:
-            self.interface_info = common_setup.get_show_interface(hostname)        
-            json_interfaces = json.loads(self.interface_info)
-            for intf in json_interfaces['TABLE_interface']['ROW_interface']:
-                if 'eth_duplex' in intf:
-                    duplex_value = intf['eth_duplex']
-                    if duplex_value:
-                        table_row = []
-                        table_row.append(hostname)
-                        table_row.append(intf['interface'])
-                        table_row.append(duplex_value)
-                        if duplex_value == duplex_fail_threshold:
-                            table_row.append('Failed')
-                            self.failed_interfaces[intf['interface']] = duplex_value
-                            self.interface_name = intf['interface']
-                            error_counter = self.failed_interfaces[intf['interface']]
-                            self.hostname = hostname
-                            if WEBEX_ROOM:
-                                self.interface_duplex_webex(name = error_counter)
-                        else:
-                            table_row.append('Passed')
-                    else:
-                        table_row.append(hostname)
-                        table_row.append(intf)
-                        table_row.append('N/A')
-                        table_row.append('N/A')
-                    table_data.append(table_row)
- 
-        # display the table
-            log.info(tabulate(table_data,
-                              headers=['Device', 'Interface',
-                                       'Duplex Mode',
-                                       'Passed/Failed'],
-                              tablefmt='orgtbl'))
-            table_data = []
+    def interface_full_duplex_summary(self, duplex_fail_threshold = INTERFACE_RULES_BY_NAME["duplex"].threshold):
+        self.interface_summary("duplex", duplex_fail_threshold)
 
         # should we pass or fail?
         if self.failed_interfaces:
@@ -1101,56 +685,12 @@ class Interface_Errors_Count_Check(aetest.Testcase):
         if name is None:
             self.skipped('All interfaces duplex is full')
         else:
-            self.failed(f'Interface { name } { self.failed_interfaces[name] } is not full duplex')
-
-    def interface_duplex_webex(self, name):
-        template_dir = Path(__file__).resolve().parent
-        env = Environment(loader=FileSystemLoader(str(template_dir)))
-        adaptive_card_template = env.get_template('failed_show_interface_adaptive_card.j2')
-        adataptive_card_output = adaptive_card_template.render(roomid = WEBEX_ROOM, hostname=self.hostname, failure=name, interface=self.interface_name, test="duplex")
-        webex_adaptive_card_response = requests.post('https://webexapis.com/v1/messages', data=adataptive_card_output, headers={"Content-Type": "application/json", "Authorization": f"Bearer { WEBEX_TOKEN }" })
-        log.info('The POST to WebEx had a response code of ' + str(webex_adaptive_card_response.status_code) + 'due to' + webex_adaptive_card_response.reason)
+            self.failed(f'Interface { name } { self.failed_interfaces[name].value } is not full duplex')
 
     # test for Ignored
     @aetest.test
-    def interface_ignored_counter_summary(self, ignored_threshold = 0):
-        table_data = []
-        self.failed_interfaces = {}
-        for hostname in self.list_of_hostnames:
-            self.interface_info = common_setup.get_show_interface(hostname)        
-            json_interfaces = json.loads(self.interface_info)
-            for intf in json_interfaces['TABLE_interface']['ROW_interface']:
-                if 'eth_ignored' in intf:
-                    counter = intf['eth_ignored']
-                    if counter:
-                        table_row = []
-                        table_row.append(hostname)
-                        table_row.append(intf['interface'])
-                        table_row.append(counter)
-                        if int(counter) > ignored_threshold:
-                            table_row.append('Failed')
-                            self.failed_interfaces[intf['interface']] = int(counter)
-                            self.interface_name = intf['interface']
-                            error_counter = self.failed_interfaces[intf['interface']]
-                            self.hostname = hostname
-                            if WEBEX_ROOM:
-                                self.interface_ignored_webex(name = error_counter)
-                        else:
-                            table_row.append('Passed')
-                    else:
-                        table_row.append(hostname)
-                        table_row.append(intf)
-                        table_row.append('N/A')
-                        table_row.append('N/A')
-                    table_data.append(table_row)
- 
-        # display the table
-            log.info(tabulate(table_data,
-                              headers=['Device', 'Interface',
-                                       'Ignored Counter',
-                                       'Passed/Failed'],
-                              tablefmt='orgtbl'))
-            table_data = []
+    def interface_ignored_counter_summary(self, ignored_threshold = INTERFACE_RULES_BY_NAME["ignored"].threshold):
+        self.interface_summary("ignored", ignored_threshold)
 
         # should we pass or fail?
         if self.failed_interfaces:
@@ -1161,60 +701,16 @@ class Interface_Errors_Count_Check(aetest.Testcase):
             self.passed('No interfaces have ingored packets')
 
     @aetest.test
-    def interface_ignored_check(self, name = None, ignored_threshold = 0):
+    def interface_ignored_check(self, name = None, ignored_threshold = INTERFACE_RULES_BY_NAME["ignored"].threshold):
         if name is None:
             self.skipped('no interface ignores')
         else:
-            self.failed(f'Interface { name } has ignores { self.failed_interfaces[name] } (threshold { ignored_threshold }')
-
-    def interface_ignored_webex(self, name):
-        template_dir = Path(__file__).resolve().parent
-        env = Environment(loader=FileSystemLoader(str(template_dir)))
-        adaptive_card_template = env.get_template('failed_show_interface_adaptive_card.j2')
-        adataptive_card_output = adaptive_card_template.render(roomid = WEBEX_ROOM, hostname=self.hostname, failure=name, interface=self.interface_name, test="ignored")
-        webex_adaptive_card_response = requests.post('https://webexapis.com/v1/messages', data=adataptive_card_output, headers={"Content-Type": "application/json", "Authorization": f"Bearer { WEBEX_TOKEN }" })
-        log.info('The POST to WebEx had a response code of ' + str(webex_adaptive_card_response.status_code) + 'due to' + webex_adaptive_card_response.reason)
+            self.failed(f'Interface { name } has ignores { self.failed_interfaces[name].value } (threshold { self.failed_interfaces[name].threshold }')
 
     # test for down if drops
     @aetest.test
-    def interface_down_if_drops_counter_summary(self, down_if_drops_threshold = 0):
-        table_data = []
-        self.failed_interfaces = {}
-        for hostname in self.list_of_hostnames:
-            self.interface_info = common_setup.get_show_interface(hostname)        
-            json_interfaces = json.loads(self.interface_info)
-            for intf in json_interfaces['TABLE_interface']['ROW_interface']:
-                if 'eth_in_ifdown_drops' in intf:
-                    counter = intf['eth_in_ifdown_drops']
-                    if counter:
-                        table_row = []
-                        table_row.append(hostname)
-                        table_row.append(intf['interface'])
-                        table_row.append(counter)
-                        if int(counter) > down_if_drops_threshold:
-                            table_row.append('Failed')
-                            self.failed_interfaces[intf['interface']] = int(counter)
-                            self.interface_name = intf['interface']
-                            error_counter = self.failed_interfaces[intf['interface']]
-                            self.hostname = hostname
-                            if WEBEX_ROOM:
-                                self.interface_down_if_drops_webex(name = error_counter)
-                        else:
-                            table_row.append('Passed')
-                    else:
-                        table_row.append(hostname)
-                        table_row.append(intf)
-                        table_row.append('N/A')
-                        table_row.append('N/A')
-                    table_data.append(table_row)
- 
-        # display the table
-            log.info(tabulate(table_data,
-                              headers=['Device', 'Interface',
-                                       'Down Interface Drops Counter',
-                                       'Passed/Failed'],
-                              tablefmt='orgtbl'))
-            table_data = []
+    def interface_down_if_drops_counter_summary(self, down_if_drops_threshold = INTERFACE_RULES_BY_NAME["down_if_drops"].threshold):
+        self.interface_summary("down_if_drops", down_if_drops_threshold)
 
         # should we pass or fail?
         if self.failed_interfaces:
@@ -1225,60 +721,16 @@ class Interface_Errors_Count_Check(aetest.Testcase):
             self.passed('No interfaces have down interface drops')
 
     @aetest.test
-    def interface_down_if_drops_check(self, name = None, down_if_drops_threshold = 0):
+    def interface_down_if_drops_check(self, name = None, down_if_drops_threshold = INTERFACE_RULES_BY_NAME["down_if_drops"].threshold):
         if name is None:
             self.skipped('no interface down interface drops')
         else:
-            self.failed(f'Interface { name } has down interface drops { self.failed_interfaces[name] } (threshold { down_if_drops_threshold }')
-
-    def interface_down_if_drops_webex(self, name):
-        template_dir = Path(__file__).resolve().parent
-        env = Environment(loader=FileSystemLoader(str(template_dir)))
-        adaptive_card_template = env.get_template('failed_show_interface_adaptive_card.j2')
-        adataptive_card_output = adaptive_card_template.render(roomid = WEBEX_ROOM, hostname=self.hostname, failure=name, interface=self.interface_name, test="down_if_drops")
-        webex_adaptive_card_response = requests.post('https://webexapis.com/v1/messages', data=adataptive_card_output, headers={"Content-Type": "application/json", "Authorization": f"Bearer { WEBEX_TOKEN }" })
-        log.info('The POST to WebEx had a response code of ' + str(webex_adaptive_card_response.status_code) + 'due to' + webex_adaptive_card_response.reason)
+            self.failed(f'Interface { name } has down interface drops { self.failed_interfaces[name].value } (threshold { self.failed_interfaces[name].threshold }')
 
     # test for input discards
     @aetest.test
-    def interface_input_discards_counter_summary(self, input_discards_threshold = 0):
-        table_data = []
-        self.failed_interfaces = {}
-        for hostname in self.list_of_hostnames:
-            self.interface_info = common_setup.get_show_interface(hostname)
-            json_interfaces = json.loads(self.interface_info)
-            for intf in json_interfaces['TABLE_interface']['ROW_interface']:
-                if 'eth_indiscard' in intf:
-                    counter = intf['eth_indiscard']
-                    if counter:
-                        table_row = []
-                        table_row.append(hostname)
-                        table_row.append(intf['interface'])
-                        table_row.append(counter)
-                        if int(counter) > input_discards_threshold:
-                            table_row.append('Failed')
-                            self.failed_interfaces[intf['interface']] = int(counter)
-                            self.interface_name = intf['interface']
-                            error_counter = self.failed_interfaces[intf['interface']]
-                            self.hostname = hostname
-                            if WEBEX_ROOM:
-                                self.interface_input_discards_webex(name = error_counter)
-                        else:
-                            table_row.append('Passed')
-                    else:
-                        table_row.append(hostname)
-                        table_row.append(intf)
-                        table_row.append('N/A')
-                        table_row.append('N/A')
-                    table_data.append(table_row)
- 
-        # display the table
-            log.info(tabulate(table_data,
-                              headers=['Device', 'Interface',
-                                       'Input Discards Counter',
-                                       'Passed/Failed'],
-                              tablefmt='orgtbl'))
-            table_data = []
+    def interface_input_discards_counter_summary(self, input_discards_threshold = INTERFACE_RULES_BY_NAME["input_discards"].threshold):
+        self.interface_summary("input_discards", input_discards_threshold)
 
         # should we pass or fail?
         if self.failed_interfaces:
@@ -1289,60 +741,16 @@ class Interface_Errors_Count_Check(aetest.Testcase):
             self.passed('No interfaces have input discards')
 
     @aetest.test
-    def interface_input_discards_check(self, name = None, input_discards_threshold = 0):
+    def interface_input_discards_check(self, name = None, input_discards_threshold = INTERFACE_RULES_BY_NAME["input_discards"].threshold):
         if name is None:
             self.skipped('no interface input discards')
         else:
-            self.failed(f'Interface { name } has input discards { self.failed_interfaces[name] } (threshold { input_discards_threshold }')
-
-    def interface_input_discards_webex(self, name):
-        template_dir = Path(__file__).resolve().parent
-        env = Environment(loader=FileSystemLoader(str(template_dir)))
-        adaptive_card_template = env.get_template('failed_show_interface_adaptive_card.j2')
-        adataptive_card_output = adaptive_card_template.render(roomid = WEBEX_ROOM, hostname=self.hostname, failure=name, interface=self.interface_name, test="input_discards")
-        webex_adaptive_card_response = requests.post('https://webexapis.com/v1/messages', data=adataptive_card_output, headers={"Content-Type": "application/json", "Authorization": f"Bearer { WEBEX_TOKEN }" })
-        log.info('The POST to WebEx had a response code of ' + str(webex_adaptive_card_response.status_code) + 'due to' + webex_adaptive_card_response.reason)
+            self.failed(f'Interface { name } has input discards { self.failed_interfaces[name].value } (threshold { self.failed_interfaces[name].threshold }')
 
     # test for input errors
     @aetest.test
-    def interface_input_errors_counter_summary(self, input_errors_threshold = 0):
-        table_data = []
-        self.failed_interfaces = {}
-        for hostname in self.list_of_hostnames:
-            self.interface_info = common_setup.get_show_interface(hostname)        
-            json_interfaces = json.loads(self.interface_info)
-            for intf in json_interfaces['TABLE_interface']['ROW_interface']:
-                if 'eth_inerr' in intf:
-                    counter = intf['eth_inerr']
-                    if counter:
-                        table_row = []
-                        table_row.append(hostname)
-                        table_row.append(intf['interface'])
-                        table_row.append(counter)
-                        if int(counter) > input_errors_threshold:
-                            table_row.append('Failed')
-                            self.failed_interfaces[intf['interface']] = int(counter)
-                            self.interface_name = intf['interface']
-                            error_counter = self.failed_interfaces[intf['interface']]
-                            self.hostname = hostname
-                            if WEBEX_ROOM:
-                                self.interface_input_errors_webex(name = error_counter)
-                        else:
-                            table_row.append('Passed')
-                    else:
-                        table_row.append(hostname)
-                        table_row.append(intf)
-                        table_row.append('N/A')
-                        table_row.append('N/A')
-                    table_data.append(table_row)
- 
-        # display the table
-            log.info(tabulate(table_data,
-                              headers=['Device', 'Interface',
-                                       'Input Errors Counter',
-                                       'Passed/Failed'],
-                              tablefmt='orgtbl'))
-            table_data = []
+    def interface_input_errors_counter_summary(self, input_errors_threshold = INTERFACE_RULES_BY_NAME["input_errors"].threshold):
+        self.interface_summary("input_errors", input_errors_threshold)
 
         # should we pass or fail?
         if self.failed_interfaces:
@@ -1353,60 +761,16 @@ class Interface_Errors_Count_Check(aetest.Testcase):
             self.passed('No interfaces have input errors')
 
     @aetest.test
-    def interface_input_errors_check(self, name = None, input_errors_threshold = 0):
+    def interface_input_errors_check(self, name = None, input_errors_threshold = INTERFACE_RULES_BY_NAME["input_errors"].threshold):
         if name is None:
             self.skipped('no interface input errors')
         else:
-            self.failed(f'Interface { name } has input errors { self.failed_interfaces[name] } (threshold { input_errors_threshold }')
-
-    def interface_input_errors_webex(self, name):
-        template_dir = Path(__file__).resolve().parent
-        env = Environment(loader=FileSystemLoader(str(template_dir)))
-        adaptive_card_template = env.get_template('failed_show_interface_adaptive_card.j2')
-        adataptive_card_output = adaptive_card_template.render(roomid = WEBEX_ROOM, hostname=self.hostname, failure=name, interface=self.interface_name, test="input_errors")
-        webex_adaptive_card_response = requests.post('https://webexapis.com/v1/messages', data=adataptive_card_output, headers={"Content-Type": "application/json", "Authorization": f"Bearer { WEBEX_TOKEN }" })
-        log.info('The POST to WebEx had a response code of ' + str(webex_adaptive_card_response.status_code) + 'due to' + webex_adaptive_card_response.reason)
+            self.failed(f'Interface { name } has input errors { self.failed_interfaces[name].value } (threshold { self.failed_interfaces[name].threshold }')
 
     # test for input pause
     @aetest.test
-    def interface_input_pause_counter_summary(self, input_pause_threshold = 0):
-        table_data = []
-        self.failed_interfaces = {}
-        for hostname in self.list_of_hostnames:
-            self.interface_info = common_setup.get_show_interface(hostname)
-            json_interfaces = json.loads(self.interface_info)
-            for intf in json_interfaces['TABLE_interface']['ROW_interface']:
-                if 'eth_inpause' in intf:
-                    counter = intf['eth_inpause']
-                    if counter:
-                        table_row = []
-                        table_row.append(hostname)
-                        table_row.append(intf['interface'])
-                        table_row.append(counter)
-                        if int(counter) > input_pause_threshold:
-                            table_row.append('Failed')
-                            self.failed_interfaces[intf['interface']] = int(counter)
-                            self.interface_name = intf['interface']
-                            error_counter = self.failed_interfaces[intf['interface']]
-                            self.hostname = hostname
-                            if WEBEX_ROOM:
-                                self.interface_input_pause_webex(name = error_counter)
-                        else:
-                            table_row.append('Passed')
-                    else:
-                        table_row.append(hostname)
-                        table_row.append(intf)
-                        table_row.append('N/A')
-                        table_row.append('N/A')
-                    table_data.append(table_row)
- 
-        # display the table
-            log.info(tabulate(table_data,
-                              headers=['Device', 'Interface',
-                                       'Input Pause Counter',
-                                       'Passed/Failed'],
-                              tablefmt='orgtbl'))
-            table_data = []
+    def interface_input_pause_counter_summary(self, input_pause_threshold = INTERFACE_RULES_BY_NAME["input_pause"].threshold):
+        self.interface_summary("input_pause", input_pause_threshold)
 
         # should we pass or fail?
         if self.failed_interfaces:
@@ -1417,60 +781,16 @@ class Interface_Errors_Count_Check(aetest.Testcase):
             self.passed('No interfaces have input pause')
 
     @aetest.test
-    def interface_input_pause_check(self, name = None, input_pause_threshold = 0):
+    def interface_input_pause_check(self, name = None, input_pause_threshold = INTERFACE_RULES_BY_NAME["input_pause"].threshold):
         if name is None:
             self.skipped('no interface input pause')
         else:
-            self.failed(f'Interface { name } has input pause { self.failed_interfaces[name] } (threshold { input_pause_threshold }')
-
-    def interface_input_pause_webex(self, name):
-        template_dir = Path(__file__).resolve().parent
-        env = Environment(loader=FileSystemLoader(str(template_dir)))
-        adaptive_card_template = env.get_template('failed_show_interface_adaptive_card.j2')
-        adataptive_card_output = adaptive_card_template.render(roomid = WEBEX_ROOM, hostname=self.hostname, failure=name, interface=self.interface_name, test="input_pause")
-        webex_adaptive_card_response = requests.post('https://webexapis.com/v1/messages', data=adataptive_card_output, headers={"Content-Type": "application/json", "Authorization": f"Bearer { WEBEX_TOKEN }" })
-        log.info('The POST to WebEx had a response code of ' + str(webex_adaptive_card_response.status_code) + 'due to' + webex_adaptive_card_response.reason)
+            self.failed(f'Interface { name } has input pause { self.failed_interfaces[name].value } (threshold { self.failed_interfaces[name].threshold }')
 
     # test for late collisions
     @aetest.test
-    def interface_late_collision_counter_summary(self, late_collision_threshold = 0):
-        table_data = []
-        self.failed_interfaces = {}
-        for hostname in self.list_of_hostnames:
-            self.interface_info = common_setup.get_show_interface(hostname)        
-            json_interfaces = json.loads(self.interface_info)
-            for intf in json_interfaces['TABLE_interface']['ROW_interface']:
-                if 'eth_latecoll' in intf:
-                    counter = intf['eth_latecoll']
-                    if counter:
-                        table_row = []
-                        table_row.append(hostname)
-                        table_row.append(intf['interface'])
-                        table_row.append(counter)
-                        if int(counter) > late_collision_threshold:
-                            table_row.append('Failed')
-                            self.failed_interfaces[intf['interface']] = int(counter)
-                            self.interface_name = intf['interface']
-                            error_counter = self.failed_interfaces[intf['interface']]
-                            self.hostname = hostname
-                            if WEBEX_ROOM:
-                                self.interface_late_collision_webex(name = error_counter)
-                        else:
-                            table_row.append('Passed')
-                    else:
-                        table_row.append(hostname)
-                        table_row.append(intf)
-                        table_row.append('N/A')
-                        table_row.append('N/A')
-                    table_data.append(table_row)
- 
-        # display the table
-            log.info(tabulate(table_data,
-                              headers=['Device', 'Interface',
-                                       'Late Collision Counter',
-                                       'Passed/Failed'],
-                              tablefmt='orgtbl'))
-            table_data = []
+    def interface_late_collision_counter_summary(self, late_collision_threshold = INTERFACE_RULES_BY_NAME["late_collision"].threshold):
+        self.interface_summary("late_collision", late_collision_threshold)
 
         # should we pass or fail?
         if self.failed_interfaces:
@@ -1481,60 +801,16 @@ class Interface_Errors_Count_Check(aetest.Testcase):
             self.passed('No interfaces have late collisions')
 
     @aetest.test
-    def interface_late_collsion_check(self, name = None, late_collision_threshold = 0):
+    def interface_late_collsion_check(self, name = None, late_collision_threshold = INTERFACE_RULES_BY_NAME["late_collision"].threshold):
         if name is None:
             self.skipped('no interface late collisions')
         else:
-            self.failed(f'Interface { name } has late collisions { self.failed_interfaces[name] } (threshold { late_collision_threshold }')
-
-    def interface_late_collision_webex(self, name):
-        template_dir = Path(__file__).resolve().parent
-        env = Environment(loader=FileSystemLoader(str(template_dir)))
-        adaptive_card_template = env.get_template('failed_show_interface_adaptive_card.j2')
-        adataptive_card_output = adaptive_card_template.render(roomid = WEBEX_ROOM, hostname=self.hostname, failure=name, interface=self.interface_name, test="late_collision")
-        webex_adaptive_card_response = requests.post('https://webexapis.com/v1/messages', data=adataptive_card_output, headers={"Content-Type": "application/json", "Authorization": f"Bearer { WEBEX_TOKEN }" })
-        log.info('The POST to WebEx had a response code of ' + str(webex_adaptive_card_response.status_code) + 'due to' + webex_adaptive_card_response.reason)
+            self.failed(f'Interface { name } has late collisions { self.failed_interfaces[name].value } (threshold { self.failed_interfaces[name].threshold }')
 
     # test for lost carrier
     @aetest.test
-    def interface_lost_carrier_counter_summary(self, lost_carrier_threshold = 0):
-        table_data = []
-        self.failed_interfaces = {}
-        for hostname in self.list_of_hostnames:
-            self.interface_info = common_setup.get_show_interface(hostname)        
-            json_interfaces = json.loads(self.interface_info)
-            for intf in json_interfaces['TABLE_interface']['ROW_interface']:
-                if 'eth_lostcarrier' in intf:
-                    counter = intf['eth_lostcarrier']
-                    if counter:
-                        table_row = []
-                        table_row.append(hostname)
-                        table_row.append(intf['interface'])
-                        table_row.append(counter)
-                        if int(counter) > lost_carrier_threshold:
-                            table_row.append('Failed')
-                            self.failed_interfaces[intf['interface']] = int(counter)
-                            self.interface_name = intf['interface']
-                            error_counter = self.failed_interfaces[intf['interface']]
-                            self.hostname = hostname
-                            if WEBEX_ROOM:
-                                self.interface_lost_carrier_webex(name = error_counter)
-                        else:
-                            table_row.append('Passed')
-                    else:
-                        table_row.append(hostname)
-                        table_row.append(intf)
-                        table_row.append('N/A')
-                        table_row.append('N/A')
-                    table_data.append(table_row)
- 
-        # display the table
-            log.info(tabulate(table_data,
-                              headers=['Device', 'Interface',
-                                       'Lost Carrier Counter',
-                                       'Passed/Failed'],
-                              tablefmt='orgtbl'))
-            table_data = []
+    def interface_lost_carrier_counter_summary(self, lost_carrier_threshold = INTERFACE_RULES_BY_NAME["lost_carrier"].threshold):
+        self.interface_summary("lost_carrier", lost_carrier_threshold)
 
         # should we pass or fail?
         if self.failed_interfaces:
@@ -1545,60 +821,16 @@ class Interface_Errors_Count_Check(aetest.Testcase):
             self.passed('No interfaces have lost carrier')
 
     @aetest.test
-    def interface_lost_carrier_check(self, name = None, lost_carrier_threshold = 0):
+    def interface_lost_carrier_check(self, name = None, lost_carrier_threshold = INTERFACE_RULES_BY_NAME["lost_carrier"].threshold):
         if name is None:
             self.skipped('no interface lost carrier')
         else:
-            self.failed(f'Interface { name } has lost carrier { self.failed_interfaces[name] } (threshold { lost_carrier_threshold }')
-
-    def interface_lost_carrier_webex(self, name):
-        template_dir = Path(__file__).resolve().parent
-        env = Environment(loader=FileSystemLoader(str(template_dir)))
-        adaptive_card_template = env.get_template('failed_show_interface_adaptive_card.j2')
-        adataptive_card_output = adaptive_card_template.render(roomid = WEBEX_ROOM, hostname=self.hostname, failure=name, interface=self.interface_name, test="lost_carrier")
-        webex_adaptive_card_response = requests.post('https://webexapis.com/v1/messages', data=adataptive_card_output, headers={"Content-Type": "application/json", "Authorization": f"Bearer { WEBEX_TOKEN }" })
-        log.info('The POST to WebEx had a response code of ' + str(webex_adaptive_card_response.status_code) + 'due to' + webex_adaptive_card_response.reason)
+            self.failed(f'Interface { name } has lost carrier { self.failed_interfaces[name].value } (threshold { self.failed_interfaces[name].threshold }')
 
     # test for no buffer
     @aetest.test
-    def interface_no_buffer_counter_summary(self, no_buffer_threshold = 0):
-        table_data = []
-        self.failed_interfaces = {}
-        for hostname in self.list_of_hostnames:
-            self.interface_info = common_setup.get_show_interface(hostname)
-            json_interfaces = json.loads(self.interface_info)
-            for intf in json_interfaces['TABLE_interface']['ROW_interface']:
-                if 'eth_nobuf' in intf:
-                    counter = intf['eth_nobuf']
-                    if counter:
-                        table_row = []
-                        table_row.append(hostname)
-                        table_row.append(intf['interface'])
-                        table_row.append(counter)
-                        if int(counter) > no_buffer_threshold:
-                            table_row.append('Failed')
-                            self.failed_interfaces[intf['interface']] = int(counter)
-                            self.interface_name = intf['interface']
-                            error_counter = self.failed_interfaces[intf['interface']]
-                            self.hostname = hostname
-                            if WEBEX_ROOM:
-                                self.interface_no_buffer_webex(name = error_counter)
-                        else:
-                            table_row.append('Passed')
-                    else:
-                        table_row.append(hostname)
-                        table_row.append(intf)
-                        table_row.append('N/A')
-                        table_row.append('N/A')
-                    table_data.append(table_row)
- 
-        # display the table
-            log.info(tabulate(table_data,
-                              headers=['Device', 'Interface',
-                                       'No Buffer Counter',
-                                       'Passed/Failed'],
-                              tablefmt='orgtbl'))
-            table_data = []
+    def interface_no_buffer_counter_summary(self, no_buffer_threshold = INTERFACE_RULES_BY_NAME["no_buffer"].threshold):
+        self.interface_summary("no_buffer", no_buffer_threshold)
 
         # should we pass or fail?
         if self.failed_interfaces:
@@ -1609,60 +841,16 @@ class Interface_Errors_Count_Check(aetest.Testcase):
             self.passed('No interfaces have no buffer')
 
     @aetest.test
-    def interface_no_buffer_check(self, name = None, no_buffer_threshold = 0):
+    def interface_no_buffer_check(self, name = None, no_buffer_threshold = INTERFACE_RULES_BY_NAME["no_buffer"].threshold):
         if name is None:
             self.skipped('no interface no buffer')
         else:
-            self.failed(f'Interface { name } has no buffer { self.failed_interfaces[name] } (threshold { no_buffer_threshold }')
-
-    def interface_no_buffer_webex(self, name):
-        template_dir = Path(__file__).resolve().parent
-        env = Environment(loader=FileSystemLoader(str(template_dir)))
-        adaptive_card_template = env.get_template('failed_show_interface_adaptive_card.j2')
-        adataptive_card_output = adaptive_card_template.render(roomid = WEBEX_ROOM, hostname=self.hostname, failure=name, interface=self.interface_name, test="no_buffer")
-        webex_adaptive_card_response = requests.post('https://webexapis.com/v1/messages', data=adataptive_card_output, headers={"Content-Type": "application/json", "Authorization": f"Bearer { WEBEX_TOKEN }" })
-        log.info('The POST to WebEx had a response code of ' + str(webex_adaptive_card_response.status_code) + 'due to' + webex_adaptive_card_response.reason)
+            self.failed(f'Interface { name } has no buffer { self.failed_interfaces[name].value } (threshold { self.failed_interfaces[name].threshold }')
 
     # test for no carrier
     @aetest.test
-    def interface_no_carrier_counter_summary(self, no_carrier_threshold = 0):
-        table_data = []
-        self.failed_interfaces = {}
-        for hostname in self.list_of_hostnames:
-            self.interface_info = common_setup.get_show_interface(hostname)
-            json_interfaces = json.loads(self.interface_info)
-            for intf in json_interfaces['TABLE_interface']['ROW_interface']:
-                if 'eth_nocarrier' in intf:
-                    counter = intf['eth_nocarrier']
-                    if counter:
-                        table_row = []
-                        table_row.append(hostname)
-                        table_row.append(intf['interface'])
-                        table_row.append(counter)
-                        if int(counter) > no_carrier_threshold:
-                            table_row.append('Failed')
-                            self.failed_interfaces[intf['interface']] = int(counter)
-                            self.interface_name = intf['interface']
-                            error_counter = self.failed_interfaces[intf['interface']]
-                            self.hostname = hostname
-                            if WEBEX_ROOM:
-                                self.interface_no_carrier_webex(name = error_counter)
-                        else:
-                            table_row.append('Passed')
-                    else:
-                        table_row.append(hostname)
-                        table_row.append(intf)
-                        table_row.append('N/A')
-                        table_row.append('N/A')
-                    table_data.append(table_row)
- 
-        # display the table
-            log.info(tabulate(table_data,
-                              headers=['Device', 'Interface',
-                                       'No Carrier Counter',
-                                       'Passed/Failed'],
-                              tablefmt='orgtbl'))
-            table_data = []
+    def interface_no_carrier_counter_summary(self, no_carrier_threshold = INTERFACE_RULES_BY_NAME["no_carrier"].threshold):
+        self.interface_summary("no_carrier", no_carrier_threshold)
 
         # should we pass or fail?
         if self.failed_interfaces:
@@ -1673,60 +861,16 @@ class Interface_Errors_Count_Check(aetest.Testcase):
             self.passed('No interfaces have no carrier')
 
     @aetest.test
-    def interface_no_carrier_check(self, name = None, no_carrier_threshold = 0):
+    def interface_no_carrier_check(self, name = None, no_carrier_threshold = INTERFACE_RULES_BY_NAME["no_carrier"].threshold):
         if name is None:
             self.skipped('no interface no carrier')
         else:
-            self.failed(f'Interface { name } has no carrier { self.failed_interfaces[name] } (threshold { no_carrier_threshold }')
-
-    def interface_no_carrier_webex(self, name):
-        template_dir = Path(__file__).resolve().parent
-        env = Environment(loader=FileSystemLoader(str(template_dir)))
-        adaptive_card_template = env.get_template('failed_show_interface_adaptive_card.j2')
-        adataptive_card_output = adaptive_card_template.render(roomid = WEBEX_ROOM, hostname=self.hostname, failure=name, interface=self.interface_name, test="no_carrier")
-        webex_adaptive_card_response = requests.post('https://webexapis.com/v1/messages', data=adataptive_card_output, headers={"Content-Type": "application/json", "Authorization": f"Bearer { WEBEX_TOKEN }" })
-        log.info('The POST to WebEx had a response code of ' + str(webex_adaptive_card_response.status_code) + 'due to' + webex_adaptive_card_response.reason)
+            self.failed(f'Interface { name } has no carrier { self.failed_interfaces[name].value } (threshold { self.failed_interfaces[name].threshold }')
 
     # test for output discards
     @aetest.test
-    def interface_output_discard_counter_summary(self, output_discard_threshold = 0):
-        table_data = []
-        self.failed_interfaces = {}
-        for hostname in self.list_of_hostnames:
-            self.interface_info = common_setup.get_show_interface(hostname)        
-            json_interfaces = json.loads(self.interface_info)
-            for intf in json_interfaces['TABLE_interface']['ROW_interface']:
-                if 'eth_outdiscard' in intf:
-                    counter = intf['eth_outdiscard']
-                    if counter:
-                        table_row = []
-                        table_row.append(hostname)
-                        table_row.append(intf['interface'])
-                        table_row.append(counter)
-                        if int(counter) > output_discard_threshold:
-                            table_row.append('Failed')
-                            self.failed_interfaces[intf['interface']] = int(counter)
-                            self.interface_name = intf['interface']
-                            error_counter = self.failed_interfaces[intf['interface']]
-                            self.hostname = hostname
-                            if WEBEX_ROOM:
-                                self.interface_output_discard_webex(name = error_counter)
-                        else:
-                            table_row.append('Passed')
-                    else:
-                        table_row.append(hostname)
-                        table_row.append(intf)
-                        table_row.append('N/A')
-                        table_row.append('N/A')
-                    table_data.append(table_row)
- 
-        # display the table
-            log.info(tabulate(table_data,
-                              headers=['Device', 'Interface',
-                                       'Output Discard Counter',
-                                       'Passed/Failed'],
-                              tablefmt='orgtbl'))
-            table_data = []
+    def interface_output_discard_counter_summary(self, output_discard_threshold = INTERFACE_RULES_BY_NAME["output_discard"].threshold):
+        self.interface_summary("output_discard", output_discard_threshold)
 
         # should we pass or fail?
         if self.failed_interfaces:
@@ -1737,60 +881,16 @@ class Interface_Errors_Count_Check(aetest.Testcase):
             self.passed('No interfaces have output discards')
 
     @aetest.test
-    def interface_output_discard_check(self, name = None, output_discard_threshold = 0):
+    def interface_output_discard_check(self, name = None, output_discard_threshold = INTERFACE_RULES_BY_NAME["output_discard"].threshold):
         if name is None:
             self.skipped('no interface output discard')
         else:
-            self.failed(f'Interface { name } has output discards { self.failed_interfaces[name] } (threshold { output_discard_threshold }')
-
-    def interface_output_discard_webex(self, name):
-        template_dir = Path(__file__).resolve().parent
-        env = Environment(loader=FileSystemLoader(str(template_dir)))
-        adaptive_card_template = env.get_template('failed_show_interface_adaptive_card.j2')
-        adataptive_card_output = adaptive_card_template.render(roomid = WEBEX_ROOM, hostname=self.hostname, failure=name, interface=self.interface_name, test="output_discard")
-        webex_adaptive_card_response = requests.post('https://webexapis.com/v1/messages', data=adataptive_card_output, headers={"Content-Type": "application/json", "Authorization": f"Bearer { WEBEX_TOKEN }" })
-        log.info('The POST to WebEx had a response code of ' + str(webex_adaptive_card_response.status_code) + 'due to' + webex_adaptive_card_response.reason)
+            self.failed(f'Interface { name } has output discards { self.failed_interfaces[name].value } (threshold { self.failed_interfaces[name].threshold }')
 
     # test for output errors
     @aetest.test
-    def interface_output_error_counter_summary(self, output_error_threshold = 0):
-        table_data = []
-        self.failed_interfaces = {}
-        for hostname in self.list_of_hostnames:
-            self.interface_info = common_setup.get_show_interface(hostname)        
-            json_interfaces = json.loads(self.interface_info)
-            for intf in json_interfaces['TABLE_interface']['ROW_interface']:
-                if 'eth_outerr' in intf:
-                    counter = intf['eth_outerr']
-                    if counter:
-                        table_row = []
-                        table_row.append(hostname)
-                        table_row.append(intf['interface'])
-                        table_row.append(counter)
-                        if int(counter) > output_error_threshold:
-                            table_row.append('Failed')
-                            self.failed_interfaces[intf['interface']] = int(counter)
-                            self.interface_name = intf['interface']
-                            error_counter = self.failed_interfaces[intf['interface']]
-                            self.hostname = hostname
-                            if WEBEX_ROOM:
-                                self.interface_output_error_webex(name = error_counter)
-                        else:
-                            table_row.append('Passed')
-                    else:
-                        table_row.append(hostname)
-                        table_row.append(intf)
-                        table_row.append('N/A')
-                        table_row.append('N/A')
-                    table_data.append(table_row)
- 
-        # display the table
-            log.info(tabulate(table_data,
-                              headers=['Device', 'Interface',
-                                       'Output Error Counter',
-                                       'Passed/Failed'],
-                              tablefmt='orgtbl'))
-            table_data = []
+    def interface_output_error_counter_summary(self, output_error_threshold = INTERFACE_RULES_BY_NAME["output_error"].threshold):
+        self.interface_summary("output_error", output_error_threshold)
 
         # should we pass or fail?
         if self.failed_interfaces:
@@ -1801,60 +901,16 @@ class Interface_Errors_Count_Check(aetest.Testcase):
             self.passed('No interfaces have output errors')
 
     @aetest.test
-    def interface_output_error_check(self, name = None, output_error_threshold = 0):
+    def interface_output_error_check(self, name = None, output_error_threshold = INTERFACE_RULES_BY_NAME["output_error"].threshold):
         if name is None:
             self.skipped('no interface output errors')
         else:
-            self.failed(f'Interface { name } has output errors { self.failed_interfaces[name] } (threshold { output_error_threshold }')
-
-    def interface_output_error_webex(self, name):
-        template_dir = Path(__file__).resolve().parent
-        env = Environment(loader=FileSystemLoader(str(template_dir)))
-        adaptive_card_template = env.get_template('failed_show_interface_adaptive_card.j2')
-        adataptive_card_output = adaptive_card_template.render(roomid = WEBEX_ROOM, hostname=self.hostname, failure=name, interface=self.interface_name, test="output_error")
-        webex_adaptive_card_response = requests.post('https://webexapis.com/v1/messages', data=adataptive_card_output, headers={"Content-Type": "application/json", "Authorization": f"Bearer { WEBEX_TOKEN }" })
-        log.info('The POST to WebEx had a response code of ' + str(webex_adaptive_card_response.status_code) + 'due to' + webex_adaptive_card_response.reason)
+            self.failed(f'Interface { name } has output errors { self.failed_interfaces[name].value } (threshold { self.failed_interfaces[name].threshold }')
 
     # test for output pause
     @aetest.test
-    def interface_output_pause_counter_summary(self, output_pause_threshold = 0):
-        table_data = []
-        self.failed_interfaces = {}
-        for hostname in self.list_of_hostnames:
-            self.interface_info = common_setup.get_show_interface(hostname)        
-            json_interfaces = json.loads(self.interface_info)
-            for intf in json_interfaces['TABLE_interface']['ROW_interface']:
-                if 'eth_outpause' in intf:
-                    counter = intf['eth_outpause']
-                    if counter:
-                        table_row = []
-                        table_row.append(hostname)
-                        table_row.append(intf['interface'])
-                        table_row.append(counter)
-                        if int(counter) > output_pause_threshold:
-                            table_row.append('Failed')
-                            self.failed_interfaces[intf['interface']] = int(counter)
-                            self.interface_name = intf['interface']
-                            error_counter = self.failed_interfaces[intf['interface']]
-                            self.hostname = hostname
-                            if WEBEX_ROOM:
-                                self.interface_output_pause_webex(name = error_counter)
-                        else:
-                            table_row.append('Passed')
-                    else:
-                        table_row.append(hostname)
-                        table_row.append(intf)
-                        table_row.append('N/A')
-                        table_row.append('N/A')
-                    table_data.append(table_row)
- 
-        # display the table
-            log.info(tabulate(table_data,
-                              headers=['Device', 'Interface',
-                                       'Output Pause Counter',
-                                       'Passed/Failed'],
-                              tablefmt='orgtbl'))
-            table_data = []
+    def interface_output_pause_counter_summary(self, output_pause_threshold = INTERFACE_RULES_BY_NAME["output_pause"].threshold):
+        self.interface_summary("output_pause", output_pause_threshold)
 
         # should we pass or fail?
         if self.failed_interfaces:
@@ -1865,60 +921,16 @@ class Interface_Errors_Count_Check(aetest.Testcase):
             self.passed('No interfaces have output pauses')
 
     @aetest.test
-    def interface_output_pause_check(self, name = None, output_pause_threshold = 0):
+    def interface_output_pause_check(self, name = None, output_pause_threshold = INTERFACE_RULES_BY_NAME["output_pause"].threshold):
         if name is None:
             self.skipped('no interface output pauses')
         else:
-            self.failed(f'Interface { name } has output pauses { self.failed_interfaces[name] } (threshold { output_pause_threshold }')
-
-    def interface_output_pause_webex(self, name):
-        template_dir = Path(__file__).resolve().parent
-        env = Environment(loader=FileSystemLoader(str(template_dir)))
-        adaptive_card_template = env.get_template('failed_show_interface_adaptive_card.j2')
-        adataptive_card_output = adaptive_card_template.render(roomid = WEBEX_ROOM, hostname=self.hostname, failure=name, interface=self.interface_name, test="output_pause")
-        webex_adaptive_card_response = requests.post('https://webexapis.com/v1/messages', data=adataptive_card_output, headers={"Content-Type": "application/json", "Authorization": f"Bearer { WEBEX_TOKEN }" })
-        log.info('The POST to WebEx had a response code of ' + str(webex_adaptive_card_response.status_code) + 'due to' + webex_adaptive_card_response.reason)
+            self.failed(f'Interface { name } has output pauses { self.failed_interfaces[name].value } (threshold { self.failed_interfaces[name].threshold }')
 
     # test for output overrun
     @aetest.test
-    def interface_output_overrun_counter_summary(self, output_overrun_threshold = 0):
-        table_data = []
-        self.failed_interfaces = {}
-        for hostname in self.list_of_hostnames:
-            self.interface_info = common_setup.get_show_interface(hostname)
-            json_interfaces = json.loads(self.interface_info)
-            for intf in json_interfaces['TABLE_interface']['ROW_interface']:
-                if 'eth_overrun' in intf:
-                    counter = intf['eth_overrun']
-                    if counter:
-                        table_row = []
-                        table_row.append(hostname)
-                        table_row.append(intf['interface'])
-                        table_row.append(counter)
-                        if int(counter) > output_overrun_threshold:
-                            table_row.append('Failed')
-                            self.failed_interfaces[intf['interface']] = int(counter)
-                            self.interface_name = intf['interface']
-                            error_counter = self.failed_interfaces[intf['interface']]
-                            self.hostname = hostname
-                            if WEBEX_ROOM:
-                                self.interface_output_overrun_webex(name = error_counter)
-                        else:
-                            table_row.append('Passed')
-                    else:
-                        table_row.append(hostname)
-                        table_row.append(intf)
-                        table_row.append('N/A')
-                        table_row.append('N/A')
-                    table_data.append(table_row)
- 
-        # display the table
-            log.info(tabulate(table_data,
-                              headers=['Device', 'Interface',
-                                       'Output Overrun Counter',
-                                       'Passed/Failed'],
-                              tablefmt='orgtbl'))
-            table_data = []
+    def interface_output_overrun_counter_summary(self, output_overrun_threshold = INTERFACE_RULES_BY_NAME["output_overrun"].threshold):
+        self.interface_summary("output_overrun", output_overrun_threshold)
 
         # should we pass or fail?
         if self.failed_interfaces:
@@ -1929,60 +941,16 @@ class Interface_Errors_Count_Check(aetest.Testcase):
             self.passed('No interfaces have output overruns')
 
     @aetest.test
-    def interface_output_overrun_check(self, name = None, output_overrun_threshold = 0):
+    def interface_output_overrun_check(self, name = None, output_overrun_threshold = INTERFACE_RULES_BY_NAME["output_overrun"].threshold):
         if name is None:
             self.skipped('no interface output overruns')
         else:
-            self.failed(f'Interface { name } has output overruns { self.failed_interfaces[name] } (threshold { output_overrun_threshold }')
-
-    def interface_output_overrun_webex(self, name):
-        template_dir = Path(__file__).resolve().parent
-        env = Environment(loader=FileSystemLoader(str(template_dir)))
-        adaptive_card_template = env.get_template('failed_show_interface_adaptive_card.j2')
-        adataptive_card_output = adaptive_card_template.render(roomid = WEBEX_ROOM, hostname=self.hostname, failure=name, interface=self.interface_name, test="output_overrun")
-        webex_adaptive_card_response = requests.post('https://webexapis.com/v1/messages', data=adataptive_card_output, headers={"Content-Type": "application/json", "Authorization": f"Bearer { WEBEX_TOKEN }" })
-        log.info('The POST to WebEx had a response code of ' + str(webex_adaptive_card_response.status_code) + 'due to' + webex_adaptive_card_response.reason)
+            self.failed(f'Interface { name } has output overruns { self.failed_interfaces[name].value } (threshold { self.failed_interfaces[name].threshold }')
 
     # test for runts
     @aetest.test
-    def interface_runts_counter_summary(self, runts_threshold = 0):
-        table_data = []
-        self.failed_interfaces = {}
-        for hostname in self.list_of_hostnames:
-            self.interface_info = common_setup.get_show_interface(hostname)
-            json_interfaces = json.loads(self.interface_info)
-            for intf in json_interfaces['TABLE_interface']['ROW_interface']:
-                if 'eth_runts' in intf:
-                    counter = intf['eth_runts']
-                    if counter:
-                        table_row = []
-                        table_row.append(hostname)
-                        table_row.append(intf['interface'])
-                        table_row.append(counter)
-                        if int(counter) > runts_threshold:
-                            table_row.append('Failed')
-                            self.failed_interfaces[intf['interface']] = int(counter)
-                            self.interface_name = intf['interface']
-                            error_counter = self.failed_interfaces[intf['interface']]
-                            self.hostname = hostname
-                            if WEBEX_ROOM:
-                                self.interface_runts_webex(name = error_counter)
-                        else:
-                            table_row.append('Passed')
-                    else:
-                        table_row.append(hostname)
-                        table_row.append(intf)
-                        table_row.append('N/A')
-                        table_row.append('N/A')
-                    table_data.append(table_row)
- 
-        # display the table
-            log.info(tabulate(table_data,
-                              headers=['Device', 'Interface',
-                                       'Runts Counter',
-                                       'Passed/Failed'],
-                              tablefmt='orgtbl'))
-            table_data = []
+    def interface_runts_counter_summary(self, runts_threshold = INTERFACE_RULES_BY_NAME["runts"].threshold):
+        self.interface_summary("runts", runts_threshold)
 
         # should we pass or fail?
         if self.failed_interfaces:
@@ -1993,61 +961,16 @@ class Interface_Errors_Count_Check(aetest.Testcase):
             self.passed('No interfaces have runts')
 
     @aetest.test
-    def interface_runts_check(self, name = None, runt_threshold = 0):
+    def interface_runts_check(self, name = None, runt_threshold = INTERFACE_RULES_BY_NAME["runts"].threshold):
         if name is None:
             self.skipped('no interface runts')
         else:
-            self.failed(f'Interface { name } has runts { self.failed_interfaces[name] } (threshold { runt_threshold }')
-
-    def interface_runts_webex(self, name):
-        template_dir = Path(__file__).resolve().parent
-        env = Environment(loader=FileSystemLoader(str(template_dir)))
-        adaptive_card_template = env.get_template('failed_show_interface_adaptive_card.j2')
-        adataptive_card_output = adaptive_card_template.render(roomid = WEBEX_ROOM, hostname=self.hostname, failure=name, interface=self.interface_name, test="runts")
-        webex_adaptive_card_response = requests.post('https://webexapis.com/v1/messages', data=adataptive_card_output, headers={"Content-Type": "application/json", "Authorization": f"Bearer { WEBEX_TOKEN }" })
-        log.info('The POST to WebEx had a response code of ' + str(webex_adaptive_card_response.status_code) + 'due to' + webex_adaptive_card_response.reason)
+            self.failed(f'Interface { name } has runts { self.failed_interfaces[name].value } (threshold { self.failed_interfaces[name].threshold }')
 
     # test for underrun
     @aetest.test
-    def interface_underrun_counter_summary(self, underrun_threshold = 0):
-        table_data = []
-        self.failed_interfaces = {}
-        for hostname in self.list_of_hostnames:
-            self.interface_info = common_setup.get_show_interface(hostname)
-            json_interfaces = json.loads(self.interface_info)
-            for intf in json_interfaces['TABLE_interface']['ROW_interface']:
-                if 'eth_underrun' in intf:
-                    counter = intf['eth_underrun']
-                    if counter:
-                        table_row = []
-                        table_row.append(hostname)
-                        table_row.append(intf['interface'])
-                        table_row.append(counter)
-                        if int(counter) > underrun_threshold:
-                            table_row.append('Failed')
-                            self.failed_interfaces[intf['interface']] = int(counter)
-                            self.interface_name = intf['interface']
-                            error_counter = self.failed_interfaces[intf['interface']]
-                            self.hostname = hostname
-                            if WEBEX_ROOM:
-                                self.interface_underrun_webex(name = error_counter)
-                        else:
-                            table_row.append('Passed')
-                    else:
-                        table_row.append(hostname)
-                        table_row.append(intf)
-                        table_row.append('N/A')
-                        table_row.append('N/A')
-                    table_data.append(table_row)
- 
-        # display the table
-            log.info(tabulate(table_data,
-                              headers=['Device', 'Interface',
-                                       'Underrun Counter',
-                                       'Passed/Failed'],
-                              tablefmt='orgtbl'))
-            table_data = []
-
+    def interface_underrun_counter_summary(self, underrun_threshold = INTERFACE_RULES_BY_NAME["underrun"].threshold):
+        self.interface_summary("underrun", underrun_threshold)
 
         # should we pass or fail?
         if self.failed_interfaces:
@@ -2058,60 +981,16 @@ class Interface_Errors_Count_Check(aetest.Testcase):
             self.passed('No interfaces have underrun')
 
     @aetest.test
-    def interface_underrun_check(self, name = None, underrun_threshold = 0):
+    def interface_underrun_check(self, name = None, underrun_threshold = INTERFACE_RULES_BY_NAME["underrun"].threshold):
         if name is None:
             self.skipped('no interface underrun')
         else:
-            self.failed(f'Interface { name } has underrun { self.failed_interfaces[name] } (threshold { underrun_threshold }')
-
-    def interface_underrun_webex(self, name):
-        template_dir = Path(__file__).resolve().parent
-        env = Environment(loader=FileSystemLoader(str(template_dir)))
-        adaptive_card_template = env.get_template('failed_show_interface_adaptive_card.j2')
-        adataptive_card_output = adaptive_card_template.render(roomid = WEBEX_ROOM, hostname=self.hostname, failure=name, interface=self.interface_name, test="underrun")
-        webex_adaptive_card_response = requests.post('https://webexapis.com/v1/messages', data=adataptive_card_output, headers={"Content-Type": "application/json", "Authorization": f"Bearer { WEBEX_TOKEN }" })
-        log.info('The POST to WebEx had a response code of ' + str(webex_adaptive_card_response.status_code) + 'due to' + webex_adaptive_card_response.reason)
+            self.failed(f'Interface { name } has underrun { self.failed_interfaces[name].value } (threshold { self.failed_interfaces[name].threshold }')
 
     # test for state reason description - ports should be UP or Admin down
     @aetest.test
-    def interface_state_summary(self, state_fail_threshold = "Link not connected"):
-        table_data = []
-        self.failed_interfaces = {}
-        for hostname in self.list_of_hostnames:
-            self.interface_info = common_setup.get_show_interface(hostname)        
-            json_interfaces = json.loads(self.interface_info)
-            for intf in json_interfaces['TABLE_interface']['ROW_interface']:
-                if 'state_rsn_desc' in intf:
-                    state_value = intf['state_rsn_desc']
-                    if state_value:
-                        table_row = []
-                        table_row.append(hostname)
-                        table_row.append(intf['interface'])
-                        table_row.append(state_value)
-                        if state_value == state_fail_threshold:
-                            table_row.append('Failed')
-                            self.failed_interfaces[intf['interface']] = state_value
-                            self.interface_name = intf['interface']
-                            error_counter = self.failed_interfaces[intf['interface']]
-                            self.hostname = hostname
-                            if WEBEX_ROOM:
-                                self.interface_state_check_webex(name = error_counter)
-                        else:
-                            table_row.append('Passed')
-                    else:
-                        table_row.append(hostname)
-                        table_row.append(intf)
-                        table_row.append('N/A')
-                        table_row.append('N/A')
-                    table_data.append(table_row)
- 
-        # display the table
-            log.info(tabulate(table_data,
-                              headers=['Device', 'Interface',
-                                       'State',
-                                       'Passed/Failed'],
-                              tablefmt='orgtbl'))
-            table_data = []
+    def interface_state_summary(self, state_fail_threshold = INTERFACE_RULES_BY_NAME["state"].threshold):
+        self.interface_summary("state", state_fail_threshold)
 
         # should we pass or fail?
         if self.failed_interfaces:
@@ -2126,15 +1005,81 @@ class Interface_Errors_Count_Check(aetest.Testcase):
         if name is None:
             self.skipped('All interfaces are connected or administratively down')
         else:
-            self.failed(f'Interface { name } { self.failed_interfaces[name] } is not connected or administratively down')
+            self.failed(f'Interface { name } { self.failed_interfaces[name].value } is not connected or administratively down')
+
+    @aetest.cleanup
+    def cleanup(self):
+        # The interface cards go out while the remaining testcases run
+        if WEBEX_ROOM:
+            notifications.flush()
 
-    def interface_state_check_webex(self, name):
-        template_dir = Path(__file__).resolve().parent
-        env = Environment(loader=FileSystemLoader(str(template_dir)))
-        adaptive_card_template = env.get_template('failed_show_interface_adaptive_card.j2')
-        adataptive_card_output = adaptive_card_template.render(roomid = WEBEX_ROOM, hostname=self.hostname, failure=name, interface=self.interface_name, test="state")
-        webex_adaptive_card_response = requests.post('https://webexapis.com/v1/messages', data=adataptive_card_output, headers={"Content-Type": "application/json", "Authorization": f"Bearer { WEBEX_TOKEN }" })
-        log.info('The POST to WebEx had a response code of ' + str(webex_adaptive_card_response.status_code) + 'due to' + webex_adaptive_card_response.reason)
+
+class Additional_Rules_Check(aetest.Testcase):
+    """ Checks from the rules file that have no dedicated test above """
+
+    @aetest.setup
+    def setup(self):
+        self.list_of_hostnames = common_setup.get_hostname(self)
+        host_checks = [name for name in HOST_CHECKS if name not in DEDICATED_HOST_CHECKS]
+        interface_rules = [name for name in INTERFACE_RULES_BY_NAME if name not in DEDICATED_INTERFACE_RULES]
+        if host_checks:
+            aetest.loop.mark(self.host_check, check_name = host_checks)
+        if interface_rules:
+            aetest.loop.mark(self.interface_rule, rule_name = interface_rules)
+
+    @aetest.test
+    def host_check(self, check_name = None):
+        if check_name is None:
+            self.skipped('No additional host checks in the rules file')
+        check = HOST_CHECKS[check_name]
+        failures = metric_summary(self.list_of_hostnames, check, check.threshold, None)
+        if failures:
+            self.failed(f'{ check.label } failed on { describe(failures) } (threshold { check.threshold })')
+        else:
+            self.passed(f'{ check.label } passed on all devices')
+
+    @aetest.test
+    def interface_rule(self, rule_name = None):
+        if rule_name is None:
+            self.skipped('No additional interface checks in the rules file')
+        rule = INTERFACE_RULES_BY_NAME[rule_name]
+        failed_interfaces = interface_summary(self.list_of_hostnames, rule, notifications.add)
+        if failed_interfaces:
+            self.failed(f'{ rule.label } failed on interfaces { ", ".join(failed_interfaces) } (threshold { rule.threshold })')
+        else:
+            self.passed(f'{ rule.label } passed on all interfaces')
+
+###################################################################
+#                  COMMON CLEANUP SECTION                         #
+###################################################################
+
+class common_cleanup(aetest.CommonCleanup):
+    """ Common Cleanup section """
+
+    @aetest.subsection
+    def send_webex_notifications(self):
+        if WEBEX_ROOM:
+            notifications.flush()
+            # Waits for every queued message, then logs what happened to each
+            dispatcher.close()
+            for delivery in dispatcher.deliveries:
+                log.info(f'Webex message { delivery.label }: { delivery.status } { delivery.reason } '
+                         f'in { delivery.seconds:.2f}s')
+            log.info(dispatcher.report())
+            log.info(webex_client.report())
+            if outbox:
+                log.info(outbox.report())
+
+    @aetest.subsection
+    def report_snapshot_transfer(self):
+        if github:
+            log.info(github.report())
+        if run_state:
+            log.info(run_state.report())
+        log.info(snapshots.stats.report())
+        log.info(snapshots.documents.report())
+        if blob_cache:
+            log.info(blob_cache.report())
 
 if __name__ == '__main__':  # pragma: no cover
     aetest.main()
\ No newline at end of file
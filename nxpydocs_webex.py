@@ -0,0 +1,486 @@
+import os
+import sys
+import json
+import time
+import uuid
+import queue
+import random
+import atexit
+import logging
+import threading
+import requests
+from collections import namedtuple
+from requests.adapters import HTTPAdapter
+from pathlib import Path
+from jinja2 import Environment, FileSystemLoader
+from dotenv import load_dotenv
+
+# Get your logger for your script
+log = logging.getLogger(__name__)
+
+WEBEX_MESSAGES_URL = 'https://webexapis.com/v1/messages'
+
+# Webex rejects messages whose card attachment is too large; cards are split to stay under this
+CARD_MAX_BYTES = 16000
+
+# Threads sending queued messages; more than one may deliver them out of order
+DISPATCH_WORKERS = 2
+
+# Undelivered messages are kept here between runs; past the size limit the file is compacted
+OUTBOX_PATH = Path(__file__).resolve().parent / ".webex_outbox.jsonl"
+OUTBOX_MAX_BYTES = 16 * 2 ** 20
+# Undelivered messages from earlier runs resent per run, or per round of the drain command
+REPLAY_BATCH = 100
+
+###################################################################
+#                  CARD TEMPLATES SECTION                         #
+###################################################################
+
+# One Jinja environment for every card of the run. Each template is compiled
+# the first time it is rendered and kept for the rest of the run, without
+# checking its file again (auto_reload) or ever evicting it (cache_size).
+CARD_TEMPLATES = Environment(loader=FileSystemLoader(str(Path(__file__).resolve().parent)),
+                             auto_reload=False, cache_size=-1)
+
+
+def render_card(name, **context):
+    """ Render the card template name, e.g. failed_cpu_state_idle_adaptive_card.j2 """
+    return(CARD_TEMPLATES.get_template(name).render(**context))
+
+###################################################################
+#                  SENDING SECTION                                #
+###################################################################
+
+class WebexClient(object):
+    """ One pooled, retrying HTTP session for every Webex message of a run
+
+    The session keeps up to pool_size connections alive, one per sending
+    thread, and every request has a (connect, read) timeout. A 429 or 503
+    is retried after its Retry-After, or an exponential backoff with full
+    jitter when it has none, and so is a connection error, up to
+    max_retries times. A read timeout is not retried, since Webex may
+    already have posted the message. Request latency and
+    message throughput are kept for report().
+    """
+
+    def __init__(self, token, pool_size=1, timeout=(5, 30), max_retries=5, base_delay=1.0, max_delay=60.0):
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.session.headers.update({"Content-Type": "application/json", "Authorization": f"Bearer { token }"})
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.messages = 0
+        self.requests_made = 0
+        self.retries = 0
+        self.waited = 0.0
+        self.latencies = []
+        self.first_sent = None
+        self.last_done = None
+        self._lock = threading.Lock()
+
+    def post(self, body):
+        """ POST one rendered message, retrying as above; the last response is returned """
+        attempt = 0
+        with self._lock:
+            if self.first_sent is None:
+                self.first_sent = time.perf_counter()
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    response = self.session.post(WEBEX_MESSAGES_URL, data=body, timeout=self.timeout)
+                except requests.RequestException as error:
+                    self._count(start)
+                    if not isinstance(error, requests.ConnectionError) or attempt >= self.max_retries:
+                        raise
+                    delay = self.backoff(attempt)
+                    reason = error.__class__.__name__
+                else:
+                    self._count(start)
+                    delay = self.retry_delay(response, attempt)
+                    if delay is None:
+                        return(response)
+                    reason = response.status_code
+                    response.close()
+                log.warning(f'Webex message not accepted ({ reason }), retrying in { delay:.1f}s')
+                with self._lock:
+                    self.retries += 1
+                    self.waited += delay
+                time.sleep(delay)
+                attempt += 1
+        finally:
+            with self._lock:
+                self.messages += 1
+                self.last_done = time.perf_counter()
+
+    def _count(self, start):
+        with self._lock:
+            self.requests_made += 1
+            self.latencies.append(time.perf_counter() - start)
+
+    def backoff(self, attempt):
+        return(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt)))
+
+    def retry_delay(self, response, attempt):
+        """ Seconds to wait before retrying response, or None to keep it """
+        if response.status_code not in (429, 503) or attempt >= self.max_retries:
+            return(None)
+        try:
+            return(max(float(response.headers["Retry-After"]), 0.0))
+        except (KeyError, ValueError):
+            return(self.backoff(attempt))
+
+    def report(self):
+        with self._lock:
+            latencies = sorted(self.latencies)
+            elapsed = (self.last_done - self.first_sent) if self.messages else 0.0
+        message = (f'Webex API { self.messages } messages in { self.requests_made } requests, { self.retries } retries, '
+                   f'{ self.waited:.1f}s spent waiting')
+        if latencies:
+            message += (f'; { self.messages / elapsed if elapsed else 0.0:.1f} messages/s, latency p50 '
+                        f'{ percentile(latencies, 0.5) * 1000:.0f}ms p95 { percentile(latencies, 0.95) * 1000:.0f}ms '
+                        f'max { latencies[-1] * 1000:.0f}ms')
+        return(message)
+
+
+def percentile(values, fraction):
+    """ Nearest-rank percentile of sorted values """
+    return(values[min(len(values) - 1, int(fraction * len(values)))])
+
+
+# What happened to one queued message; status is None when no response came back
+Delivery = namedtuple("Delivery", "label status reason seconds")
+
+
+class WebexDispatcher(object):
+    """ Sends rendered messages from a queue on background threads
+
+    send posts one message body and returns the response, such as
+    WebexClient.post.
+
+    submit() only queues the message, so the checks never wait on Webex.
+    close() waits until everything queued has been sent; it runs at
+    interpreter exit too, so a run that ends early still delivers what it
+    queued. Every outcome is kept in deliveries for the end of the run.
+    With a WebexOutbox, each message is written to it before it is
+    queued and marked there once Webex accepts or rejects it, so what
+    could not be sent is replayed later.
+    """
+
+    def __init__(self, send, workers=DISPATCH_WORKERS, outbox=None):
+        self.send = send
+        self.workers = workers
+        self.outbox = outbox
+        self.queue = queue.Queue()
+        self.threads = []
+        self.deliveries = []
+        self.lock = threading.Lock()
+        self.closed = False
+        atexit.register(self.close)
+
+    def submit(self, body, label):
+        message_id = self.outbox.put(body, label) if self.outbox is not None else None
+        self.enqueue(body, label, message_id)
+
+    def replay(self, limit=REPLAY_BATCH):
+        """ Queue up to limit undelivered outbox messages, oldest first; returns how many """
+        pending = self.outbox.pending()[:limit]
+        for message_id, label, body in pending:
+            self.enqueue(body, f'{ label } (replayed)', message_id)
+        return(len(pending))
+
+    def enqueue(self, body, label, message_id):
+        if self.closed:
+            raise RuntimeError("WebexDispatcher is closed")
+        if not self.threads:
+            for number in range(max(1, self.workers)):
+                thread = threading.Thread(target=self.work, name=f'webex-{ number }', daemon=True)
+                thread.start()
+                self.threads.append(thread)
+        self.queue.put((body, label, message_id))
+
+    def work(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                self.deliver(*item)
+            finally:
+                # Counted whatever happened, so wait() and close() cannot hang on a failed message
+                self.queue.task_done()
+
+    def deliver(self, body, label, message_id):
+        start = time.perf_counter()
+        try:
+            response = self.send(body)
+            delivery = Delivery(label, response.status_code, response.reason, time.perf_counter() - start)
+        except requests.RequestException as error:
+            delivery = Delivery(label, None, str(error), time.perf_counter() - start)
+        except Exception as error:
+            # Left undelivered in the outbox, like a connection error, and the thread goes on
+            delivery = Delivery(label, None, f'{ type(error).__name__ }: { error }', time.perf_counter() - start)
+        if message_id is not None:
+            try:
+                if delivery.status is not None and delivery.status < 400:
+                    self.outbox.delivered(message_id)
+                elif delivery.status is not None and delivery.status < 500 and delivery.status != 429:
+                    # Webex refused the message itself; sending it again would not help
+                    self.outbox.rejected(message_id, delivery.status)
+            except Exception as error:
+                log.warning(f'Could not mark Webex message { label } in the outbox, it may be sent again: { error }')
+        with self.lock:
+            self.deliveries.append(delivery)
+
+    def wait(self):
+        """ Wait for every message queued so far to be sent, leaving the dispatcher open """
+        self.queue.join()
+
+    def close(self):
+        """ Wait for every queued message to be sent; later submits are refused """
+        if self.closed:
+            return
+        self.closed = True
+        for thread in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join()
+
+    @property
+    def failed(self):
+        return([delivery for delivery in self.deliveries if delivery.status is None or delivery.status >= 400])
+
+    def report(self):
+        return(f'Webex messages delivered { len(self.deliveries) - len(self.failed) }, failed { len(self.failed) }')
+
+###################################################################
+#                  OUTBOX SECTION                                 #
+###################################################################
+
+class WebexOutbox(object):
+    """ Append-only JSON lines file of messages not yet accepted by Webex
+
+    put() appends a message and syncs it to disk before it is sent.
+    delivered() and rejected() append a marker for it, so a message
+    without a marker is still owed to Webex after a crash or an outage,
+    and pending() lists those messages oldest first for replay. Markers
+    are not synced; a lost one only sends a message twice.
+
+    The file is compacted to the pending messages when it is opened and
+    whenever it grows past max_bytes. Should the pending messages alone
+    exceed half of max_bytes, the oldest are dropped, so a long outage
+    cannot grow the outbox, or the replay, without bound.
+    """
+
+    def __init__(self, path=OUTBOX_PATH, max_bytes=OUTBOX_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.messages = {}
+        self.dropped = 0
+        self.lock = threading.Lock()
+        with self.lock:
+            self.load()
+            self.compact()
+
+    def load(self):
+        if not self.path.is_file():
+            return
+        unreadable = 0
+        with self.path.open(encoding="utf-8") as lines:
+            for line in lines:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A line cut short by a crash while it was being written
+                    unreadable += 1
+                    continue
+                if "body" in entry:
+                    self.messages[entry["id"]] = entry
+                else:
+                    self.messages.pop(entry.get("delivered") or entry.get("rejected"), None)
+        if unreadable:
+            log.warning(f'Skipped { unreadable } unreadable lines in Webex outbox { self.path }')
+
+    def append(self, entry, sync=False):
+        with self.path.open("a", encoding="utf-8") as outbox:
+            outbox.write(json.dumps(entry) + "\n")
+            if sync:
+                outbox.flush()
+                os.fsync(outbox.fileno())
+        if self.path.stat().st_size > self.max_bytes:
+            self.compact()
+
+    def compact(self):
+        """ Rewrite the file with only the pending messages, dropping the oldest past half of max_bytes """
+        lines = [json.dumps(entry) + "\n" for entry in self.messages.values()]
+        size = sum(len(line.encode()) for line in lines)
+        dropped = 0
+        while dropped < len(lines) and size > self.max_bytes // 2:
+            size -= len(lines[dropped].encode())
+            dropped += 1
+        if dropped:
+            for message_id in list(self.messages)[:dropped]:
+                del self.messages[message_id]
+            lines = lines[dropped:]
+            self.dropped += dropped
+            log.warning(f'Webex outbox { self.path } is full, dropped the { dropped } oldest undelivered messages')
+        if not self.path.is_file() and not self.messages:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f'{ self.path.name }.{ os.getpid() }.tmp')
+        with tmp_path.open("w", encoding="utf-8") as outbox:
+            outbox.writelines(lines)
+            outbox.flush()
+            os.fsync(outbox.fileno())
+        os.replace(tmp_path, self.path)
+
+    def put(self, body, label):
+        """ Persist a message before it is sent; returns its id """
+        entry = {"id": uuid.uuid4().hex, "label": label, "queued": time.time(), "body": body}
+        with self.lock:
+            self.messages[entry["id"]] = entry
+            self.append(entry, sync=True)
+        return(entry["id"])
+
+    def delivered(self, message_id):
+        with self.lock:
+            if self.messages.pop(message_id, None) is not None:
+                self.append({"delivered": message_id})
+
+    def rejected(self, message_id, status):
+        with self.lock:
+            if self.messages.pop(message_id, None) is not None:
+                self.append({"rejected": message_id, "status": status})
+
+    def pending(self):
+        """ [(id, label, body), ...] of the messages not yet delivered, oldest first """
+        with self.lock:
+            return([(entry["id"], entry["label"], entry["body"]) for entry in self.messages.values()])
+
+    def report(self):
+        size = self.path.stat().st_size if self.path.is_file() else 0
+        return(f'Webex outbox { len(self.messages) } undelivered messages, { size } bytes'
+               + (f', { self.dropped } dropped when full' if self.dropped else ''))
+
+###################################################################
+#                  INTERFACE NOTIFICATIONS SECTION                #
+###################################################################
+
+class InterfaceNotifications(object):
+    """ Failing interface CheckResults collected during a run and sent as a few cards
+
+    Instead of one message per failing interface, flush() sends one card
+    per host (group_by "host") or per check (group_by "check") with a
+    table of the failing interfaces, their values and thresholds. A card
+    that would be larger than max_bytes is split into numbered parts.
+    labels maps rule names to the names shown on the cards.
+    """
+
+    def __init__(self, room, dispatcher, group_by="host", labels=None, max_bytes=CARD_MAX_BYTES,
+                 template="failed_interfaces_adaptive_card.j2"):
+        if group_by not in ("host", "check"):
+            raise ValueError(f'Unknown Webex grouping { group_by }; use host or check')
+        self.room = room
+        self.dispatcher = dispatcher
+        self.group_by = group_by
+        self.labels = labels or {}
+        self.max_bytes = max_bytes
+        self.template = CARD_TEMPLATES.get_template(template)
+        self.pending = {}
+
+    def add(self, result):
+        key = result.hostname if self.group_by == "host" else result.metric
+        self.pending.setdefault(key, []).append(result)
+
+    def title(self, key, count):
+        if self.group_by == "host":
+            return(f'nxpydocs found { count } failing interface checks on { key }')
+        return(f'nxpydocs found { count } interfaces failing { self.labels.get(key, key) }')
+
+    def rows(self, key, results):
+        if self.group_by == "host":
+            return([[self.labels.get(result.metric, result.metric), result.interface, result.value, result.threshold]
+                    for result in results])
+        return([[result.hostname, result.interface, result.value, result.threshold] for result in results])
+
+    def render(self, key, count, rows, part=1, parts=1):
+        headers = ["Check" if self.group_by == "host" else "Hostname", "Interface", "Value", "Threshold"]
+        # One multi-line TextBlock per column keeps a row down to the bytes of its values
+        columns = ["\n".join(str(row[column]) for row in rows) for column in range(len(headers))]
+        return(self.template.render(roomid=self.room, title=self.title(key, count), headers=headers,
+                                    columns=columns, part=part, parts=parts))
+
+    def size(self, key, count, rows, parts):
+        return(len(self.render(key, count, rows, parts, parts).encode()))
+
+    def split(self, key, count, rows):
+        """ rows packed into as few chunks as keep every card under max_bytes
+
+        A card is as large as the empty card, plus what each row adds to
+        an empty card, plus the line breaks between rows, which two empty
+        rows measure. Sizes use the widest part numbers a split can have.
+        """
+        empty = self.size(key, count, [], len(rows))
+        line_break = self.size(key, count, [[""] * 4] * 2, len(rows)) - empty
+        chunks = [[]]
+        size = empty
+        for row in rows:
+            row_bytes = self.size(key, count, [row], len(rows)) - empty + line_break
+            if chunks[-1] and size + row_bytes > self.max_bytes:
+                chunks.append([])
+                size = empty
+            chunks[-1].append(row)
+            size += row_bytes
+        return(chunks)
+
+    def cards(self):
+        """ (label, message body) for every collected failure, in the order they were added """
+        for key, results in self.pending.items():
+            chunks = self.split(key, len(results), self.rows(key, results))
+            for part, rows in enumerate(chunks, 1):
+                label = f'{ key } interfaces' + (f' part { part } of { len(chunks) }' if len(chunks) > 1 else '')
+                yield label, self.render(key, len(results), rows, part, len(chunks))
+
+    def flush(self):
+        """ Queue a card for everything collected so far and start over """
+        for label, body in self.cards():
+            self.dispatcher.submit(body, label)
+        self.pending = {}
+
+###################################################################
+#                  DRAIN COMMAND SECTION                          #
+###################################################################
+
+def drain(outbox, dispatcher, batch=REPLAY_BATCH):
+    """ Resend undelivered outbox messages batch by batch until none are left or a batch delivers nothing """
+    while True:
+        before = len(outbox.pending())
+        if not before or not dispatcher.replay(batch):
+            return
+        # Wait for the batch before deciding whether to go on
+        dispatcher.wait()
+        if len(outbox.pending()) >= before:
+            log.warning(f'No message of the last batch was delivered, { before } left in the outbox')
+            return
+
+if __name__ == '__main__':
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    outbox = WebexOutbox(os.getenv("WEBEX_OUTBOX") or OUTBOX_PATH,
+                         int(os.getenv("WEBEX_OUTBOX_MAX_BYTES", OUTBOX_MAX_BYTES)))
+    command = sys.argv[1] if len(sys.argv) > 1 else "drain"
+    if command == "drain":
+        workers = int(os.getenv("WEBEX_WORKERS", DISPATCH_WORKERS))
+        client = WebexClient(os.getenv("WEBEX_TOKEN"), pool_size=workers,
+                             timeout=(5, float(os.getenv("WEBEX_TIMEOUT", "30"))),
+                             max_retries=int(os.getenv("WEBEX_MAX_RETRIES", "5")))
+        dispatcher = WebexDispatcher(client.post, workers, outbox)
+        drain(outbox, dispatcher, int(os.getenv("WEBEX_REPLAY_BATCH", REPLAY_BATCH)))
+        dispatcher.close()
+        log.info(dispatcher.report())
+        log.info(client.report())
+    elif command != "status":
+        sys.exit(f'Unknown command { command }, use drain or status')
+    log.info(outbox.report())
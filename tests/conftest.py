@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The suite's modules live at the repository root, next to nxpydocs_tests.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
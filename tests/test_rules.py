@@ -0,0 +1,225 @@
+import io
+import json
+import pickle
+from types import SimpleNamespace
+import pytest
+import nxpydocs_rules
+from nxpydocs_rules import (FleetEvaluator, HostMatcher, INTERFACE_RULES, InterfaceColumns, RunState,
+                            ThresholdOverrides, evaluate_fleet_columns, evaluate_fleet_interfaces, evaluate_host,
+                            evaluate_interfaces, failed_report, host_metrics, interface_records, interface_rows,
+                            load_rules, stream_interface_rows)
+from nxpydocs_schemas import SnapshotDecodeError, decode_snapshot
+from nxpydocs_snapshots import LocalSource, SnapshotIndex
+
+###################################################################
+#                  RULES FILE SECTION                             #
+###################################################################
+
+def rules_file(tmp_path, text):
+    path = tmp_path / "rules.yaml"
+    path.write_text(text)
+    return(path)
+
+
+@pytest.mark.parametrize("text, message", [
+    ("host:\n  version:\n    metric: nxos_version\n    compare: above\n    threshold: 9\n",
+     "host check version compares a text value with above"),
+    ("host:\n  cpu:\n    metric: cpu_state_idle\n    compare: at_most\n    threshold: low\n",
+     "host check cpu needs a number threshold"),
+    ("interface:\n  crc:\n    field: eth_crc\n    compare: above\n    threshold: 0\n"
+     "  crc_five:\n    field: eth_crc\n    compare: equals\n    threshold: '5'\n",
+     "interface check crc_five needs a number threshold"),
+    ("host:\n  cpu:\n    metric: cpu_state_idle\n    compare: at_most\n    threshold: 15\n"
+     "overrides:\n  - hosts: core*\n    thresholds:\n      cpu: high\n",
+     "override 1 check cpu needs a number threshold"),
+])
+def test_load_rules_rejects_compares_that_do_not_fit_the_value(tmp_path, text, message):
+    with pytest.raises(ValueError, match=message):
+        load_rules(rules_file(tmp_path, text))
+
+###################################################################
+#                  HOST MATCHER SECTION                           #
+###################################################################
+
+def test_host_matcher_matches_every_kind_of_glob():
+    matcher = HostMatcher()
+    matcher.add("core01", "exact")
+    matcher.add("core*", "prefix")
+    matcher.add("*01", "suffix")
+    matcher.add("*or*", "both ends")
+    matcher.add("c?re0[12]", "character classes")
+    assert sorted(matcher.match("core01")) == ["both ends", "character classes", "exact", "prefix", "suffix"]
+    assert sorted(matcher.match("core03")) == ["both ends", "prefix"]
+    assert matcher.match("access01") == ["suffix"]
+    assert matcher.match("edge") == []
+
+
+def test_later_overrides_win():
+    overrides = ThresholdOverrides([(("core*",), {"cpu_state_idle": 30}), (("core01",), {"cpu_state_idle": 40})])
+    check = SimpleNamespace(name="cpu_state_idle", threshold=15)
+    assert overrides.threshold("core01", check) == 40
+    assert overrides.threshold("core02", check) == 30
+    assert overrides.threshold("access01", check) == 15
+    assert overrides.overridden("cpu_state_idle") and not overrides.overridden("free_diskspace")
+
+###################################################################
+#                  INTERFACE RECORDS SECTION                      #
+###################################################################
+
+SHOW_INTERFACE_ROWS = [
+    {"interface": "Ethernet1/1", "eth_crc": "0", "eth_inerr": "7", "eth_duplex": "full", "state_rsn_desc": "none"},
+    {"interface": "Ethernet1/2", "eth_crc": "", "eth_inerr": "0", "admin_state": "up"},
+]
+
+
+@pytest.fixture(params=["ijson", "whole"])
+def streaming(request, monkeypatch):
+    """ Stream with ijson, or parse the body whole as when it is not installed """
+    if request.param == "ijson" and nxpydocs_rules.ijson is None:
+        pytest.skip("ijson is not installed")
+    if request.param == "whole":
+        monkeypatch.setattr(nxpydocs_rules, "ijson", None)
+    return(request.param)
+
+
+@pytest.mark.parametrize("rows", [SHOW_INTERFACE_ROWS, SHOW_INTERFACE_ROWS[0]])
+def test_stream_interface_rows_matches_parsing_whole(streaming, rows):
+    content = json.dumps({"TABLE_interface": {"ROW_interface": rows}}).encode()
+    streamed = list(stream_interface_rows(io.BytesIO(content)))
+    assert streamed == interface_rows(decode_snapshot("show interface", content))
+    assert interface_records(streamed) == interface_records(interface_rows(decode_snapshot("show interface", content)))
+
+
+def test_stream_interface_rows_raises_decode_error(streaming):
+    with pytest.raises(SnapshotDecodeError, match="show interface"):
+        list(stream_interface_rows(io.BytesIO(b'{"TABLE_interface": {"ROW_interface": [{"interface": ')))
+
+
+def test_interface_records_pickle_with_interned_names():
+    records = interface_records(SHOW_INTERFACE_ROWS)
+    copies = pickle.loads(pickle.dumps(records))
+    assert copies == records
+    assert copies[0].interface is records[0].interface
+    assert copies[0].eth_inerr == 7
+    # Only the row with an empty field keeps its dict, for the N/A result
+    assert (copies[0].row, copies[1].row) == (None, SHOW_INTERFACE_ROWS[1])
+
+###################################################################
+#                  HOST METRICS SECTION                           #
+###################################################################
+
+def resources(**values):
+    fields = dict(cpu_state_idle=50.0, current_memory_status="OK", load_avg_15min=0.5, load_avg_5min=0.5,
+                  load_avg_1min=0.5, memory_usage_used=50, memory_usage_total=100)
+    return(SimpleNamespace(**dict(fields, **values)))
+
+
+def test_host_metrics_leaves_out_values_no_check_can_compare():
+    errors = []
+    metrics = host_metrics(None, resources(cpu_state_idle=float("nan"), memory_usage_total=0), None, errors)
+    assert "cpu_state_idle" not in metrics and "memory_percentage" not in metrics
+    assert metrics["load_avg_1min"] == 0.5
+    assert len(errors) == 2 and "$.memory_usage_total" in errors[1]
+
+
+def test_malformed_counter_leaves_the_other_checks_running():
+    report = evaluate_host("sw01", {"show system resources": resources()}, INTERFACE_RULES,
+                           rows=[{"interface": "Ethernet1/1", "eth_crc": "lots"}])
+    assert report.errors == ("show interface: Expected `int`, got 'lots' - at `eth_crc` of Ethernet1/1",)
+    assert report.records == []
+    assert report.metrics["load_avg_1min"] == 0.5
+
+###################################################################
+#                  INTERFACE ENGINES SECTION                      #
+###################################################################
+
+FLEET_ROWS = {
+    "core01": [{"interface": "Ethernet1/1", "eth_crc": "3", "eth_inerr": "0", "eth_duplex": "half",
+                "state_rsn_desc": "Link not connected"},
+               {"interface": "Ethernet1/2", "eth_crc": "", "eth_inerr": "9", "eth_duplex": "full"}],
+    "access01": [{"interface": "Ethernet1/1", "eth_crc": "0", "eth_inerr": "0", "eth_duplex": "full",
+                  "state_rsn_desc": "none"},
+                 {"interface": "mgmt0", "state_rsn_desc": "none"}],
+    "access02": [],
+}
+
+
+def fleet_records():
+    return({hostname: interface_records(rows) for hostname, rows in FLEET_ROWS.items()})
+
+
+def test_columns_engine_matches_rows_engine():
+    pytest.importorskip("numpy")
+    records = fleet_records()
+    hostnames = sorted(records)
+    assert (evaluate_fleet_columns(InterfaceColumns(hostnames, records.get))
+            == evaluate_fleet_interfaces(hostnames, records.get))
+
+
+
+def test_columns_engine_matches_rows_engine_with_overrides():
+    pytest.importorskip("numpy")
+    records = fleet_records()
+    overrides = ThresholdOverrides([(("core*",), {"crc": 5, "duplex": "full"})], INTERFACE_RULES)
+    fleet, fleet_passed = evaluate_fleet_columns(InterfaceColumns(sorted(records), records.get), overrides=overrides)
+    for hostname in records:
+        results, passed = evaluate_interfaces(hostname, records[hostname], overrides.interface_rules(hostname))
+        assert {rule: by_host[hostname] for rule, by_host in fleet.items()} == results
+        assert {rule: by_host[hostname] for rule, by_host in fleet_passed.items()} == passed
+
+
+
+def write_fleet(path):
+    documents = {
+        "show version": {"nxos_ver_str": "9.3(8)", "kickstart_ver_str": "9.3(7)"},
+        "show system resources": {"cpu_state_idle": "12.5", "current_memory_status": "OK", "load_avg_15min": "0.5",
+                                  "load_avg_5min": "0.5", "load_avg_1min": "0.5", "memory_usage_used": "90",
+                                  "memory_usage_total": "100"},
+        "dir": {"bytesused": "10", "bytestotal": "100", "TABLE_dir": {"ROW_dir": [{"fname": "nxos.9.3.8.bin"}]}},
+    }
+    for hostname, rows in FLEET_ROWS.items():
+        for command, document in dict(documents, **{"show interface": {"TABLE_interface": {"ROW_interface": rows}}}).items():
+            (path / f'{ hostname } { command }.json').write_text(json.dumps(document))
+
+
+@pytest.mark.parametrize("workers, engine", [(0, "columns"), (2, "rows"), (2, "columns")])
+def test_every_evaluation_path_gives_the_same_reports(tmp_path, workers, engine):
+    if engine == "columns":
+        pytest.importorskip("numpy")
+    write_fleet(tmp_path)
+    expected = FleetEvaluator(SnapshotIndex(LocalSource(tmp_path))).evaluate()
+    evaluator = FleetEvaluator(SnapshotIndex(LocalSource(tmp_path)), workers=workers, engine=engine)
+    assert evaluator.evaluate() == expected
+    assert (evaluator.columns is not None) == (engine == "columns")
+
+###################################################################
+#                  RUN STATE SECTION                              #
+###################################################################
+
+ROWS = [{"interface": "Ethernet1/1", "eth_crc": "0", "eth_inerr": "7"}]
+
+
+def test_run_state_reuses_reports_of_unchanged_hosts(tmp_path):
+    path = tmp_path / "run_state.json"
+    report = evaluate_host("sw01", {"show system resources": resources()}, INTERFACE_RULES, rows=ROWS)
+    RunState(path, rules_version="v1").save({"sw01": {"dir": "aaa"}}, {"sw01": report})
+    state = RunState(path, rules_version="v1")
+    reused = state.reports({"sw01": {"dir": "aaa"}, "sw02": {"dir": "bbb"}})
+    assert reused == {"sw01": report}
+    assert (state.reused, state.evaluated) == (1, 1)
+    assert state.reports({"sw01": {"dir": "ccc"}}) == {}
+
+
+def test_run_state_is_discarded_when_rules_change(tmp_path):
+    path = tmp_path / "run_state.json"
+    report = evaluate_host("sw01", {}, INTERFACE_RULES, rows=ROWS)
+    RunState(path, rules_version="v1").save({"sw01": {}}, {"sw01": report})
+    assert RunState(path, rules_version="v2").reports({"sw01": {}}) == {}
+
+
+def test_run_state_does_not_save_failed_hosts(tmp_path):
+    path = tmp_path / "run_state.json"
+    report = failed_report("sw01", INTERFACE_RULES, OSError("connection reset"))
+    assert report.errors == ("OSError: connection reset",)
+    RunState(path, rules_version="v1").save({"sw01": {}}, {"sw01": report})
+    assert RunState(path, rules_version="v1").reports({"sw01": {}}) == {}
@@ -0,0 +1,35 @@
+import re
+import pytest
+from nxpydocs_schemas import DIR, SnapshotDecodeError, as_list, decode_snapshot, msgspec
+
+###################################################################
+#                  DECODING SECTION                               #
+###################################################################
+
+@pytest.fixture(params=["msgspec", "json"])
+def decoder(request, monkeypatch):
+    """ Decode with msgspec, or with json.loads and convert() as when it is not installed """
+    if request.param == "msgspec" and msgspec is None:
+        pytest.skip("msgspec is not installed")
+    if request.param == "json":
+        monkeypatch.setattr(DIR, "struct", None)
+    return(request.param)
+
+
+def test_decode_converts_strings_and_single_rows(decoder):
+    document = decode_snapshot("dir", b'{"bytesused": "10", "bytestotal": 100, "TABLE_dir": {"ROW_dir": '
+                                      b'{"fname": "nxos.9.3.8.bin", "fsize": "1"}}}')
+    assert (document.bytesused, document.bytestotal) == (10, 100)
+    assert [row.fname for row in as_list(document.TABLE_dir.ROW_dir)] == ["nxos.9.3.8.bin"]
+
+
+@pytest.mark.parametrize("content, message", [
+    (b'{"bytesused": "many", "bytestotal": 100}', "Expected `int`, got `str` - at `$.bytesused`"),
+    (b'{"bytestotal": 100}', "missing required field `bytesused`"),
+    (b'{"bytesused": 10, "bytestotal": 100, "TABLE_dir": []}', "at `$.TABLE_dir`"),
+    (b'{"bytesused": 10', "dir: "),
+])
+def test_decode_errors_name_the_command_and_field(decoder, content, message):
+    with pytest.raises(SnapshotDecodeError, match=re.escape(message)) as error:
+        decode_snapshot("dir", content)
+    assert error.value.command == "dir"
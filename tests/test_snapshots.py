@@ -0,0 +1,266 @@
+import io
+import os
+import tarfile
+import time
+from contextlib import contextmanager
+from nxpydocs_snapshots import (BlobCache, GitHubArchiveSource, GitHubClient, LocalSource, RateLimitScheduler,
+                                ResponseCache, SnapshotIndex, git_blob_sha)
+
+###################################################################
+#                  FAKES SECTION                                  #
+###################################################################
+
+class FakeResponse(object):
+    def __init__(self, status_code=200, body=None, headers=None, text=""):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+        self.text = text
+
+    def json(self):
+        return(self.body)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f'HTTP { self.status_code }')
+
+    def close(self):
+        pass
+
+
+class FakeSession(object):
+    """ Hands out the queued responses and records each request's headers """
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, timeout=None, headers=None, **kwargs):
+        self.requests.append((url, dict(headers or {})))
+        return(self.responses.pop(0))
+
+
+def client(tmp_path, *responses):
+    github = GitHubClient("user", None, "repo", response_cache=ResponseCache(tmp_path / "responses.json"))
+    github.session = FakeSession(*responses)
+    return(github)
+
+###################################################################
+#                  BLOB CACHE SECTION                             #
+###################################################################
+
+def test_blob_cache_evicts_least_recently_used(tmp_path):
+    cache = BlobCache(tmp_path, max_bytes=10)
+    cache.put("aa01", b"1111")
+    cache.put("bb02", b"2222")
+    assert cache.get("aa01") == b"1111"
+    cache.put("cc03", b"3333")
+    assert "bb02" not in cache
+    assert "aa01" in cache and "cc03" in cache
+    assert cache.evictions == 1
+    assert not (tmp_path / "bb" / "bb02").exists()
+
+
+def test_blob_cache_recency_survives_between_runs(tmp_path):
+    cache = BlobCache(tmp_path, max_bytes=10)
+    cache.put("aa01", b"1111")
+    cache.put("bb02", b"2222")
+    now = time.time()
+    os.utime(tmp_path / "aa" / "aa01", (now, now))
+    os.utime(tmp_path / "bb" / "bb02", (now - 60, now - 60))
+    cache = BlobCache(tmp_path, max_bytes=10)
+    cache.put("cc03", b"3333")
+    assert "bb02" not in cache
+    assert cache.get("aa01") == b"1111"
+
+
+
+def test_blob_cache_path_and_open(tmp_path):
+    cache = BlobCache(tmp_path, max_bytes=100)
+    cache.put("aa01", b"body")
+    assert cache.path("aa01").read_bytes() == b"body"
+    with cache.open("aa01") as stream:
+        assert stream.read() == b"body"
+    assert cache.path("ff99") is None
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_blob_cache_keeps_pinned_entries_until_unpinned(tmp_path):
+    cache = BlobCache(tmp_path, max_bytes=10)
+    cache.put("aa01", b"1111")
+    cache.pin("aa01")
+    cache.put("bb02", b"2222")
+    cache.put("cc03", b"3333")
+    assert "aa01" in cache and "bb02" not in cache
+    cache.unpin("aa01")
+    cache.put("dd04", b"4444")
+    assert "aa01" not in cache
+
+###################################################################
+#                  GITHUB CLIENT SECTION                          #
+###################################################################
+
+def test_get_json_revalidates_with_etag(tmp_path):
+    github = client(tmp_path, FakeResponse(200, {"tree": []}, {"ETag": '"v1"'}), FakeResponse(304))
+    assert github.get_json("git/trees/HEAD") == {"tree": []}
+    assert github.get_json("git/trees/HEAD") == {"tree": []}
+    assert github.session.requests[1][1]["If-None-Match"] == '"v1"'
+    assert github.not_modified == 1
+
+
+
+def test_get_json_serves_immutable_paths_from_cache(tmp_path):
+    github = client(tmp_path, FakeResponse(200, {"tree": ["a"]}, {"ETag": '"v1"'}))
+    github.get_json("git/trees/abc", immutable=True)
+    # A new run reads the cache file back and makes no request at all
+    github = client(tmp_path)
+    assert github.get_json("git/trees/abc", immutable=True) == {"tree": ["a"]}
+    assert github.requests_made == 0
+
+
+
+def test_refresh_budget_only_asks_when_unknown(tmp_path):
+    github = client(tmp_path, FakeResponse(200, {}, {"X-RateLimit-Limit": "5000", "X-RateLimit-Remaining": "4000",
+                                                     "X-RateLimit-Reset": str(time.time() + 60)}))
+    assert github.refresh_budget() == 4000
+    assert github.refresh_budget() == 4000
+    assert github.requests_made == 1
+
+###################################################################
+#                  RATE LIMIT SECTION                             #
+###################################################################
+
+def test_scheduler_reads_budget_from_headers():
+    scheduler = RateLimitScheduler()
+    reset = time.time() + 60
+    response = FakeResponse(200, headers={"X-RateLimit-Limit": "5000", "X-RateLimit-Remaining": "4999",
+                                          "X-RateLimit-Reset": str(reset)})
+    assert scheduler.update(response, 0) is None
+    assert (scheduler.limit, scheduler.remaining, scheduler.reset_at) == (5000, 4999, reset)
+
+
+def test_scheduler_retries_rate_limits_but_not_plain_403():
+    scheduler = RateLimitScheduler(max_retries=2)
+    assert scheduler.update(FakeResponse(429, headers={"Retry-After": "3"}), 0) == 3.0
+    assert scheduler.update(FakeResponse(403, text="Forbidden"), 0) is None
+    assert 0 <= scheduler.update(FakeResponse(403, text="secondary rate limit"), 1) <= 2
+    assert scheduler.update(FakeResponse(429, headers={"Retry-After": "3"}), 2) is None
+    assert scheduler.retries == 2
+
+
+def test_scheduler_waits_for_reset_once_reserve_is_reached():
+    scheduler = RateLimitScheduler(reserve=50)
+    scheduler.update(FakeResponse(200, headers={"X-RateLimit-Limit": "5000", "X-RateLimit-Remaining": "50",
+                                                "X-RateLimit-Reset": str(time.time() + 600)}), 0)
+    assert "wait about" in scheduler.project(10)
+
+###################################################################
+#                  ARCHIVE SOURCE SECTION                         #
+###################################################################
+
+DIR_BODY = b'{"bytesused": "10", "bytestotal": "100"}'
+
+
+class FakeArchiveClient(object):
+    """ Streams a gzipped tarball of members like GitHubClient.stream_archive """
+
+    def __init__(self, members):
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+            for name, content in members.items():
+                info = tarfile.TarInfo(name)
+                info.size = len(content)
+                archive.addfile(info, io.BytesIO(content))
+        self.archive = buffer.getvalue()
+        self.blobs_fetched = []
+
+    @contextmanager
+    def stream_archive(self):
+        with tarfile.open(fileobj=io.BytesIO(self.archive), mode="r|gz") as archive:
+            yield archive
+
+    def get_blob(self, sha):
+        self.blobs_fetched.append(sha)
+        raise OSError("the archive had every body")
+
+
+def archive_client():
+    return(FakeArchiveClient({"owner-repo-abc/README.md": b"readme",
+                              "owner-repo-abc/JSON/sw01 dir.json": DIR_BODY,
+                              "owner-repo-abc/JSON/sw02 dir.json": DIR_BODY.replace(b"10", b"20")}))
+
+
+def test_archive_members_go_to_the_blob_cache_and_are_parsed_lazily(tmp_path):
+    github = archive_client()
+    cache = BlobCache(tmp_path, max_bytes=10000)
+    index = SnapshotIndex(GitHubArchiveSource(github), cache=cache)
+    assert index.hostnames() == ["sw01", "sw02"]
+    # Written to the cache as each member arrived, and not held or parsed
+    assert not any(blob.fetched for blob in index.load().values())
+    assert git_blob_sha(DIR_BODY) in cache
+    assert index.documents.parses == 0
+    assert index.document("sw02", "dir").bytesused == 20
+    assert index.documents.parses == 1
+    assert github.blobs_fetched == []
+
+
+def test_archive_skips_members_of_hosts_with_unchanged_snapshots(tmp_path):
+    cache = BlobCache(tmp_path, max_bytes=10000)
+    index = SnapshotIndex(GitHubArchiveSource(archive_client()), cache=cache,
+                          previous={"sw01": {"dir": git_blob_sha(DIR_BODY)}})
+    index.load()
+    assert git_blob_sha(DIR_BODY) not in cache
+    assert index.blob("sw02", "dir").sha in cache
+    assert not index.blob("sw01", "dir").fetched
+
+###################################################################
+#                  SNAPSHOT INDEX SECTION                         #
+###################################################################
+
+def test_local_blob_sha_matches_git(tmp_path):
+    (tmp_path / "sw01 dir.json").write_bytes(b'{"bytesused": "1"}')
+    index = SnapshotIndex(LocalSource(tmp_path))
+    blob = index.blob("sw01", "dir")
+    assert blob.sha == git_blob_sha(b'{"bytesused": "1"}')
+    # Hashed from the file, so the body is not kept
+    assert not blob.fetched
+
+
+
+def test_prefetch_returns_failures_and_fetches_the_rest(tmp_path):
+    for hostname in ("sw01", "sw02"):
+        (tmp_path / f'{ hostname } dir.json').write_bytes(b'{}')
+    index = SnapshotIndex(LocalSource(tmp_path))
+
+    def fail():
+        raise OSError("connection reset")
+
+    index.blob("sw01", "dir")._fetch = fail
+    errors = index.prefetch(["dir"], workers=2)
+    assert list(errors) == ["sw01 dir.json"]
+    assert index.blob("sw02", "dir").fetched
+
+
+def test_prefetch_keeps_each_body_with_its_blob_and_errors_in_order(tmp_path):
+    hostnames = [f'sw{ number:02}' for number in range(12)]
+    for hostname in hostnames:
+        (tmp_path / f'{ hostname } dir.json').write_bytes(hostname.encode())
+    index = SnapshotIndex(LocalSource(tmp_path))
+
+    def delayed(fetch, delay, fails):
+        def slow_fetch():
+            time.sleep(delay)
+            if fails:
+                raise OSError("connection reset")
+            return(fetch())
+        return(slow_fetch)
+
+    # The later hosts finish first, so completion order is the reverse of the index
+    for number, hostname in enumerate(hostnames):
+        blob = index.blob(hostname, "dir")
+        blob._fetch = delayed(blob._fetch, (len(hostnames) - number) * 0.005, number % 3 == 0)
+    errors = index.prefetch(["dir"], workers=4)
+    assert list(errors) == [f'{ hostname } dir.json' for hostname in hostnames[::3]]
+    for number, hostname in enumerate(hostnames):
+        if number % 3:
+            assert index.blob(hostname, "dir").content == hostname.encode()
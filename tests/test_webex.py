@@ -0,0 +1,196 @@
+import json
+import threading
+from types import SimpleNamespace
+import pytest
+import nxpydocs_webex
+from nxpydocs_rules import CheckResult
+from nxpydocs_webex import InterfaceNotifications, WebexClient, WebexDispatcher, WebexOutbox
+
+###################################################################
+#                  SENDING SECTION                                #
+###################################################################
+
+class FakeWebexSession(object):
+    """ Answers each POST with the next queued (status, headers) """
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.posted = []
+
+    def post(self, url, data=None, timeout=None):
+        self.posted.append(data)
+        status, headers = self.answers.pop(0)
+        return(SimpleNamespace(status_code=status, reason=str(status), headers=headers, close=lambda: None))
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    waited = []
+    monkeypatch.setattr(nxpydocs_webex.time, "sleep", waited.append)
+    return(waited)
+
+
+def webex_client(*answers, **settings):
+    webex = WebexClient("token", **settings)
+    webex.session = FakeWebexSession(*answers)
+    return(webex)
+
+
+def test_webex_client_retries_429_and_503_after_retry_after(sleeps):
+    webex = webex_client((429, {"Retry-After": "2"}), (503, {"Retry-After": "0.5"}), (200, {}))
+    assert webex.post("card").status_code == 200
+    assert sleeps == [2.0, 0.5]
+    assert webex.session.posted == ["card"] * 3
+    assert (webex.messages, webex.requests_made, webex.retries, webex.waited) == (1, 3, 2, 2.5)
+
+
+def test_webex_client_backs_off_without_retry_after_and_gives_up(sleeps):
+    webex = webex_client((503, {}), (429, {"Retry-After": "soon"}), (429, {}), max_retries=2, base_delay=1.0)
+    assert webex.post("card").status_code == 429
+    assert len(sleeps) == 2
+    assert 0 <= sleeps[0] <= 1.0 and 0 <= sleeps[1] <= 2.0
+
+
+def test_webex_client_does_not_retry_other_errors(sleeps):
+    webex = webex_client((400, {}))
+    assert webex.post("card").status_code == 400
+    assert sleeps == [] and webex.retries == 0
+
+###################################################################
+#                  DISPATCHER SECTION                             #
+###################################################################
+
+def response(status):
+    return(SimpleNamespace(status_code=status, reason=str(status)))
+
+
+def test_dispatcher_marks_outbox_by_status(tmp_path):
+    outbox = WebexOutbox(tmp_path / "outbox.jsonl")
+    statuses = {"ok": 200, "refused": 400, "busy": 503}
+    dispatcher = WebexDispatcher(lambda body: response(statuses[body]), workers=1, outbox=outbox)
+    for body in statuses:
+        dispatcher.submit(body, body)
+    dispatcher.close()
+    assert [label for message_id, label, body in outbox.pending()] == ["busy"]
+    assert [delivery.label for delivery in dispatcher.failed] == ["refused", "busy"]
+
+
+def test_dispatcher_replays_pending_messages(tmp_path):
+    outbox = WebexOutbox(tmp_path / "outbox.jsonl")
+    outbox.put("body", "sw01")
+    dispatcher = WebexDispatcher(lambda body: response(200), workers=1, outbox=outbox)
+    assert dispatcher.replay(limit=10) == 1
+    dispatcher.close()
+    assert outbox.pending() == []
+    assert dispatcher.deliveries[0].label == "sw01 (replayed)"
+
+
+def test_dispatcher_survives_a_send_that_raises(tmp_path):
+    outbox = WebexOutbox(tmp_path / "outbox.jsonl")
+
+    def send(body):
+        if body == "bad":
+            raise ValueError("broken card")
+        return(response(200))
+
+    dispatcher = WebexDispatcher(send, workers=1, outbox=outbox)
+    for body in ("bad", "good"):
+        dispatcher.submit(body, body)
+    waiter = threading.Thread(target=dispatcher.wait)
+    waiter.start()
+    waiter.join(5)
+    assert not waiter.is_alive()
+    dispatcher.close()
+    assert [(delivery.label, delivery.reason) for delivery in dispatcher.failed] == [("bad", "ValueError: broken card")]
+    assert [label for message_id, label, body in outbox.pending()] == ["bad"]
+
+###################################################################
+#                  OUTBOX SECTION                                 #
+###################################################################
+
+def test_outbox_keeps_only_unmarked_messages(tmp_path):
+    outbox = WebexOutbox(tmp_path / "outbox.jsonl")
+    first = outbox.put("body 1", "sw01")
+    second = outbox.put("body 2", "sw02")
+    third = outbox.put("body 3", "sw03")
+    outbox.delivered(first)
+    outbox.rejected(second, 400)
+    assert outbox.pending() == [(third, "sw03", "body 3")]
+    # A new run reads the markers back and owes Webex the same message
+    assert WebexOutbox(tmp_path / "outbox.jsonl").pending() == [(third, "sw03", "body 3")]
+
+
+def test_outbox_compacts_on_open(tmp_path):
+    path = tmp_path / "outbox.jsonl"
+    outbox = WebexOutbox(path)
+    for number in range(5):
+        outbox.delivered(outbox.put(f'body { number }', "sw01"))
+    kept = outbox.put("kept", "sw02")
+    WebexOutbox(path)
+    assert [json.loads(line)["id"] for line in path.read_text().splitlines()] == [kept]
+
+
+def test_outbox_drops_oldest_when_full(tmp_path):
+    outbox = WebexOutbox(tmp_path / "outbox.jsonl", max_bytes=1000)
+    ids = [outbox.put("x" * 100, f'sw{ number:02}') for number in range(20)]
+    pending = [message_id for message_id, label, body in outbox.pending()]
+    assert outbox.dropped > 0
+    assert pending == ids[-len(pending):]
+    assert (tmp_path / "outbox.jsonl").stat().st_size <= 1000
+
+
+def test_outbox_skips_torn_lines(tmp_path):
+    path = tmp_path / "outbox.jsonl"
+    outbox = WebexOutbox(path)
+    kept = outbox.put("body", "sw01")
+    with path.open("a") as torn:
+        torn.write('{"id": "cut short", "bo')
+    assert WebexOutbox(path).pending() == [(kept, "sw01", "body")]
+
+###################################################################
+#                  INTERFACE NOTIFICATIONS SECTION                #
+###################################################################
+
+class Submitted(object):
+    """ Stands in for the dispatcher and keeps every (label, body) it is handed """
+
+    def __init__(self):
+        self.messages = []
+
+    def submit(self, body, label):
+        self.messages.append((label, body))
+
+
+def card_column(body, column):
+    # The lines of one column of the card's interface table
+    table = json.loads(body)["attachments"][0]["content"]["body"][1]
+    return(table["columns"][column]["items"][1]["text"].split("\n"))
+
+
+def test_interface_cards_are_split_under_max_bytes():
+    submitted = Submitted()
+    notifications = InterfaceNotifications("room", submitted, labels={"crc": "CRC Errors Counter"}, max_bytes=6000)
+    interfaces = [f'Ethernet1/{ number }' for number in range(1, 201)]
+    for number, interface in enumerate(interfaces, 1):
+        notifications.add(CheckResult("sw01", interface, "crc", number, 0, "Failed"))
+    notifications.add(CheckResult("sw02", "Ethernet1/1", "crc", 5, 0, "Failed"))
+    notifications.flush()
+    labels = [label for label, body in submitted.messages]
+    parts = len(labels) - 1
+    assert parts > 1
+    assert labels == [f'sw01 interfaces part { part } of { parts }' for part in range(1, parts + 1)] + ["sw02 interfaces"]
+    assert all(len(body.encode()) <= 6000 for label, body in submitted.messages)
+    # Every failing interface is on exactly one card, in the order it was added
+    assert [line for label, body in submitted.messages[:-1] for line in card_column(body, 1)] == interfaces
+    assert card_column(submitted.messages[0][1], 0)[0] == "CRC Errors Counter"
+    assert notifications.pending == {}
+
+
+def test_interface_cards_grouped_by_check():
+    submitted = Submitted()
+    notifications = InterfaceNotifications("room", submitted, group_by="check")
+    for hostname, metric in (("sw01", "crc"), ("sw02", "crc"), ("sw01", "runts")):
+        notifications.add(CheckResult(hostname, "Ethernet1/1", metric, 1, 0, "Failed"))
+    notifications.flush()
+    assert [label for label, body in submitted.messages] == ["crc interfaces", "runts interfaces"]
+    assert card_column(submitted.messages[0][1], 0) == ["sw01", "sw02"]